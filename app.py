@@ -1,12 +1,21 @@
 # SGHSS App - RU 4493981
 from flask import Flask, jsonify
 from config import Config
-from extensions import db, jwt, migrate
+from extensions import db, jwt, migrate, configurar_sqlite
 from routes.auth import auth_bp
 from routes.administracao import administracao_bp
 from routes.profissionais import profissionais_bp
 from routes.pacientes import pacientes_bp
 from routes.telemedicina import telemedicina_bp
+from utils.disponibilidade import indice_disponibilidade
+from utils.reservas import registro_reservas
+from utils.serializacao import ProvedorJSON
+from utils.compressao import compressao
+from utils.leitos import indice_leitos
+from utils.senhas import servico_senhas
+from utils.tokens import lista_revogacao
+from utils.planos import verificar_indices
+from utils.replicas import copiar_replicas
 
 def create_app():
     """
@@ -14,11 +23,19 @@ def create_app():
     """
     app = Flask(__name__) # Cria instância da aplicação
     app.config.from_object(Config) # Carrega configurações do objeto Config
+    app.json = ProvedorJSON(app) # JSON rápido, com datas e horas em ISO 8601
 
     # Inicializa extensões com a aplicação
     db.init_app(app) # Banco de dados
+    configurar_sqlite(app) # Pragmas do SQLite (WAL, busy_timeout, chaves estrangeiras...) em cada conexão
     jwt.init_app(app) # JWT para autenticação
-    migrate.init_app(app, db) # Migrations para gerenciamento do schema
+    migrate.init_app(app, db, render_as_batch=True) # Migrations (modo batch: o SQLite não altera colunas com ALTER TABLE)
+    indice_disponibilidade.init_app(app) # Índice em memória de horários livres
+    registro_reservas.init_app(app) # Reservas temporárias de horários
+    indice_leitos.init_app(app) # Quadro de ocupação de leitos em memória
+    compressao.init_app(app) # Compressão gzip/brotli/zstd das respostas
+    servico_senhas.init_app(app) # Hash de senhas em pool de processos
+    lista_revogacao.init_app(app) # Tokens revogados no logout
 
     # Registro dos blueprints (módulos da aplicação)
     app.register_blueprint(auth_bp)
@@ -27,6 +44,10 @@ def create_app():
     app.register_blueprint(pacientes_bp)
     app.register_blueprint(telemedicina_bp)
 
+    # Comando de linha de comando: flask verificar-indices (planos das consultas críticas)
+    app.cli.add_command(verificar_indices)
+    app.cli.add_command(copiar_replicas) # copia o banco SQLite principal para as réplicas locais
+
     # Rota simples de health check
     @app.route("/health")
     def health():
@@ -44,6 +65,9 @@ if __name__ == "__main__":
     with app.app_context():
         from models import *  # Importa todos os modelos para garantir que o SQLAlchemy reconheça
         db.create_all() # Cria todas as tabelas no banco de dados (caso ainda não existam)
+        from utils.financeiro import preencher_totais_se_vazios
+        preencher_totais_se_vazios() # Totais diários de relatórios anteriores à tabela de totais
+        db.session.commit()
     app.run(debug=True) # Roda a aplicação em modo debug
 
 
@@ -0,0 +1,124 @@
+# Benchmark: agendamentos simultâneos, leitura-e-escrita antiga x compare-and-set - RU 4493981
+# N threads disputam os mesmos horários de uma agenda. O caminho antigo lê o horário livre,
+# marca disponivel=False no objeto e grava a consulta; o atual ocupa o horário com um UPDATE
+# condicional (utils/agendamento.confirmar_agendamento). Para cada um: agendamentos/s,
+# conflitos (horário já ocupado, 409/400 na rota), erros (500: IntegrityError, banco travado)
+# e horários com mais de uma consulta ativa.
+# Uso: python benchmarks/agendamento.py [threads] [horarios]
+import random
+import sys
+import threading
+import time
+from datetime import date, time as hora_do_dia, timedelta
+from comum import criar_aplicacao
+
+THREADS = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+HORARIOS = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+PACIENTES = 50
+
+app = criar_aplicacao(SENHA_PROCESSOS="0")
+
+from sqlalchemy import func, insert, select
+from extensions import db
+from models import Agenda, Consulta, Horario, Paciente, Profissional
+from utils.agendamento import HorarioIndisponivel, confirmar_agendamento
+
+
+class Conflito(Exception):
+    """
+    O horário já estava ocupado (a rota responde 4xx).
+    """
+
+
+# ---------------------- CAMINHOS DE AGENDAMENTO ----------------------
+def agendar_antigo(paciente_id, agenda, hora):
+    """
+    Caminho anterior ao compare-and-set: lê o horário livre e o marca como ocupado no objeto.
+    """
+    horario = Horario.query.filter_by(agenda_id=agenda.id, hora=hora, disponivel=True).first()
+    if not horario:
+        raise Conflito()
+    horario.disponivel = False
+    db.session.add(Consulta(
+        paciente_id=paciente_id, profissional_id=agenda.profissional_id, agenda_id=agenda.id,
+        horario_id=horario.id, data_consulta=agenda.data, hora_consulta=hora, status="Agendada"
+    ))
+    db.session.commit()
+
+def agendar_cas(paciente_id, agenda, hora):
+    """
+    Caminho atual: UPDATE condicional do horário + nova consulta na mesma transação.
+    """
+    horario = Horario.query.filter_by(agenda_id=agenda.id, hora=hora).first()
+    try:
+        confirmar_agendamento(paciente_id, agenda, horario)
+    except HorarioIndisponivel:
+        raise Conflito()
+    db.session.commit()
+
+
+def criar_agenda(dias):
+    """
+    Cria uma agenda com HORARIOS horários livres (um por minuto) e retorna (agenda_id, horas).
+    """
+    horas = [hora_do_dia(i // 60, i % 60) for i in range(HORARIOS)]
+    with app.app_context():
+        agenda = Agenda(profissional_id=1, data=date.today() + timedelta(days=dias))
+        db.session.add(agenda)
+        db.session.flush()
+        db.session.execute(insert(Horario), [{"agenda_id": agenda.id, "hora": h, "disponivel": True} for h in horas])
+        db.session.commit()
+        return agenda.id, horas
+
+
+def medir(nome, agendar, dias):
+    agenda_id, horas = criar_agenda(dias)
+    contagem = {"sucessos": 0, "conflitos": 0, "erros": 0}
+    lock = threading.Lock()
+
+    def trabalhar(k):
+        ordem = horas[:]
+        random.Random(k).shuffle(ordem) # cada thread percorre os horários em outra ordem
+        with app.app_context():
+            agenda = db.session.get(Agenda, agenda_id)
+            for hora in ordem:
+                try:
+                    agendar(1 + k % PACIENTES, agenda, hora)
+                    resultado = "sucessos"
+                except Conflito:
+                    resultado = "conflitos"
+                except Exception: # IntegrityError, "database is locked": 500 na rota
+                    db.session.rollback()
+                    resultado = "erros"
+                with lock:
+                    contagem[resultado] += 1
+
+    threads = [threading.Thread(target=trabalhar, args=(k,)) for k in range(THREADS)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    segundos = time.perf_counter() - inicio
+
+    with app.app_context():
+        por_horario = select(Consulta.horario_id).where(Consulta.agenda_id == agenda_id, Consulta.status != "Cancelada") \
+            .group_by(Consulta.horario_id).having(func.count() > 1)
+        duplicados = len(db.session.execute(por_horario).all())
+    print(f"{nome:16} agendamentos/s={contagem['sucessos'] / segundos:8.1f} tentativas/s="
+          f"{(THREADS * len(horas)) / segundos:8.1f} sucessos={contagem['sucessos']:5d} "
+          f"conflitos={contagem['conflitos']:5d} erros(500)={contagem['erros']:4d} duplicados={duplicados}")
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        db.session.add(Profissional(nome="Médica", crm="CRM1", especialidade="cardio", email="medica@sghss.com", senha="x"))
+        db.session.execute(insert(Paciente), [
+            {"nome": f"Paciente {i}", "cpf": str(i), "email": f"paciente{i}@sghss.com", "senha": "x"}
+            for i in range(PACIENTES)
+        ])
+        db.session.commit()
+
+    print(f"{THREADS} threads x {HORARIOS} horários (todas as threads tentam todos os horários)")
+    medir("leitura+escrita", agendar_antigo, 1)
+    medir("compare-and-set", agendar_cas, 2)
@@ -0,0 +1,50 @@
+# Benchmark helpers - RU 4493981
+import os
+import sys
+import tempfile
+import time
+
+# Os benchmarks rodam como scripts (python benchmarks/<nome>.py) a partir da raiz do projeto
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+def criar_aplicacao(**ambiente):
+    """
+    Cria a aplicação com um banco SQLite novo em um diretório temporário e as tabelas criadas.
+    `ambiente` sobrescreve variáveis lidas por config.py (ex.: SENHA_PROCESSOS="2"); por isso
+    deve ser chamada antes de qualquer import de config / app.
+    """
+    pasta = tempfile.mkdtemp(prefix="sghss-bench-")
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(pasta, "sghss.db")
+    os.environ.update(ambiente)
+    from app import create_app
+    from extensions import db
+    import models # registra todos os modelos antes do create_all
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def melhor_tempo(funcao, repeticoes=3):
+    """
+    Executa `funcao` `repeticoes` vezes e retorna o menor tempo, em segundos.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def percentil(valores, p):
+    """
+    Retorna o percentil `p` (0 a 100) de uma lista de valores.
+    """
+    if not valores:
+        return 0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
@@ -0,0 +1,86 @@
+# Benchmark: listagens com projeção de colunas x entidades ORM - RU 4493981
+# Compara linhas/s e pico de memória por 100 mil linhas das listagens de pacientes e
+# profissionais (utils/projecoes.py) com o caminho antigo, que carregava as entidades
+# completas (com o hash de senha) e copiava os atributos para dicionários.
+# Uso: python benchmarks/projecoes.py [linhas]
+import gc
+import sys
+import tracemalloc
+from datetime import date
+from comum import criar_aplicacao, melhor_tempo
+
+LINHAS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+HASH = "scrypt:32768:8:1$" + "a" * 16 + "$" + "b" * 128 # tamanho de um hash real
+
+app = criar_aplicacao(SENHA_PROCESSOS="0")
+
+from extensions import db
+from models import Paciente, Profissional
+from utils.projecoes import pacientes_listagem, serializar_paciente, profissionais_listagem, serializar_profissional
+
+
+# ---------------------- CAMINHO ANTIGO (ENTIDADES ORM) ----------------------
+def pacientes_orm():
+    return [{
+        "id": p.id,
+        "nome": p.nome,
+        "cpf": p.cpf,
+        "email": p.email,
+        "data_nascimento": p.data_nascimento.strftime("%Y-%m-%d") if p.data_nascimento else None,
+        "telefone": p.telefone
+    } for p in Paciente.query.all()]
+
+def profissionais_orm():
+    return [{"id": p.id, "nome": p.nome, "tipo": p.tipo, "crm": p.crm} for p in Profissional.query.all()]
+
+
+# ---------------------- PROJEÇÕES ----------------------
+def pacientes_projecao():
+    return [serializar_paciente(p) for p in pacientes_listagem()]
+
+def profissionais_projecao():
+    return [serializar_profissional(p) for p in profissionais_listagem()]
+
+
+def medir(funcao):
+    """
+    Retorna (linhas por segundo, pico de memória em MB por 100 mil linhas).
+    A sessão é limpa antes de cada execução, como no início de uma requisição.
+    """
+    def executar():
+        db.session.expunge_all()
+        gc.collect()
+        funcao()
+
+    segundos = melhor_tempo(executar)
+    db.session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcao()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del resultado
+    return LINHAS / segundos, pico / 1e6 * 100_000 / LINHAS
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        db.session.execute(db.insert(Paciente), [
+            {"nome": f"Paciente {i}", "cpf": f"{i:011d}", "email": f"paciente{i}@sghss.com", "senha": HASH,
+             "data_nascimento": date(1990, 1, 1), "telefone": "11999990000"}
+            for i in range(LINHAS)
+        ])
+        db.session.execute(db.insert(Profissional), [
+            {"nome": f"Profissional {i}", "crm": f"CRM{i}", "email": f"profissional{i}@sghss.com", "senha": HASH,
+             "tipo": "medico"}
+            for i in range(LINHAS)
+        ])
+        db.session.commit()
+
+        print(f"{LINHAS:,} linhas por tabela")
+        for nome, funcao in (
+            ("pacientes ORM", pacientes_orm), ("pacientes projeção", pacientes_projecao),
+            ("profissionais ORM", profissionais_orm), ("profissionais projeção", profissionais_projecao),
+        ):
+            linhas_por_segundo, pico = medir(funcao)
+            print(f"{nome:24} {linhas_por_segundo:>10,.0f} linhas/s  pico {pico:6.1f} MB / 100 mil linhas")
@@ -0,0 +1,72 @@
+# Benchmark: vazão de logins com tráfego misto - RU 4493981
+# Várias threads fazem login de paciente sem parar enquanto outra mede a latência de uma
+# rota leve (/health), como em um pico de logins. Roda com o hash na thread da requisição
+# (SENHA_PROCESSOS=0) e com o pool de processos (utils/senhas.py), cada configuração em um
+# processo próprio, porque config.py lê as variáveis de ambiente na importação.
+# Uso: python benchmarks/senhas.py [processos do pool] [segundos]
+import os
+import subprocess
+import sys
+import threading
+import time
+from comum import criar_aplicacao, percentil
+
+THREADS_LOGIN = 8
+SENHA = "senha-benchmark"
+
+
+def medir(segundos):
+    """
+    Executa o tráfego misto na configuração do ambiente e imprime o resultado.
+    """
+    app = criar_aplicacao()
+    from extensions import db
+    from models import Paciente
+    from utils.senhas import servico_senhas
+
+    with app.app_context():
+        db.session.add(Paciente(nome="Paciente", cpf="1", email="paciente@sghss.com", senha=servico_senhas.gerar(SENHA)))
+        db.session.commit()
+
+    app.test_client().get("/health")
+    fim = time.perf_counter() + segundos
+    logins, latencias = [], []
+
+    def logar():
+        cliente, total = app.test_client(), 0
+        while time.perf_counter() < fim:
+            resposta = cliente.post("/pacientes/login", json={"email": "paciente@sghss.com", "senha": SENHA})
+            assert resposta.status_code == 200, resposta.get_json()
+            total += 1
+        logins.append(total)
+
+    def rota_leve():
+        cliente = app.test_client()
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            cliente.get("/health")
+            latencias.append(time.perf_counter() - inicio)
+            time.sleep(0.005)
+
+    threads = [threading.Thread(target=logar) for _ in range(THREADS_LOGIN)] + [threading.Thread(target=rota_leve)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    servico_senhas._descartar_pool()
+
+    print(f"processos={servico_senhas.processos:<3} logins/s={sum(logins) / segundos:7.1f}  "
+          f"/health p50={percentil(latencias, 50) * 1000:6.1f}ms p95={percentil(latencias, 95) * 1000:6.1f}ms "
+          f"p99={percentil(latencias, 99) * 1000:6.1f}ms")
+
+
+if __name__ == "__main__":
+    if os.getenv("BENCHMARK_FILHO"):
+        medir(float(sys.argv[2]))
+    else:
+        processos = sys.argv[1] if len(sys.argv) > 1 else str(max(1, (os.cpu_count() or 2) // 2))
+        segundos = sys.argv[2] if len(sys.argv) > 2 else "10"
+        print(f"{THREADS_LOGIN} threads de login + 1 thread em /health, {segundos} s por configuração")
+        for valor in ("0", processos):
+            ambiente = dict(os.environ, BENCHMARK_FILHO="1", SENHA_PROCESSOS=valor)
+            subprocess.run([sys.executable, os.path.abspath(__file__), valor, segundos], env=ambiente, check=True)
@@ -0,0 +1,41 @@
+# Benchmark: provider JSON da aplicação x provider padrão do Flask - RU 4493981
+# Mede o tempo para gerar respostas grandes de listagem com o DefaultJSONProvider do Flask
+# e com o ProvedorJSON (utils/serializacao.py), com orjson e com o fallback da biblioteca padrão.
+# Compara linhas já formatadas como texto (strftime nas rotas) e date/datetime/Decimal nativos.
+# Uso: python benchmarks/serializacao.py [linhas]
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+from comum import melhor_tempo # também coloca a raiz do projeto no sys.path
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+import utils.serializacao as serializacao
+
+LINHAS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+
+def medir(nome, provider, dados):
+    app = Flask(__name__)
+    app.json = provider(app)
+    with app.app_context():
+        resposta = app.json.response(dados)
+        segundos = melhor_tempo(lambda: app.json.response(dados))
+    print(f"{nome:34} {segundos * 1000:8.1f} ms  {len(resposta.get_data()) / 1e6:5.1f} MB")
+
+
+if __name__ == "__main__":
+    texto = [{"id": i, "nome": f"Paciente {i}", "cpf": f"{i:011d}", "data": "2030-01-01", "hora": "10:00:00",
+              "status": "Agendada"} for i in range(LINHAS)]
+    nativos = [{"id": i, "nome": f"Paciente {i}", "cpf": f"{i:011d}", "data": date(2030, 1, 1),
+                "criado_em": datetime(2030, 1, 1, 10, 0, i % 60), "valor": Decimal("10.50")} for i in range(LINHAS)]
+
+    for rotulo, dados in (("datas como texto (strftime)", texto), ("date/datetime/Decimal nativos", nativos)):
+        print(f"-- {rotulo}, {LINHAS:,} linhas")
+        medir("Flask DefaultJSONProvider", DefaultJSONProvider, dados)
+        if serializacao.orjson is not None:
+            medir("ProvedorJSON (orjson)", serializacao.ProvedorJSON, dados)
+        else:
+            print("ProvedorJSON (orjson)              orjson não instalado")
+        orjson, serializacao.orjson = serializacao.orjson, None
+        medir("ProvedorJSON (biblioteca padrão)", serializacao.ProvedorJSON, dados)
+        serializacao.orjson = orjson
@@ -0,0 +1,110 @@
+# Benchmark: concorrência de leitura/escrita no SQLite antes e depois dos pragmas - RU 4493981
+# Processos leitores (notificações do paciente + contagem de não lidas) e escritores
+# (novas notificações) disputam o mesmo arquivo, como workers do servidor.
+# "antes" reproduz o comportamento sem ajustes (journal de rollback, synchronous FULL,
+# timeout padrão de 5 s do sqlite3, cache padrão, sem mmap) e "depois" usa a configuração
+# de config.py (WAL, synchronous NORMAL, cache e mmap maiores).
+# Uso: python benchmarks/sqlite.py [leitores] [escritores] [segundos]
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+from comum import criar_aplicacao, percentil
+
+LEITORES = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+ESCRITORES = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+SEGUNDOS = float(sys.argv[3]) if len(sys.argv) > 3 else 8
+PACIENTES = 200
+
+CONFIGURACOES = {
+    "antes": {"SQLITE_JOURNAL_MODE": "DELETE", "SQLITE_SYNCHRONOUS": "FULL", "SQLITE_BUSY_TIMEOUT_MS": "5000",
+              "SQLITE_CACHE_SIZE_KB": "2000", "SQLITE_MMAP_SIZE": "0"},
+    "depois": {},
+}
+
+
+def trabalhador(app, tipo, fim, fila):
+    """
+    Repete leituras ou escritas até `fim` e devolve (tipo, operações, erros, latências).
+    """
+    from sqlalchemy import func
+    from extensions import db
+    from models import Notificacao
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False) # conexões herdadas do processo pai não são reutilizadas
+        operacoes = erros = 0
+        latencias = []
+        while time.time() < fim:
+            inicio = time.perf_counter()
+            try:
+                if tipo == "leitor":
+                    db.session.query(Notificacao.id, Notificacao.titulo) \
+                        .filter_by(paciente_id=random.randint(1, PACIENTES)) \
+                        .order_by(Notificacao.criado_em.desc()).limit(50).all()
+                    db.session.query(func.count(Notificacao.id)).filter(Notificacao.lida == False).scalar()
+                    db.session.rollback()
+                else:
+                    db.session.add(Notificacao(paciente_id=random.randint(1, PACIENTES), titulo="Aviso", mensagem="x" * 80))
+                    db.session.commit()
+                operacoes += 1
+                latencias.append(time.perf_counter() - inicio)
+            except Exception:
+                db.session.rollback() # ex.: "database is locked"
+                erros += 1
+    fila.put((tipo, operacoes, erros, latencias))
+
+
+def medir(rotulo):
+    """
+    Cria e popula o banco na configuração do ambiente e imprime o resultado dos trabalhadores.
+    """
+    app = criar_aplicacao(SENHA_PROCESSOS="0")
+    from datetime import datetime
+    from extensions import db
+    from models import Notificacao, Paciente
+
+    with app.app_context():
+        db.session.execute(db.insert(Paciente), [
+            {"nome": f"Paciente {i}", "cpf": str(i), "email": f"paciente{i}@sghss.com", "senha": "x"}
+            for i in range(PACIENTES)
+        ])
+        db.session.execute(db.insert(Notificacao), [
+            {"paciente_id": 1 + i % PACIENTES, "titulo": "Aviso", "mensagem": "x" * 80, "lida": False,
+             "criado_em": datetime.utcnow()}
+            for i in range(40_000)
+        ])
+        db.session.commit()
+        for engine in db.engines.values():
+            engine.dispose()
+
+    contexto = multiprocessing.get_context("fork")
+    fila = contexto.Queue()
+    fim = time.time() + 1 + SEGUNDOS # 1 s para todos os processos começarem juntos
+    processos = [contexto.Process(target=trabalhador, args=(app, tipo, fim, fila))
+                 for tipo in ["leitor"] * LEITORES + ["escritor"] * ESCRITORES]
+    for processo in processos:
+        processo.start()
+    resultados = [fila.get() for _ in processos]
+    for processo in processos:
+        processo.join()
+
+    for tipo in ("leitor", "escritor"):
+        do_tipo = [r for r in resultados if r[0] == tipo]
+        latencias = [latencia for r in do_tipo for latencia in r[3]]
+        print(f"{rotulo:7} {tipo:9} ops/s={sum(r[1] for r in do_tipo) / SEGUNDOS:8.1f} "
+              f"erros={sum(r[2] for r in do_tipo):4d} p50={percentil(latencias, 50) * 1000:7.1f}ms "
+              f"p99={percentil(latencias, 99) * 1000:8.1f}ms max={max(latencias, default=0) * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    if os.getenv("BENCHMARK_FILHO"):
+        medir(os.environ["BENCHMARK_FILHO"])
+    else:
+        print(f"{LEITORES} leitores + {ESCRITORES} escritores, {SEGUNDOS:g} s por configuração")
+        for rotulo, ambiente in CONFIGURACOES.items():
+            subprocess.run([sys.executable, os.path.abspath(__file__), *sys.argv[1:]],
+                           env=dict(os.environ, BENCHMARK_FILHO=rotulo, **ambiente), check=True)
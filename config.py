@@ -19,11 +19,76 @@ class Config:
     # Desativa o rastreamento de modificações do SQLAlchemy (economiza memória)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Pool de conexões de cada processo (repassado ao create_engine do SQLAlchemy)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10)) # conexões mantidas abertas
+    DB_POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", 20)) # conexões extras em picos, fechadas ao serem devolvidas
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 10)) # segundos esperando uma conexão livre antes de falhar
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800)) # reabre conexões mais antigas que isso (-1 = nunca)
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "0") == "1" # testa a conexão antes de usar (útil em servidores remotos)
+    SQLALCHEMY_ENGINE_OPTIONS = {} if SQLALCHEMY_DATABASE_URI in ("sqlite://", "sqlite:///:memory:") else { # SQLite em memória usa uma conexão só
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+    # Réplicas de leitura (utils/replicas.py): URIs separadas por vírgula; as rotas @somente_leitura
+    # leem de uma delas e todo o resto usa SQLALCHEMY_DATABASE_URI. Vazio = sem réplicas
+    DATABASE_REPLICAS = [uri.strip() for uri in os.getenv("DATABASE_REPLICAS", "").split(",") if uri.strip()]
+    SQLALCHEMY_BINDS = {f"replica_{i}": uri for i, uri in enumerate(DATABASE_REPLICAS, 1)}
+
+    # Pragmas aplicados a cada nova conexão SQLite (extensions.py); ignorados em outros bancos
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL") # WAL: leituras não bloqueiam a escrita, nem a escrita as leituras
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)) # espera pelo lock de escrita antes de "database is locked"
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL") # NORMAL é seguro em WAL (fsync só no checkpoint)
+    SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 20000)) # cache de páginas por conexão
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)) # leitura do arquivo via mmap (0 = desativado)
+    SQLITE_FOREIGN_KEYS = os.getenv("SQLITE_FOREIGN_KEYS", "1") == "1" # o SQLite só valida chaves estrangeiras com este pragma
+
     # Chave secreta usada para gerar tokens JWT
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "jwt-secret")
 
     # Propaga exceções para o Flask lidar corretamente
     PROPAGATE_EXCEPTIONS = True
 
-    # Tempo de expiração do token de acesso JWT em segundos (4 horas)
-    JWT_ACCESS_TOKEN_EXPIRES = 60 * 60 * 4  # 4 hours
+    # Tempo de expiração do token de acesso JWT em segundos (15 minutos);
+    # depois disso o cliente renova o token em /auth/refresh, sem novo login
+    JWT_ACCESS_TOKEN_EXPIRES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRES", 60 * 15))
+
+    # Tempo de expiração do refresh token JWT em segundos (7 dias)
+    JWT_REFRESH_TOKEN_EXPIRES = int(os.getenv("JWT_REFRESH_TOKEN_EXPIRES", 60 * 60 * 24 * 7))
+
+    # Tokens revogados no logout (utils/tokens.py)
+    TOKENS_REVOGADOS_SINCRONIZACAO_SEGUNDOS = int(os.getenv("TOKENS_REVOGADOS_SINCRONIZACAO_SEGUNDOS", 2)) # busca revogações de outros processos
+
+    # Índice em memória de horários disponíveis (utils/disponibilidade.py)
+    DISPONIBILIDADE_MAX_ENTRADAS = int(os.getenv("DISPONIBILIDADE_MAX_ENTRADAS", 5000)) # pares (profissional, data) em memória
+    DISPONIBILIDADE_HORIZONTE_DIAS = int(os.getenv("DISPONIBILIDADE_HORIZONTE_DIAS", 60)) # datas além disso são removidas primeiro
+    DISPONIBILIDADE_TTL_SEGUNDOS = int(os.getenv("DISPONIBILIDADE_TTL_SEGUNDOS", 30)) # recarrega entradas antigas (0 = nunca expira)
+
+    # Quantos dias à frente os horários gerados por regras de agenda são listados
+    AGENDA_REGRAS_HORIZONTE_DIAS = int(os.getenv("AGENDA_REGRAS_HORIZONTE_DIAS", 30))
+
+    # Reservas temporárias de horário (utils/reservas.py)
+    RESERVA_TTL_SEGUNDOS = int(os.getenv("RESERVA_TTL_SEGUNDOS", 180)) # duração da reserva (3 minutos)
+    RESERVA_SINCRONIZACAO_SEGUNDOS = int(os.getenv("RESERVA_SINCRONIZACAO_SEGUNDOS", 2)) # recarrega reservas de outros processos
+
+    # Quadro de ocupação de leitos em memória (utils/leitos.py)
+    LEITOS_TTL_SEGUNDOS = int(os.getenv("LEITOS_TTL_SEGUNDOS", 30)) # recarrega o quadro do banco (0 = nunca expira)
+
+    # Compressão das respostas conforme Accept-Encoding (utils/compressao.py)
+    COMPRESSAO_HABILITADA = os.getenv("COMPRESSAO_HABILITADA", "1") == "1"
+    COMPRESSAO_MINIMO_BYTES = int(os.getenv("COMPRESSAO_MINIMO_BYTES", 1024)) # respostas menores vão sem compressão
+    COMPRESSAO_ALGORITMOS = os.getenv("COMPRESSAO_ALGORITMOS", "br,zstd,gzip") # ordem de preferência (br/zstd se instalados)
+    COMPRESSAO_NIVEL_GZIP = int(os.getenv("COMPRESSAO_NIVEL_GZIP", 6)) # 1 (mais rápido) a 9 (menor resposta)
+    COMPRESSAO_NIVEL_BROTLI = int(os.getenv("COMPRESSAO_NIVEL_BROTLI", 4)) # 0 a 11
+    COMPRESSAO_NIVEL_ZSTD = int(os.getenv("COMPRESSAO_NIVEL_ZSTD", 3)) # 1 a 22
+    COMPRESSAO_MIMETYPES = ["application/json", "text/plain", "text/html", "text/csv"]
+
+    # Hash de senhas em pool de processos (utils/senhas.py)
+    SENHA_METODO = os.getenv("SENHA_METODO", "scrypt:32768:8:1") # KDF e custo no formato do werkzeug; hashes antigos são refeitos no login
+    SENHA_PROCESSOS = int(os.getenv("SENHA_PROCESSOS", max(1, (os.cpu_count() or 2) // 2))) # hashes simultâneos (0 = na thread da requisição)
+    SENHA_MAX_PENDENTES = int(os.getenv("SENHA_MAX_PENDENTES", 64)) # pedidos aguardando o pool; acima disso, 503
+    SENHA_TIMEOUT_SEGUNDOS = int(os.getenv("SENHA_TIMEOUT_SEGUNDOS", 10)) # espera máxima por um hash
+    SENHA_NICE = int(os.getenv("SENHA_NICE", 5)) # prioridade reduzida dos processos do pool (0 = sem alteração)
@@ -12,11 +12,69 @@ from flask_jwt_extended import JWTManager
 # que auxilia na criação e atualização do schema do banco (ex: tabelas e colunas).
 from flask_migrate import Migrate
 
+# Sessão que envia as leituras das rotas somente leitura às réplicas (utils/replicas.py).
+from utils.replicas import SessaoRoteada
+
 # Instância global do banco de dados que será inicializada no app principal.
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": SessaoRoteada})
 
 # Instância global do gerenciador de autenticação JWT.
 jwt = JWTManager()
 
 # Instância global do gerenciador de migrações de banco de dados.
 migrate = Migrate()
+
+
+# ---------------------- AJUSTES DO SQLITE ----------------------
+# Importa o sistema de eventos do SQLAlchemy, usado para configurar cada conexão nova do pool.
+from sqlalchemy import event
+
+# Valores aceitos nos pragmas que recebem texto (vão direto no SQL, por isso são validados).
+MODOS_JOURNAL = {"WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"}
+MODOS_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def pragmas_sqlite(config):
+    """
+    Monta a lista de pragmas a partir da configuração (config.py). Lança ValueError se
+    journal_mode ou synchronous tiverem valores inválidos.
+    """
+    journal_mode = config.get("SQLITE_JOURNAL_MODE", "WAL").upper()
+    synchronous = config.get("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+    if journal_mode not in MODOS_JOURNAL:
+        raise ValueError(f"SQLITE_JOURNAL_MODE deve ser um de: {', '.join(sorted(MODOS_JOURNAL))}")
+    if synchronous not in MODOS_SYNCHRONOUS:
+        raise ValueError(f"SQLITE_SYNCHRONOUS deve ser um de: {', '.join(sorted(MODOS_SYNCHRONOUS))}")
+    return [
+        # journal_mode primeiro: os demais valem por conexão, ele fica gravado no arquivo
+        f"PRAGMA journal_mode = {journal_mode}",
+        f"PRAGMA busy_timeout = {int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+        f"PRAGMA synchronous = {synchronous}",
+        f"PRAGMA cache_size = {-int(config.get('SQLITE_CACHE_SIZE_KB', 20000))}", # negativo = em KiB, não em páginas
+        f"PRAGMA mmap_size = {int(config.get('SQLITE_MMAP_SIZE', 0))}",
+        f"PRAGMA foreign_keys = {'ON' if config.get('SQLITE_FOREIGN_KEYS', True) else 'OFF'}",
+    ]
+
+
+def configurar_sqlite(app):
+    """
+    Registra, em cada engine SQLite da aplicação (banco principal e binds), um evento "connect"
+    que aplica os pragmas a toda conexão aberta pelo pool. Os pragmas valem por conexão,
+    por isso não basta executá-los uma vez na inicialização.
+    Deve ser chamada depois de db.init_app(app).
+    """
+    pragmas = pragmas_sqlite(app.config)
+
+    def aplicar_pragmas(conexao_dbapi, _registro):
+        cursor = conexao_dbapi.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        if engine.dialect.name == "sqlite":
+            event.listen(engine, "connect", aplicar_pragmas)
@@ -0,0 +1,12 @@
+# Management CLI - RU 4493981
+# Comandos de linha de comando da aplicação (Flask-Migrate e verificações), sem depender
+# da variável FLASK_APP. Exemplos:
+#   python manage.py db upgrade          -> aplica as migrações do banco
+#   python manage.py verificar-indices   -> confere os planos das consultas críticas
+from flask.cli import FlaskGroup
+from app import create_app
+
+cli = FlaskGroup(create_app=create_app)
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,30 @@
+"""preenche os totais financeiros diarios
+
+Migração de dados: calcula totais_financeiros_diarios a partir dos relatórios já existentes.
+Bancos anteriores às migrações recebem "db stamp" da baseline (que cria a tabela) e não a
+executam; por isso o preenchimento fica nesta revisão, que roda no "db upgrade" seguinte.
+Recalcular é idempotente: a tabela é apagada e gerada de novo.
+
+Revision ID: b9c71dcdf632
+Revises: b0177b0ee746
+Create Date: 2026-10-18 09:39:13.995355
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9c71dcdf632'
+down_revision = 'b0177b0ee746'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    from utils.financeiro import reconstruir_totais
+    reconstruir_totais(op.get_bind())
+
+
+def downgrade():
+    pass # os totais continuam válidos; não há o que desfazer
@@ -5,5 +5,10 @@ from .profissionais import Profissional
 from .agendas import Agenda, Horario
 from .consulta import Consulta
 from .prontuario import Prontuario, Receita
-from .administracao import Leito, Internacao, RelatorioFinanceiro, Suprimento
+from .administracao import Leito, Internacao, RelatorioFinanceiro, TotalFinanceiroDiario, Suprimento, MovimentacaoEstoque
 from .notificacoes import Notificacao
+from .regras_agenda import RegraAgenda, ExcecaoAgenda
+from .reservas import ReservaHorario
+from .lista_espera import ListaEspera
+from .versoes import VersaoRecurso
+from .tokens import TokenRevogado
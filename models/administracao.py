@@ -9,6 +9,7 @@ class Leito(db.Model):
     numero = db.Column(db.String(10), unique=True, nullable=False)
     tipo = db.Column(db.String(30), nullable=True)
     ocupado = db.Column(db.Boolean, default=False)
+    __table_args__ = (db.Index("ix_leitos_tipo", "tipo"),) # alocação automática por tipo
 
 # Modelo para registrar as internações de pacientes
 class Internacao(db.Model):
@@ -18,6 +19,15 @@ class Internacao(db.Model):
     leito_id = db.Column(db.Integer, db.ForeignKey("leitos.id"), nullable=False)
     data_inicio = db.Column(db.DateTime, default=datetime.utcnow, nullable=False) #padrão é o momento da criação
     data_fim = db.Column(db.DateTime, nullable=True) #pode ser nula se o paciente ainda estiver internado
+    __table_args__ = (
+        db.Index("ix_internacoes_leito_inicio", "leito_id", "data_inicio"), # "quem estava no leito X no momento T"
+        db.Index("ix_internacoes_data_inicio", "data_inicio", "leito_id"), # admissões por dia (censo), sem ler a tabela
+        db.Index("ix_internacoes_data_fim", "data_fim", "leito_id"), # altas por dia (censo e tempo de permanência)
+        db.Index(
+            "ix_internacoes_abertas_leito", "leito_id", # parcial: internações ativas (leito livre / quadro de leitos)
+            sqlite_where=db.text("data_fim IS NULL"), postgresql_where=db.text("data_fim IS NULL")
+        ),
+    )
 
 # Modelo para registrar relatórios financeiros do hospital
 class RelatorioFinanceiro(db.Model):
@@ -27,6 +37,18 @@ class RelatorioFinanceiro(db.Model):
     descricao = db.Column(db.Text, nullable=False)
     valor = db.Column(db.Float, nullable=False)
     data = db.Column(db.DateTime, default=datetime.utcnow, nullable=False) #padrão é o momento da criação
+    __table_args__ = (db.Index("ix_relatorios_financeiros_tipo_data", "tipo", "data"),)
+
+# Modelo com os totais diários dos relatórios financeiros por tipo (utils/financeiro.py).
+# Atualizado a cada relatório registrado, para que os totais por mês / período não
+# dependam do número de relatórios. Valores em centavos (inteiros), para somas exatas.
+class TotalFinanceiroDiario(db.Model):
+    __tablename__ = "totais_financeiros_diarios"
+    tipo = db.Column(db.String(50), primary_key=True)
+    dia = db.Column(db.Date, primary_key=True)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+    total_centavos = db.Column(db.BigInteger, nullable=False, default=0)
+    __table_args__ = (db.Index("ix_totais_financeiros_diarios_dia", "dia"),)
 
 # Modelo para controlar suprimentos hospitalares
 class Suprimento(db.Model):
@@ -35,3 +57,21 @@ class Suprimento(db.Model):
     nome = db.Column(db.String(120), nullable=False)
     quantidade = db.Column(db.Integer, default=0, nullable=False)
     descricao = db.Column(db.String(100), nullable=True)
+    estoque_minimo = db.Column(db.Integer, default=0, server_default="0", nullable=False) # abaixo disso, o item aparece no estoque baixo
+
+# Índice de expressão para a consulta de estoque baixo (quantidade - estoque_minimo <= 0)
+db.Index("ix_suprimentos_saldo_minimo", Suprimento.quantidade - Suprimento.estoque_minimo)
+
+# Modelo do livro de movimentações de estoque (utils/estoque.py): cada entrada ou saída
+# de um suprimento, com o motivo, quem fez e o saldo resultante
+class MovimentacaoEstoque(db.Model):
+    __tablename__ = "movimentacoes_estoque"
+    id = db.Column(db.Integer, primary_key=True)
+    suprimento_id = db.Column(db.Integer, db.ForeignKey("suprimentos.id"), nullable=False)
+    tipo = db.Column(db.String(10), nullable=False) # entrada, saida
+    quantidade = db.Column(db.Integer, nullable=False) # sempre positiva; o tipo indica o sentido
+    saldo = db.Column(db.Integer, nullable=False) # quantidade em estoque após a movimentação
+    motivo = db.Column(db.String(200), nullable=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey("usuarios.id"), nullable=True) # quem registrou
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    __table_args__ = (db.Index("ix_movimentacoes_estoque_suprimento_data", "suprimento_id", "criado_em"),)
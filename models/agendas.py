@@ -10,7 +10,11 @@ class Agenda(db.Model):
     data = db.Column(db.Date, nullable=False)
 
     # Restrição: um profissional só pode ter UMA agenda por data
-    __table_args__ = (db.UniqueConstraint("profissional_id", "data", name="uix_profissional_data"),)
+    # Índice por data: usado nas buscas de horários por período e do próximo horário livre
+    __table_args__ = (
+        db.UniqueConstraint("profissional_id", "data", name="uix_profissional_data"),
+        db.Index("ix_agendas_data", "data"),
+    )
 
     # Relacionamento: uma agenda tem vários horários
     horarios = db.relationship("Horario", backref="agenda", cascade="all, delete-orphan", lazy=True)
@@ -24,5 +28,9 @@ class Horario(db.Model):
     disponivel = db.Column(db.Boolean, default=True)
 
     # Restrição: não permitir 2 horários iguais na mesma agenda
-    __table_args__ = (db.UniqueConstraint("agenda_id", "hora", name="uix_agenda_hora"),)
+    # Índice (agenda_id, disponivel): horários livres de cada agenda nas listagens
+    __table_args__ = (
+        db.UniqueConstraint("agenda_id", "hora", name="uix_agenda_hora"),
+        db.Index("ix_horarios_agenda_disponivel", "agenda_id", "disponivel"),
+    )
 
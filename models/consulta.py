@@ -7,8 +7,23 @@ from datetime import datetime
 class Consulta(db.Model):
     __tablename__ = "consultas"
 
-    # Restrição: não permite duas consultas no mesmo horário da mesma agenda
-    __table_args__ = (db.UniqueConstraint("agenda_id", "horario_id", name="uq_agenda_horario"),)
+    # Restrição: não permite duas consultas ativas no mesmo horário da mesma agenda
+    # (as canceladas ficam no histórico do paciente e não impedem um novo agendamento)
+    # Índices: históricos do paciente e do profissional (mesma ordem da paginação),
+    # busca por horário e, parcial, consultas ativas por agenda (ignora as canceladas)
+    __table_args__ = (
+        db.Index(
+            "uq_consultas_agenda_horario_ativa", "agenda_id", "horario_id", unique=True,
+            sqlite_where=db.text("status != 'Cancelada'"), postgresql_where=db.text("status != 'Cancelada'")
+        ),
+        db.Index("ix_consultas_paciente_data", "paciente_id", "data_consulta", "hora_consulta"),
+        db.Index("ix_consultas_profissional_data", "profissional_id", "data_consulta", "hora_consulta"),
+        db.Index("ix_consultas_horario", "horario_id"),
+        db.Index(
+            "ix_consultas_ativas_agenda", "agenda_id",
+            sqlite_where=db.text("status != 'Cancelada'"), postgresql_where=db.text("status != 'Cancelada'")
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     paciente_id = db.Column(db.Integer, db.ForeignKey("pacientes.id"), nullable=False)
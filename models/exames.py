@@ -10,3 +10,4 @@ class Exame(db.Model):
     nome = db.Column(db.String(120), nullable=False) # Nome do exame (ex: "Hemograma", "Raio-X")
     data = db.Column(db.DateTime, nullable=False, default=datetime.utcnow) #padrão é o momento da criação
     status = db.Column(db.String(20), default="agendado")  # agendado, realizado, cancelado, reagendado
+    __table_args__ = (db.Index("ix_exames_paciente_data", "paciente_id", "data"),) # histórico de exames do paciente
@@ -0,0 +1,17 @@
+# Lista de espera model - RU 4493981
+from extensions import db
+from datetime import datetime
+
+# Modelo que representa um paciente aguardando vaga em uma especialidade
+class ListaEspera(db.Model):
+    __tablename__ = "lista_espera"
+    id = db.Column(db.Integer, primary_key=True)
+    paciente_id = db.Column(db.Integer, db.ForeignKey("pacientes.id"), nullable=False)
+    especialidade = db.Column(db.String(80), nullable=False)
+    data_inicio = db.Column(db.Date, nullable=False) # primeira data aceita pelo paciente
+    data_fim = db.Column(db.Date, nullable=False) # última data aceita pelo paciente
+    status = db.Column(db.String(20), nullable=False, default="aguardando") # aguardando, atendido, cancelado
+    consulta_id = db.Column(db.Integer, db.ForeignKey("consultas.id"), nullable=True) # consulta criada quando atendido
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (db.Index("ix_lista_espera_status_especialidade", "status", "especialidade"),)
@@ -11,3 +11,4 @@ class Notificacao(db.Model):
     mensagem = db.Column(db.Text, nullable=False) # Conteúdo da notificação
     lida = db.Column(db.Boolean, default=False) # Indica se a notificação foi lida pelo paciente (True) ou não (False)
     criado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False) # Data e hora em que a notificação foi criada
+    __table_args__ = (db.Index("ix_notificacoes_paciente_criado", "paciente_id", "criado_em"),) # listagem do paciente
@@ -13,5 +13,6 @@ class Paciente(db.Model):
     telefone = db.Column(db.String(20), nullable=True)
     email = db.Column(db.String(120), nullable=True)
     senha = db.Column(db.String(255), nullable=False) 
+    __table_args__ = (db.Index("ix_pacientes_email", "email"),) # login do paciente
     
 
@@ -10,6 +10,7 @@ class Prontuario(db.Model):
     profissional_id = db.Column(db.Integer, db.ForeignKey("profissionais.id"), nullable=False) # Referência ao profissional que registrou o prontuário
     data_registro = db.Column(db.DateTime, nullable=False, default=datetime.utcnow) # padrão é o momento da criação
     descricao = db.Column(db.Text, nullable=False) # Descrição do prontuário (observações, histórico clínico, evolução do paciente)
+    __table_args__ = (db.Index("ix_prontuarios_paciente", "paciente_id"),)
 
 # Modelo que representa uma receita médica
 class Receita(db.Model):
@@ -20,3 +21,4 @@ class Receita(db.Model):
     data_emissao = db.Column(db.DateTime, nullable=False, default=datetime.utcnow) # Data e hora de emissão da receita
     conteudo = db.Column(db.Text, nullable=False) # Conteúdo da receita (medicações, doses, instruções) 
     assinatura_digital = db.Column(db.String(255), nullable=True) # Assinatura digital do profissional, se aplicável
+    __table_args__ = (db.Index("ix_receitas_paciente", "paciente_id"),)
@@ -0,0 +1,26 @@
+# Regras de agenda model - RU 4493981
+from extensions import db
+
+# Modelo que representa uma regra recorrente de atendimento de um profissional
+# Ex.: toda segunda-feira (dia_semana=0) das 08:00 às 12:00, consultas de 30 minutos
+class RegraAgenda(db.Model):
+    __tablename__ = "regras_agenda"
+    id = db.Column(db.Integer, primary_key=True)
+    profissional_id = db.Column(db.Integer, db.ForeignKey("profissionais.id"), nullable=False, index=True)
+    dia_semana = db.Column(db.Integer, nullable=False) # 0 = segunda ... 6 = domingo
+    hora_inicio = db.Column(db.Time, nullable=False)
+    hora_fim = db.Column(db.Time, nullable=False)
+    duracao_minutos = db.Column(db.Integer, nullable=False, default=30) # duração de cada horário
+    ativa = db.Column(db.Boolean, default=True)
+
+# Modelo que representa uma exceção às regras (folga, feriado, bloqueio de período)
+class ExcecaoAgenda(db.Model):
+    __tablename__ = "excecoes_agenda"
+    id = db.Column(db.Integer, primary_key=True)
+    profissional_id = db.Column(db.Integer, db.ForeignKey("profissionais.id"), nullable=False)
+    data = db.Column(db.Date, nullable=False)
+    hora_inicio = db.Column(db.Time, nullable=True) # nulo = bloqueia o dia inteiro
+    hora_fim = db.Column(db.Time, nullable=True)
+    motivo = db.Column(db.String(120), nullable=True)
+
+    __table_args__ = (db.Index("ix_excecoes_agenda_profissional_data", "profissional_id", "data"),)
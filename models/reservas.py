@@ -0,0 +1,13 @@
+# Reservas temporárias model - RU 4493981
+from extensions import db
+from datetime import datetime
+
+# Modelo que representa a reserva temporária de um horário durante o agendamento
+# (o paciente segura o horário por alguns minutos enquanto confirma a consulta)
+class ReservaHorario(db.Model):
+    __tablename__ = "reservas_horarios"
+    id = db.Column(db.Integer, primary_key=True)
+    horario_id = db.Column(db.Integer, db.ForeignKey("horarios.id"), unique=True, nullable=False) # um horário só pode ter uma reserva
+    paciente_id = db.Column(db.Integer, db.ForeignKey("pacientes.id"), nullable=False)
+    expira_em = db.Column(db.DateTime, nullable=False, index=True) # após essa data/hora a reserva deixa de valer
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
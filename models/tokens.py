@@ -0,0 +1,15 @@
+# Tokens revogados model - RU 4493981
+from extensions import db
+from datetime import datetime
+
+# Modelo da lista de tokens JWT revogados (logout). É a fonte da verdade entre processos;
+# cada processo mantém uma cópia em memória (utils/tokens.py). As linhas podem ser
+# apagadas depois de expira_em, quando o próprio token já não é mais aceito.
+class TokenRevogado(db.Model):
+    __tablename__ = "tokens_revogados"
+    id = db.Column(db.Integer, primary_key=True) # crescente: marca até onde cada processo já sincronizou
+    jti = db.Column(db.String(36), unique=True, nullable=False) # identificador único do token
+    tipo = db.Column(db.String(10), nullable=False) # access, refresh
+    expira_em = db.Column(db.DateTime, nullable=False, index=True) # expiração original do token
+    revogado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    __table_args__ = {"sqlite_autoincrement": True} # ids não são reaproveitados após a limpeza
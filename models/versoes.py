@@ -0,0 +1,12 @@
+# Versões de recursos model - RU 4493981
+from extensions import db
+from datetime import datetime
+
+# Modelo que guarda um contador de versão por recurso (ex.: notificações de um paciente).
+# O contador é incrementado na mesma transação das escritas e usado para montar o ETag
+# das listagens, permitindo responder 304 sem consultar nem serializar os dados.
+class VersaoRecurso(db.Model):
+    __tablename__ = "versoes_recursos"
+    chave = db.Column(db.String(120), primary_key=True) # ex.: "notificacoes:12", "horarios:2030-01-10:3"
+    versao = db.Column(db.Integer, nullable=False, default=1)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -1,15 +1,28 @@
 # Administracao routes - RU 4493981
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash
 from extensions import db
-from models.administracao import Leito, Internacao, RelatorioFinanceiro, Suprimento
+from models.administracao import Leito, Internacao, RelatorioFinanceiro, Suprimento, MovimentacaoEstoque
 from models.pacientes import Paciente
 from models.profissionais import Profissional
 from datetime import datetime
 
 from models.usuarios import Usuario
-from .decorators import role_required
+from .decorators import role_required, somente_leitura
+from utils.paginacao import filtrar_periodo, paginar
+from utils.streaming import pedido_stream, resposta_stream
+from utils.leitos import indice_leitos
+from utils.senhas import servico_senhas
+from utils.internacoes import LeitoIndisponivel, efetivar_internacao, efetivar_alta
+from utils.estoque import (
+    SuprimentoNaoEncontrado, EstoqueInsuficiente, ler_quantidade, consumir, repor, consumir_lote, estoque_baixo
+)
+from utils.financeiro import registrar_relatorio, calcular_totais, reconstruir_totais
+from utils.censo import ler_periodo, censo_diario, ocupacao_por_tipo, tempo_medio_permanencia, ocupante_em
+from utils.projecoes import (
+    pacientes_listagem, serializar_paciente, profissionais_listagem, serializar_profissional,
+    internacoes_listagem, serializar_internacao, relatorios_listagem, serializar_relatorio
+)
 
 # Cria um blueprint para agrupar todas as rotas de administração
 administracao_bp = Blueprint("administracao", __name__, url_prefix="/administracao")
@@ -57,7 +70,7 @@ def cadastrar_paciente_admin():
         data_nascimento=datetime.strptime(data['data_nascimento'], "%Y-%m-%d").date(),
         telefone=dados.get("telefone"),
         email=dados.get("email"),
-        senha=generate_password_hash(dados["senha"]), # Criptografa senha
+        senha=servico_senhas.gerar(dados["senha"]), # Criptografa senha
     )
     db.session.add(p)
     db.session.commit()
@@ -68,17 +81,14 @@ def cadastrar_paciente_admin():
 @jwt_required()
 @role_required("admin")
 def listar_pacientes():
-    pacientes = Paciente.query.all()
-    result = []
-    for p in pacientes:
-        result.append({
-            "id": p.id,
-            "nome": p.nome,
-            "cpf": p.cpf,
-            "email": p.email,      
-            "data_nascimento": p.data_nascimento.strftime("%Y-%m-%d") if p.data_nascimento else None,
-            "telefone": p.telefone
-        })
+    # Lista completa, paginada por id (limite / cursor) ou em streaming (stream=1)
+    # Seleciona só as colunas exibidas (read model), sem carregar entidades
+    if pedido_stream(request.args):
+        return resposta_stream(pacientes_listagem().order_by(Paciente.id), serializar_paciente)
+    try:
+        result = paginar(pacientes_listagem(), (Paciente.id,), request.args, serializar_paciente)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
     return jsonify(result), 200
 
 # ---------------------- CADASTRAR PROFISSIONAIS ----------------------
@@ -107,7 +117,7 @@ def cadastrar_profissional_admin():
         crm=dados.get("crm"),
         especialidade=dados.get("especialidade"),
         email=dados["email"],
-        senha = generate_password_hash(dados.get("senha")), 
+        senha = servico_senhas.gerar(dados.get("senha")), 
         tipo=dados.get("tipo","medico")
     )
     db.session.add(prof)
@@ -119,15 +129,8 @@ def cadastrar_profissional_admin():
 @jwt_required()
 @role_required("admin")
 def listar_profissionais():
-    profissionais = Profissional.query.all()
-    result = []
-    for prof in profissionais:
-        result.append({
-            "id": prof.id,
-            "nome": prof.nome,
-            "tipo": prof.tipo,
-            "crm": prof.crm
-        })
+    # Seleciona só as colunas exibidas (read model), sem carregar entidades
+    result = [serializar_profissional(prof) for prof in profissionais_listagem()]
     return jsonify(result), 200
 
 # ---------------------- CADASTRAR LEITOS ----------------------
@@ -147,6 +150,7 @@ def cadastrar_leito():
     l = Leito(numero=data["numero"], tipo=data.get("tipo"))
     db.session.add(l)
     db.session.commit()
+    indice_leitos.registrar_leito(l.id, l.numero, l.tipo)
     return jsonify({"msg": "Leito cadastrado com sucesso!", "id": l.id}), 201
 
 # ---------------------- LISTAR LEITOS ----------------------
@@ -155,55 +159,88 @@ def cadastrar_leito():
 @role_required("admin")
 def listar_leitos():
     _ = get_user_id()
-    leitos = Leito.query.all()
-    resultado = []
-
-    for l in leitos:
-        # Verifica se há uma internação ativa nesse leito
-        internacao_ativa = Internacao.query.filter_by(leito_id=l.id, data_fim=None).first()
 
+    # Quadro de ocupação em memória (carregado com um único LEFT JOIN leitos x internações ativas)
+    resultado = []
+    for l in indice_leitos.quadro():
         resultado.append({
-            "id": l.id,
-            "numero": l.numero,
-            "tipo": l.tipo,
-            "ocupado": "Sim" if internacao_ativa else "Não",
-            "paciente_id": internacao_ativa.paciente_id if internacao_ativa else None
+            "id": l["id"],
+            "numero": l["numero"],
+            "tipo": l["tipo"],
+            "ocupado": "Sim" if l["ocupado"] else "Não",
+            "paciente_id": l["paciente_id"]
         })
 
     return jsonify(resultado), 200
 
+# ---------------------- RESUMO DE LEITOS POR TIPO ----------------------
+@administracao_bp.route("/leitos/resumo", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+def resumo_leitos():
+    """
+    Retorna a quantidade de leitos livres e ocupados por tipo, a partir do índice em memória.
+    """
+    _ = get_user_id()
+    tipos = indice_leitos.resumo()
+    return jsonify({
+        "tipos": tipos,
+        "livres": sum(t["livres"] for t in tipos),
+        "ocupados": sum(t["ocupados"] for t in tipos),
+        "total": sum(t["total"] for t in tipos)
+    }), 200
+
 # ---------------------- INICIAR INTERNAÇÃO ----------------------
 @administracao_bp.route("/internacoes", methods=["POST"])
 @jwt_required()
 @role_required("admin")
 def iniciar_internacao():
+    """
+    Interna um paciente em um leito específico (leito_id) ou, com tipo, em qualquer
+    leito livre daquele tipo, escolhido automaticamente (preferencias: lista opcional
+    de leito_id a tentar primeiro). O leito é ocupado com UPDATE condicional, então
+    duas internações simultâneas nunca recebem o mesmo leito.
+    """
     _ = get_user_id()
     dados = request.get_json() or {}
-    # Verifica se o leito existe
-    leito = Leito.query.get(dados["leito_id"])
-    if not leito:
-        return jsonify({"msg": "Leito não encontrado"}), 404
+    leito_id, tipo = dados.get("leito_id"), dados.get("tipo")
+    if not leito_id and not tipo:
+        return jsonify({"msg": "Informe leito_id ou tipo do leito"}), 400
+
+    # preferencias vai direto para a alocação: só aceita lista de ids de leito (inteiros)
+    preferencias = dados.get("preferencias") or []
+    if not isinstance(preferencias, list) or any(type(p) is not int for p in preferencias):
+        return jsonify({"msg": "preferencias deve ser uma lista de leito_id (inteiros)"}), 400
 
-    # Verifica se já está ocupado
-    if leito.ocupado:
-        return jsonify({"msg": "Leito ocupado"}), 400
+    if leito_id:
+        # Verifica se o leito existe
+        leito = Leito.query.get(leito_id)
+        if not leito:
+            return jsonify({"msg": "Leito não encontrado"}), 404
 
     # Verifica se o paciente existe
-    paciente = Paciente.query.get(dados["paciente_id"])
+    paciente = Paciente.query.get(dados.get("paciente_id"))
     if not paciente:
         return jsonify({"msg": "Paciente não encontrado"}), 404
 
-    # Cria a internação
-    leito.ocupado = True
-    intern = Internacao(paciente_id=paciente.id, leito_id=leito.id)
-    db.session.add(intern)
+    # Ocupa o leito (informado ou alocado) e cria a internação na mesma transação
+    try:
+        intern = efetivar_internacao(
+            paciente.id, leito_id=leito_id, tipo=tipo, preferencias=preferencias
+        )
+    except LeitoIndisponivel:
+        if leito_id:
+            return jsonify({"msg": "Leito ocupado"}), 400
+        return jsonify({"msg": f"Nenhum leito livre do tipo {tipo}"}), 409
+
     db.session.commit()
+    indice_leitos.ocupar(intern.leito_id, intern.id, paciente.id)
 
     return jsonify({
         "msg": "Internação iniciada",
         "id": intern.id,
         "paciente": paciente.nome,
-        "leito_id": leito.id
+        "leito_id": intern.leito_id
     }), 201
 
 # ---------------------- ENCERRAR INTERNAÇÃO ----------------------
@@ -232,10 +269,11 @@ def encerrar_internacao(id):
     if not leito:
         return jsonify({"msg": "Leito não encontrado para esta internação"}), 404
 
-    # Encerrar a internação
-    intern.data_fim = datetime.utcnow()
-    leito.ocupado = False
+    # Encerra a internação e libera o leito com UPDATEs condicionais (evita alta dupla)
+    if not efetivar_alta(intern):
+        return jsonify({"msg": "Esta internação já foi encerrada"}), 400
     db.session.commit()
+    indice_leitos.liberar(leito.id)
 
     return jsonify({
         "msg": "Internação encerrada. Alta do paciente.",
@@ -248,29 +286,119 @@ def encerrar_internacao(id):
 @administracao_bp.route("/internacoes", methods=["GET"])
 @jwt_required()
 @role_required("admin")
+@somente_leitura
 def listar_internacoes():
-    internacoes = Internacao.query.all()
-    result = []
-    for i in internacoes:
-        result.append({
-            "id": i.id,
-            "paciente_id": i.paciente_id,
-            "leito_id": i.leito_id,
-            "data_inicio": i.data_inicio.strftime("%Y-%m-%d %H:%M:%S") if i.data_inicio else None,
-            "data_fim": i.data_fim.strftime("%Y-%m-%d %H:%M:%S") if i.data_fim else None,
-            "status": "Ativa" if not i.data_fim else "Encerrada"
-        })
+    # Filtros opcionais data_inicio / data_fim (sobre o início da internação),
+    # paginação por limite / cursor ou streaming (stream=1)
+    try:
+        query = filtrar_periodo(internacoes_listagem(), Internacao.data_inicio, request.args)
+        if pedido_stream(request.args):
+            return resposta_stream(query.order_by(Internacao.id), serializar_internacao)
+        result = paginar(query, (Internacao.data_inicio, Internacao.id), request.args, serializar_internacao, descendente=True)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
     return jsonify(result), 200
 
+# ---------------------- CENSO DIÁRIO ----------------------
+@administracao_bp.route("/analises/censo", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+@somente_leitura
+def analise_censo():
+    """
+    Censo diário (pacientes internados ao fim de cada dia), admissões e altas por dia.
+    Parâmetros: data_inicio, data_fim (YYYY-MM-DD) e tipo de leito (opcionais).
+    """
+    _ = get_user_id()
+    try:
+        inicio, fim = ler_periodo(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    return jsonify(censo_diario(inicio, fim, request.args.get("tipo"))), 200
+
+# ---------------------- TAXA DE OCUPAÇÃO POR TIPO ----------------------
+@administracao_bp.route("/analises/ocupacao", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+@somente_leitura
+def analise_ocupacao():
+    """
+    Taxa de ocupação por tipo de leito no período (horas-leito ocupadas / disponíveis).
+    """
+    _ = get_user_id()
+    try:
+        inicio, fim = ler_periodo(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    return jsonify({"data_inicio": inicio, "data_fim": fim, "tipos": ocupacao_por_tipo(inicio, fim)}), 200
+
+# ---------------------- TEMPO MÉDIO DE PERMANÊNCIA ----------------------
+@administracao_bp.route("/analises/permanencia", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+@somente_leitura
+def analise_permanencia():
+    """
+    Tempo médio e mediano de permanência (dias) das internações com alta no período.
+    """
+    _ = get_user_id()
+    try:
+        inicio, fim = ler_periodo(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    resultado = tempo_medio_permanencia(inicio, fim, request.args.get("tipo"))
+    return jsonify(dict(resultado, data_inicio=inicio, data_fim=fim)), 200
+
+# ---------------------- OCUPANTE DO LEITO EM UM MOMENTO ----------------------
+@administracao_bp.route("/analises/leitos/<int:leito_id>/ocupante", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+def analise_ocupante(leito_id):
+    """
+    Retorna quem estava internado no leito no momento informado (?momento=YYYY-MM-DDTHH:MM:SS;
+    padrão: agora).
+    """
+    _ = get_user_id()
+    if not Leito.query.get(leito_id):
+        return jsonify({"msg": "Leito não encontrado"}), 404
+    try:
+        momento = datetime.fromisoformat(request.args["momento"]) if request.args.get("momento") else datetime.utcnow()
+    except ValueError:
+        return jsonify({"msg": "Formato de momento inválido. Use YYYY-MM-DDTHH:MM:SS"}), 400
+
+    ocupante = ocupante_em(leito_id, momento)
+    if ocupante is None:
+        return jsonify({"leito_id": leito_id, "momento": momento, "ocupado": False}), 200
+    return jsonify({
+        "leito_id": leito_id,
+        "momento": momento,
+        "ocupado": True,
+        "internacao_id": ocupante.id,
+        "paciente_id": ocupante.paciente_id,
+        "paciente": ocupante.nome,
+        "data_inicio": ocupante.data_inicio,
+        "data_fim": ocupante.data_fim
+    }), 200
+
 # ---------------------- CADASTRAR SUPRIMENTOS ----------------------
 @administracao_bp.route("/suprimentos", methods=["POST"])
 @jwt_required()
 @role_required("admin")
 def cadastrar_suprimento():
-    _ = get_user_id()
+    usuario_id = get_user_id()
     dados = request.get_json() or {}
-    s = Suprimento(nome=dados["nome"], quantidade=dados.get("quantidade", 0), descricao=dados.get("descricao"))
+    s = Suprimento(
+        nome=dados["nome"], quantidade=dados.get("quantidade", 0), descricao=dados.get("descricao"),
+        estoque_minimo=dados.get("estoque_minimo", 0)
+    )
     db.session.add(s)
+    db.session.flush()
+    # Estoque inicial entra no livro de movimentações, para que o livro feche com o saldo
+    if s.quantidade:
+        db.session.add(MovimentacaoEstoque(
+            suprimento_id=s.id, tipo="entrada", quantidade=s.quantidade, saldo=s.quantidade,
+            motivo="Estoque inicial", usuario_id=usuario_id
+        ))
     db.session.commit()
     return jsonify({"msg": "Suprimento cadastrado", "id": s.id}), 201
 
@@ -280,19 +408,132 @@ def cadastrar_suprimento():
 @role_required("admin")
 def listar_suprimentos():
     _ = get_user_id()
-    suprimentos = Suprimento.query.all()
 
-    resultado = []
-    for s in suprimentos:
-        resultado.append({
+    # Lista completa ou paginada por id (limite / cursor)
+    def serializar(s):
+        return {
             "id": s.id,
             "nome": s.nome,
             "quantidade": s.quantidade,
+            "estoque_minimo": s.estoque_minimo,
             "descricao": s.descricao if hasattr(s, "descricao") else None
-        })
+        }
+    try:
+        resultado = paginar(Suprimento.query, (Suprimento.id,), request.args, serializar)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
 
     return jsonify(resultado), 200
 
+# ---------------------- CONSUMIR SUPRIMENTO ----------------------
+@administracao_bp.route("/suprimentos/<int:id>/consumo", methods=["POST"])
+@jwt_required()
+@role_required("admin")
+def consumir_suprimento(id):
+    """
+    Dá baixa de `quantidade` unidades do suprimento (UPDATE atômico; 409 se não houver estoque).
+    """
+    usuario_id = get_user_id()
+    dados = request.get_json() or {}
+    try:
+        saldo = consumir(id, ler_quantidade(dados.get("quantidade")), dados.get("motivo"), usuario_id)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    except SuprimentoNaoEncontrado:
+        return jsonify({"msg": "Suprimento não encontrado"}), 404
+    except EstoqueInsuficiente as e:
+        return jsonify({"msg": "Estoque insuficiente", "suprimento_id": id, "disponivel": e.disponivel}), 409
+    db.session.commit()
+    return jsonify({"msg": "Consumo registrado", "id": id, "quantidade": saldo}), 200
+
+# ---------------------- REPOR SUPRIMENTO ----------------------
+@administracao_bp.route("/suprimentos/<int:id>/reposicao", methods=["POST"])
+@jwt_required()
+@role_required("admin")
+def repor_suprimento(id):
+    """
+    Dá entrada de `quantidade` unidades no estoque do suprimento.
+    """
+    usuario_id = get_user_id()
+    dados = request.get_json() or {}
+    try:
+        saldo = repor(id, ler_quantidade(dados.get("quantidade")), dados.get("motivo"), usuario_id)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    except SuprimentoNaoEncontrado:
+        return jsonify({"msg": "Suprimento não encontrado"}), 404
+    db.session.commit()
+    return jsonify({"msg": "Reposição registrada", "id": id, "quantidade": saldo}), 200
+
+# ---------------------- CONSUMIR LOTE DE SUPRIMENTOS ----------------------
+@administracao_bp.route("/suprimentos/consumo", methods=["POST"])
+@jwt_required()
+@role_required("admin")
+def consumir_lote_suprimentos():
+    """
+    Dá baixa em um carrinho inteiro ({"itens": [{"suprimento_id", "quantidade"}], "motivo"})
+    em uma única transação: se faltar qualquer item, nada é consumido.
+    """
+    usuario_id = get_user_id()
+    dados = request.get_json() or {}
+    try:
+        saldos = consumir_lote(dados.get("itens") or [], dados.get("motivo"), usuario_id)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    except SuprimentoNaoEncontrado as e:
+        return jsonify({"msg": "Suprimento não encontrado", "suprimento_id": e.suprimento_id}), 404
+    except EstoqueInsuficiente as e:
+        return jsonify({"msg": "Estoque insuficiente", "suprimento_id": e.suprimento_id, "disponivel": e.disponivel}), 409
+    db.session.commit()
+    return jsonify({
+        "msg": "Consumo registrado",
+        "itens": [{"suprimento_id": sid, "quantidade": saldo} for sid, saldo in saldos.items()]
+    }), 200
+
+# ---------------------- MOVIMENTAÇÕES DE SUPRIMENTO ----------------------
+@administracao_bp.route("/suprimentos/<int:id>/movimentacoes", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+def listar_movimentacoes_suprimento(id):
+    """
+    Livro de movimentações do suprimento (mais recentes primeiro), com filtros
+    data_inicio / data_fim e paginação por limite / cursor.
+    """
+    _ = get_user_id()
+    if not Suprimento.query.get(id):
+        return jsonify({"msg": "Suprimento não encontrado"}), 404
+
+    def serializar(m):
+        return {
+            "id": m.id,
+            "tipo": m.tipo,
+            "quantidade": m.quantidade,
+            "saldo": m.saldo,
+            "motivo": m.motivo,
+            "usuario_id": m.usuario_id,
+            "criado_em": m.criado_em
+        }
+    try:
+        query = filtrar_periodo(MovimentacaoEstoque.query.filter_by(suprimento_id=id), MovimentacaoEstoque.criado_em, request.args)
+        resultado = paginar(query, (MovimentacaoEstoque.criado_em, MovimentacaoEstoque.id), request.args, serializar, descendente=True)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    return jsonify(resultado), 200
+
+# ---------------------- ESTOQUE BAIXO ----------------------
+@administracao_bp.route("/suprimentos/estoque-baixo", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+def listar_estoque_baixo():
+    """
+    Suprimentos com quantidade igual ou abaixo do estoque mínimo, do mais crítico ao menos crítico.
+    """
+    _ = get_user_id()
+    return jsonify([
+        {"id": s.id, "nome": s.nome, "quantidade": s.quantidade, "estoque_minimo": s.estoque_minimo}
+        for s in estoque_baixo()
+    ]), 200
+
 # ---------------------- DELETAR SUPRIMENTOS ----------------------
 @administracao_bp.route("/suprimentos/<int:id>", methods=["DELETE"])
 @jwt_required()
@@ -305,7 +546,8 @@ def deletar_suprimento(id):
     if not suprimento:
         return jsonify({"msg": "Suprimento não encontrado"}), 404
 
-    # Remove o suprimento
+    # Remove o suprimento e seu livro de movimentações
+    MovimentacaoEstoque.query.filter_by(suprimento_id=id).delete(synchronize_session=False)
     db.session.delete(suprimento)
     db.session.commit()
 
@@ -318,8 +560,11 @@ def deletar_suprimento(id):
 def adicionar_relatorio():
     _ = get_user_id()
     dados = request.get_json() or {}
-    r = RelatorioFinanceiro(tipo=dados["tipo"], descricao=dados["descricao"], valor=dados["valor"])
-    db.session.add(r)
+    # Registra o relatório e atualiza os totais diários na mesma transação
+    try:
+        r = registrar_relatorio(dados["tipo"], dados["descricao"], dados["valor"])
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
     db.session.commit()
     return jsonify({"msg": "Relatório financeiro registrado com sucesso!", "id": r.id}), 201
 
@@ -327,17 +572,49 @@ def adicionar_relatorio():
 @administracao_bp.route("/admin/relatorios", methods=["GET"])
 @jwt_required()
 @role_required("admin")
+@somente_leitura
 def listar_relatorios():
     _ = get_user_id()
     tipo = request.args.get("tipo")
-    q = RelatorioFinanceiro.query
+    q = relatorios_listagem()
     if tipo:
-        q = q.filter_by(tipo=tipo)
-    relatorios = q.all()
-    return jsonify([{
-        "id": r.id,
-        "tipo": r.tipo,
-        "descricao": r.descricao,
-        "valor": r.valor,
-        "data": r.data.strftime("%Y-%m-%d %H:%M")
-    } for r in relatorios])
+        q = q.filter(RelatorioFinanceiro.tipo == tipo)
+    # Filtros opcionais data_inicio / data_fim, paginação por limite / cursor ou streaming (stream=1)
+    try:
+        q = filtrar_periodo(q, RelatorioFinanceiro.data, request.args)
+        if pedido_stream(request.args):
+            return resposta_stream(q.order_by(RelatorioFinanceiro.id), serializar_relatorio)
+        relatorios = paginar(q, (RelatorioFinanceiro.data, RelatorioFinanceiro.id), request.args, serializar_relatorio, descendente=True)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    return jsonify(relatorios)
+
+# ---------------------- TOTAIS DOS RELATORIOS ----------------------
+@administracao_bp.route("/admin/relatorios/totais", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+@somente_leitura
+def totais_relatorios():
+    """
+    Totais dos relatórios financeiros agrupados por tipo, mês ou dia (?agrupar=tipo|mes|dia),
+    com filtros opcionais tipo e data_inicio / data_fim. Valores como string decimal exata.
+    """
+    _ = get_user_id()
+    try:
+        totais = calcular_totais(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    return jsonify(totais), 200
+
+# ---------------------- RECONSTRUIR TOTAIS DOS RELATORIOS ----------------------
+@administracao_bp.route("/admin/relatorios/totais/reconstruir", methods=["POST"])
+@jwt_required()
+@role_required("admin")
+def reconstruir_totais_relatorios():
+    """
+    Recalcula os totais diários a partir de todos os relatórios financeiros.
+    """
+    _ = get_user_id()
+    linhas = reconstruir_totais()
+    db.session.commit()
+    return jsonify({"msg": "Totais financeiros reconstruídos", "linhas": linhas}), 200
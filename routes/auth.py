@@ -1,9 +1,12 @@
 # Auth routes - RU 4493981
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity, decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
 from extensions import db
 from models.usuarios import Usuario
+from utils.senhas import servico_senhas
+from utils.tokens import emitir_tokens, renovar_access_token, lista_revogacao
 
 # Cria um blueprint para agrupar todas as rotas de autenticação
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
@@ -29,7 +32,7 @@ def register():
         return jsonify({"msg": "Email já cadastrado"}), 409
     
     # Criação do usuário com senha criptografada
-    u = Usuario(nome=nome, email=email, senha=generate_password_hash(senha), role=role)
+    u = Usuario(nome=nome, email=email, senha=servico_senhas.gerar(senha), role=role)
     db.session.add(u)
     db.session.commit()
 
@@ -52,14 +55,55 @@ def login():
     
     # Verifica se o usuário existe e se a senha está correta
     u = Usuario.query.filter_by(email=email).first()
-    if not u or not check_password_hash(u.senha, senha):
+    if not u or not servico_senhas.verificar(u.senha, senha):
         return jsonify({"msg": "Credenciais inválidas"}), 401
+
+    # Refaz o hash se o método / custo do KDF mudou desde o cadastro
+    if servico_senhas.atualizar_hash(u, senha):
+        db.session.commit()
     
     # Criação de claims adicionais para o token
     claims = {"role": u.role, "email": u.email}
 
-    # Gera o token JWT
-    token = create_access_token(identity=str(u.id), additional_claims=claims)
+    # Gera o access token (curta duração) e o refresh token
+    token, refresh = emitir_tokens(str(u.id), claims)
+
+    # Retorna tokens e dados do usuário
+    return jsonify({"access_token": token, "refresh_token": refresh, "usuario": {"id": u.id, "nome": u.nome, "email": u.email, "role": u.role}}), 200
+
+@auth_bp.route("/refresh", methods=["POST"])
+@jwt_required(refresh=True)
+def refresh():
+    """
+    Rota para gerar um novo access token a partir do refresh token
+    (enviado no cabeçalho Authorization), sem repetir a verificação de senha.
+    Vale para usuários, pacientes e profissionais.
+    """
+    token = renovar_access_token(get_jwt_identity(), get_jwt())
+    return jsonify({"access_token": token}), 200
+
+@auth_bp.route("/logout", methods=["POST"])
+@jwt_required(verify_type=False)
+def logout():
+    """
+    Rota para revogar o token enviado no cabeçalho Authorization.
+    Recebe JSON opcional com refresh_token, revogado junto (logout completo).
+    """
+    atual = get_jwt()
+    lista_revogacao.revogar(atual)
 
-    # Retorna token e dados do usuário
-    return jsonify({"access_token": token, "usuario": {"id": u.id, "nome": u.nome, "email": u.email, "role": u.role}}), 200
+    dados = request.get_json(silent=True) or {}
+    if dados.get("refresh_token"):
+        try:
+            payload = decode_token(dados["refresh_token"])
+        except ExpiredSignatureError:
+            payload = None # já expirado: não precisa ser revogado
+        except (InvalidTokenError, JWTExtendedException):
+            return jsonify({"msg": "refresh_token inválido"}), 400
+        if payload is not None:
+            if payload.get("type") != "refresh" or payload.get("sub") != atual.get("sub"):
+                return jsonify({"msg": "refresh_token inválido"}), 400
+            lista_revogacao.revogar(payload)
+
+    db.session.commit()
+    return jsonify({"msg": "Logout realizado"}), 200
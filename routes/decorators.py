@@ -1,7 +1,8 @@
 # Decorators routes - RU 4493981
 from functools import wraps # Para preservar assinatura da função decorada
-from flask import jsonify
+from flask import jsonify, request, make_response, current_app, g
 from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from utils.versoes import calcular_etag
 
 def role_required(*roles):
     """
@@ -43,3 +44,65 @@ def role_required(*roles):
             return fn(*args, **kwargs)
         return decorated
     return wrapper
+
+
+def etag_condicional(chaves, extra=None, autorizar=None):
+    """
+    Decorator de GET condicional baseado na versão dos recursos (utils/versoes.py).
+
+    Parâmetros:
+        chaves: função que recebe os parâmetros da rota e retorna as chaves de versão do recurso.
+        extra: função opcional com dados que alteram a resposta sem escrita no banco.
+        autorizar: função opcional que recebe os parâmetros da rota e retorna uma resposta de erro
+                   (ex.: 403 / 404) ou None se o acesso for permitido.
+
+    Como funciona:
+    - Roda `autorizar` primeiro: um 304 nunca é devolvido a quem não pode ver o recurso.
+    - Calcula o ETag antes de executar a rota (uma consulta pelas versões).
+    - Se o cliente enviou If-None-Match com o mesmo ETag, retorna 304 sem consultar nem serializar os dados.
+    - Caso contrário, executa a rota e adiciona o ETag às respostas 200.
+
+    Deve ficar abaixo de jwt_required / role_required, para rodar depois da autenticação.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorated(*args, **kwargs):
+            if autorizar:
+                negado = autorizar(**kwargs)
+                if negado is not None:
+                    return negado
+
+            etag = calcular_etag(chaves(**kwargs), extra() if extra else None)
+
+            if request.if_none_match.contains_weak(etag):
+                resposta = current_app.response_class(status=304)
+                resposta.set_etag(etag, weak=True)
+                return resposta
+
+            resposta = make_response(fn(*args, **kwargs))
+            if resposta.status_code == 200:
+                resposta.set_etag(etag, weak=True)
+            return resposta
+        return decorated
+    return wrapper
+
+
+def somente_leitura(fn):
+    """
+    Decorator que marca a rota como somente leitura: suas consultas vão para uma réplica
+    (SQLALCHEMY_BINDS, ver utils/replicas.py), aliviando o banco principal.
+
+    Como funciona:
+    - Marca a requisição (g.somente_leitura); a sessão envia os SELECTs seguintes à réplica.
+    - Se a rota escrever algo, a sessão volta ao banco principal até o fim da requisição.
+    - Sem réplicas configuradas, não muda nada.
+
+    Deve ficar abaixo de jwt_required / role_required (a verificação do token lê o banco
+    principal) e acima de etag_condicional (o ETag precisa vir do mesmo banco que os dados).
+    Não usar em rotas que carregam índices em memória, que ficariam com dados da réplica.
+    """
+    @wraps(fn)
+    def decorated(*args, **kwargs):
+        g.somente_leitura = True
+        return fn(*args, **kwargs)
+    return decorated
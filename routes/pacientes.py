@@ -1,16 +1,33 @@
 # Pacientes routes - RU 4493981
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required
-from werkzeug.security import check_password_hash
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
 from extensions import db
 from models.pacientes import Paciente
+from models.profissionais import Profissional
 from models.agendas import Agenda, Horario
 from models.consulta import Consulta
-from .decorators import role_required
+from .decorators import role_required, etag_condicional
 from models.exames import Exame
 from models.notificacoes import Notificacao
-from datetime import datetime
-from flask import jsonify
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import tuple_, or_, and_
+import heapq
+from itertools import islice
+from utils.disponibilidade import indice_disponibilidade
+from utils.senhas import servico_senhas
+from utils.tokens import emitir_tokens
+from utils.regras_agenda import slots_virtuais, fluxo_slots_virtuais, materializar_horario, periodo_regras, no_periodo_regras
+from utils.reservas import registro_reservas, sem_reserva_de_outro, apagar_reservas_vencidas
+from models.reservas import ReservaHorario
+from models.lista_espera import ListaEspera
+from utils.lista_espera import motor_lista_espera
+from sqlalchemy.exc import IntegrityError
+from utils.paginacao import codificar_cursor, decodificar_cursor, filtrar_periodo, paginar
+from utils.versoes import chave_consultas_paciente, chave_horarios, chave_notificacoes, incrementar_versao, versao_horarios
+import time as _time
+from utils.agendamento import (
+    HorarioIndisponivel, confirmar_agendamento, efetivar_cancelamento, efetivar_remarcacao
+)
 
 # Cria um blueprint para rotas de paciente
 pacientes_bp = Blueprint("pacientes", __name__, url_prefix="/pacientes")
@@ -34,116 +51,469 @@ def login_paciente():
     paciente = Paciente.query.filter_by(email=email).first()
 
     # Se campos preenchidos incorretamente
-    if not paciente or not check_password_hash(paciente.senha, senha):
+    if not paciente or not servico_senhas.verificar(paciente.senha, senha):
         return jsonify({"msg": "Credenciais inválidas"}), 401
 
-    # Gera o token JWT
-    token = create_access_token(
-        identity=str(paciente.id),
-        additional_claims={"tipo": "paciente"} # identifica o tipo de usuário no token
+    # Refaz o hash se o método / custo do KDF mudou desde o cadastro
+    if servico_senhas.atualizar_hash(paciente, senha):
+        db.session.commit()
+
+    # Gera o access token (curta duração) e o refresh token
+    token, refresh = emitir_tokens(
+        str(paciente.id),
+        {"tipo": "paciente"} # identifica o tipo de usuário no token
     )
 
-    # Retorna token e dados do usuário
+    # Retorna tokens e dados do usuário
     return jsonify({
         "access_token": token,
+        "refresh_token": refresh,
         "paciente_id": paciente.id
     }), 200
 
 
 # ---------------------- LISTAR TODOS OS HORÁRIOS DISPONÍVEIS ----------------------
+LIMITE_MAXIMO_HORARIOS = 500 # teto de horários por página na busca paginada
+MAX_DIAS_BUSCA_INDICE = 62 # períodos maiores vão direto ao banco
+
+def _horarios_do_indice(profissional_id, data_inicio, data_fim, chave_cursor, limite):
+    """
+    Monta as mesmas linhas da consulta SQL (agenda_id, data, profissional_id, horario_id, hora)
+    a partir do índice em memória, dia a dia, respeitando cursor, limite e reservas temporárias.
+    """
+    reservados = registro_reservas.reservados()
+    linhas = []
+    data = data_inicio
+    while data <= data_fim:
+        agenda_id, horarios = indice_disponibilidade.obter(profissional_id, data)
+        for horario_id, hora in horarios:
+            if chave_cursor and (data, profissional_id, hora) <= chave_cursor:
+                continue
+            if horario_id in reservados:
+                continue
+            linhas.append((agenda_id, data, profissional_id, horario_id, hora))
+            if limite is not None and len(linhas) > limite:
+                return linhas
+        data += timedelta(days=1)
+    return linhas
+
+def _versao_listagem():
+    """
+    Versões dos horários que a listagem pode conter: dias de agenda e regras do profissional
+    filtrado (ou de todos) no período filtrado. Parâmetros inválidos são tratados como ausentes
+    (a rota responde 400 para eles, sem ETag).
+    """
+    args = request.args
+    try:
+        data_inicio = datetime.strptime(args["data_inicio"], "%Y-%m-%d").date() if args.get("data_inicio") else None
+        data_fim = datetime.strptime(args["data_fim"], "%Y-%m-%d").date() if args.get("data_fim") else None
+    except ValueError:
+        data_inicio = data_fim = None
+    profissional_id = args.get("profissional_id", "")
+    return versao_horarios(int(profissional_id) if profissional_id.isdigit() else None, data_inicio, data_fim)
+
+def _estado_horarios():
+    """
+    Partes da listagem de horários que definem o ETag: as versões dos dias e regras do filtro
+    e o que muda sem escrita no banco (o dia atual, as reservas temporárias vigentes, que expiram
+    sozinhas, e a janela de validade do índice em memória).
+    """
+    ttl = current_app.config["DISPONIBILIDADE_TTL_SEGUNDOS"]
+    return (
+        _versao_listagem(),
+        date.today(),
+        hash(frozenset(registro_reservas.reservados())),
+        int(_time.time() // ttl) if ttl else None,
+    )
+
 @pacientes_bp.route("/agendas/horarios", methods=["GET"])
 @jwt_required()
+@etag_condicional(lambda: [], _estado_horarios)
 def listar_todos_horarios():
     """
-    Retorna todos os horários disponíveis em todas as agendas.
+    Retorna os horários disponíveis em todas as agendas.
+    Usa uma única consulta (Agenda ⋈ Horario) ordenada por data, profissional e hora,
+    intercalada com os horários virtuais gerados pelas regras de agenda.
+
+    Filtros opcionais (query params):
+    - data_inicio / data_fim (YYYY-MM-DD)
+    - profissional_id
+    - especialidade
+    Com profissional_id e um período curto, a busca é servida pelo índice em memória.
+    Paginação opcional (keyset):
+    - limite: quantidade máxima de horários na página
+    - cursor: valor recebido no header X-Next-Cursor da página anterior
     """
-    agendas = Agenda.query.order_by(Agenda.data, Agenda.profissional_id).all()
+    args = request.args
+
+    # Leitura e validação dos parâmetros
+    try:
+        data_inicio = datetime.strptime(args["data_inicio"], "%Y-%m-%d").date() if args.get("data_inicio") else None
+        data_fim = datetime.strptime(args["data_fim"], "%Y-%m-%d").date() if args.get("data_fim") else None
+    except ValueError:
+        return jsonify({"msg": "Formato de data inválido. Use YYYY-MM-DD"}), 400
+
+    profissional_id = args.get("profissional_id")
+    if profissional_id:
+        if not profissional_id.isdigit():
+            return jsonify({"msg": "profissional_id inválido"}), 400
+        profissional_id = int(profissional_id)
+
+    chave_cursor = None
+    if args.get("cursor"):
+        try:
+            chave_cursor = decodificar_cursor(args["cursor"], date, int, time)
+        except ValueError:
+            return jsonify({"msg": "Cursor inválido"}), 400
+
+    # Sem limite/cursor mantém o comportamento antigo (lista completa)
+    paginado = bool(args.get("limite") or args.get("cursor"))
+    limite = None
+    if paginado:
+        try:
+            limite = min(int(args.get("limite", 100)), LIMITE_MAXIMO_HORARIOS)
+        except ValueError:
+            return jsonify({"msg": "limite deve ser um número inteiro"}), 400
+        if limite < 1:
+            return jsonify({"msg": "limite deve ser maior que zero"}), 400
+
+    # Um profissional em um período curto é atendido pelo índice em memória
+    usar_indice = (
+        profissional_id and data_inicio and data_fim and not args.get("especialidade")
+        and (data_fim - data_inicio).days <= MAX_DIAS_BUSCA_INDICE
+    )
+    if usar_indice:
+        linhas = _horarios_do_indice(profissional_id, data_inicio, data_fim, chave_cursor, limite)
+    else:
+        query = db.session.query(
+            Agenda.id, Agenda.data, Agenda.profissional_id, Horario.id, Horario.hora
+        ).join(Horario, Horario.agenda_id == Agenda.id).filter(Horario.disponivel == True, sem_reserva_de_outro())
+
+        if data_inicio:
+            query = query.filter(Agenda.data >= data_inicio)
+        if data_fim:
+            query = query.filter(Agenda.data <= data_fim)
+        if profissional_id:
+            query = query.filter(Agenda.profissional_id == profissional_id)
+        if args.get("especialidade"):
+            query = query.join(Profissional, Profissional.id == Agenda.profissional_id) \
+                         .filter(Profissional.especialidade == args["especialidade"])
+
+        # Keyset: continua a partir do último horário entregue
+        if chave_cursor:
+            query = query.filter(tuple_(Agenda.data, Agenda.profissional_id, Horario.hora) > tuple_(*chave_cursor))
+
+        query = query.order_by(Agenda.data, Agenda.profissional_id, Horario.hora)
+        if paginado:
+            query = query.limit(limite + 1) # busca um a mais para saber se há próxima página
+
+        # Horários virtuais (regras de agenda) no período, intercalados na mesma ordem
+        hoje, ultimo_dia = periodo_regras()
+        inicio_virtual = max(filter(None, [data_inicio, hoje, chave_cursor and chave_cursor[0]]))
+        fim_virtual = min(filter(None, [data_fim, ultimo_dia]))
+        virtuais = []
+        if inicio_virtual <= fim_virtual:
+            virtuais = [
+                linha for linha in slots_virtuais(inicio_virtual, fim_virtual, profissional_id, args.get("especialidade"))
+                if not chave_cursor or (linha[1], linha[2], linha[4]) > chave_cursor
+            ]
+
+        linhas = list(heapq.merge(query.all(), virtuais, key=lambda linha: (linha[1], linha[2], linha[4])))
+        if paginado:
+            linhas = linhas[:limite + 1]
+
+    proximo_cursor = None
+    if paginado and len(linhas) > limite:
+        linhas = linhas[:limite]
+        ultima = linhas[-1]
+        proximo_cursor = codificar_cursor(ultima[1], ultima[2], ultima[4])
+
+    # Agrupa as linhas (já ordenadas) por agenda, mantendo o formato de resposta.
+    # Horários virtuais vêm com id None (e agenda_id None se o dia ainda não tem agenda).
+    resultado = []
+    for agenda_id, data, profissional_id, horario_id, hora in linhas:
+        if not resultado or (resultado[-1]["data"], resultado[-1]["profissional_id"]) != (data, profissional_id):
+            resultado.append({
+                "agenda_id": agenda_id,
+                "data": data,
+                "profissional_id": profissional_id,
+                "horarios": []
+            })
+        resultado[-1]["agenda_id"] = resultado[-1]["agenda_id"] or agenda_id
+        resultado[-1]["horarios"].append({"id": horario_id, "hora": hora})
+
+    resposta = jsonify(resultado)
+    if proximo_cursor:
+        resposta.headers["X-Next-Cursor"] = proximo_cursor
+    return resposta, 200
+
+# ---------------------- PRÓXIMOS HORÁRIOS DISPONÍVEIS ----------------------
+LIMITE_MAXIMO_PROXIMOS = 50 # teto de horários retornados pela busca do próximo horário
+
+@pacientes_bp.route("/agendas/proximo", methods=["GET"])
+@jwt_required()
+def proximos_horarios():
+    """
+    Retorna os N horários livres mais próximos entre todos os profissionais
+    que atendem aos filtros (ex.: "próximo horário de cardiologia").
+
+    Query params:
+    - especialidade e/ou tipo (do Profissional) — ao menos um é obrigatório
+    - quantidade: N (padrão 5, máximo 50)
+
+    Os horários materializados vêm de uma consulta já ordenada por (data, hora) com LIMIT N;
+    os horários virtuais das regras são gerados em blocos. As duas sequências
+    são intercaladas (k-way merge) e a busca para ao atingir N.
+    """
+    especialidade = request.args.get("especialidade")
+    tipo = request.args.get("tipo")
+    if not especialidade and not tipo:
+        return jsonify({"msg": "Informe especialidade e/ou tipo"}), 400
+
+    try:
+        quantidade = min(int(request.args.get("quantidade", 5)), LIMITE_MAXIMO_PROXIMOS)
+    except ValueError:
+        return jsonify({"msg": "quantidade deve ser um número inteiro"}), 400
+    if quantidade < 1:
+        return jsonify({"msg": "quantidade deve ser maior que zero"}), 400
+
+    # Profissionais que atendem aos filtros
+    query_prof = db.session.query(Profissional.id, Profissional.nome, Profissional.especialidade)
+    if especialidade:
+        query_prof = query_prof.filter(Profissional.especialidade == especialidade)
+    if tipo:
+        query_prof = query_prof.filter(Profissional.tipo == tipo)
+    profissionais = {prof_id: (nome, esp) for prof_id, nome, esp in query_prof.all()}
+    if not profissionais:
+        return jsonify([]), 200
+
+    agora = datetime.now()
+    hoje = agora.date()
+
+    # Horários materializados: já ordenados pelo banco e limitados a N
+    materializados = db.session.query(
+        Agenda.id, Agenda.data, Agenda.profissional_id, Horario.id, Horario.hora
+    ).join(Horario, Horario.agenda_id == Agenda.id).filter(
+        Horario.disponivel == True,
+        sem_reserva_de_outro(),
+        Agenda.profissional_id.in_(profissionais),
+        or_(Agenda.data > hoje, and_(Agenda.data == hoje, Horario.hora >= agora.time()))
+    ).order_by(Agenda.data, Horario.hora, Agenda.profissional_id).limit(quantidade)
+
+    # Horários virtuais: gerados sob demanda, na mesma ordem
+    fim = periodo_regras()[1]
+    virtuais = (
+        linha for linha in fluxo_slots_virtuais(hoje, fim, list(profissionais))
+        if linha[1] > hoje or linha[4] >= agora.time()
+    )
+
+    intercalados = heapq.merge(materializados.all(), virtuais, key=lambda linha: (linha[1], linha[4], linha[2]))
 
     resultado = []
-    for agenda in agendas:
-        horarios = Horario.query.filter_by(agenda_id=agenda.id, disponivel=True).order_by(Horario.hora).all()
-        if not horarios:
-            continue  # pula agendas sem horários disponíveis
+    for agenda_id, data, profissional_id, horario_id, hora in islice(intercalados, quantidade):
+        nome, esp = profissionais[profissional_id]
         resultado.append({
-            "agenda_id": agenda.id,
-            "data": agenda.data.strftime("%Y-%m-%d"),
-            "profissional_id": agenda.profissional_id,
-            "horarios": [{"id": h.id, "hora": h.hora.strftime("%H:%M:%S")} for h in horarios]
+            "agenda_id": agenda_id,
+            "horario_id": horario_id,
+            "profissional_id": profissional_id,
+            "profissional": nome,
+            "especialidade": esp,
+            "data": data,
+            "hora": hora
         })
 
     return jsonify(resultado), 200
 
 # ---------------------- MARCAR CONSULTA ----------------------
+def _resolver_horario(dados):
+    """
+    Localiza o horário pedido a partir de agenda_id + horario, ou de
+    profissional_id + data + horario (horários gerados por regras de agenda).
+    Horários virtuais são materializados na sessão atual.
+    Retorna ((agenda, horario, materializado), None) ou (None, resposta de erro).
+    """
+    agenda_id = dados.get("agenda_id")
+    profissional_id = dados.get("profissional_id")
+    data_str = dados.get("data")
+    hora_escolhida = dados.get("horario")
+
+    if not hora_escolhida or not (agenda_id or (profissional_id and data_str)):
+        return None, (jsonify({"msg": "agenda_id (ou profissional_id e data) e horario são obrigatórios"}), 400)
+
+    # Verifica se a agenda existe
+    if agenda_id:
+        agenda = Agenda.query.get(agenda_id)
+        if not agenda:
+            return None, (jsonify({"msg": f"Agenda com id {agenda_id} não encontrada"}), 404)
+        profissional_id, data_agenda = agenda.profissional_id, agenda.data
+    else:
+        try:
+            profissional_id = int(profissional_id)
+            data_agenda = datetime.strptime(data_str, "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            return None, (jsonify({"msg": "profissional_id ou data inválidos. Use YYYY-MM-DD para a data"}), 400)
+        agenda = Agenda.query.filter_by(profissional_id=profissional_id, data=data_agenda).first()
+
+    # Converte string para objeto time
+    try:
+        # Se o JSON vier como "09:00" ou "09:00:00", ajusta o formato
+        hora_obj = datetime.strptime(hora_escolhida, "%H:%M").time()
+    except ValueError:
+        try:
+            hora_obj = datetime.strptime(hora_escolhida, "%H:%M:%S").time()
+        except ValueError:
+            return None, (jsonify({"msg": "Formato de horário inválido. Use HH:MM ou HH:MM:SS"}), 400)
+
+    # Busca o horário na agenda; se não existir, tenta o horário virtual das regras
+    horario = Horario.query.filter_by(agenda_id=agenda.id, hora=hora_obj).first() if agenda else None
+    materializado = False
+    if horario is None:
+        # Horários virtuais só podem ser agendados de hoje até o horizonte das regras
+        if not no_periodo_regras(data_agenda):
+            return None, (jsonify({"msg": "Data fora do período de agendamento (de hoje até "
+                                          f"{current_app.config['AGENDA_REGRAS_HORIZONTE_DIAS']} dias)"}), 400)
+        resultado = materializar_horario(profissional_id, data_agenda, hora_obj)
+        if resultado:
+            agenda, horario = resultado
+            materializado = True
+    if not horario or not horario.disponivel:
+        return None, (jsonify({"msg": "Horário não disponível"}), 400)
+
+    return (agenda, horario, materializado), None
+
 @pacientes_bp.route("/consultas", methods=["POST"])
 @jwt_required()
 def marcar_consulta():
     """
     Permite que o paciente marque uma consulta em um horário disponível.
     Recebe: agenda_id, horario, paciente_id
+    Para horários gerados por regras de agenda (sem agenda criada), pode receber
+    profissional_id e data (YYYY-MM-DD) no lugar de agenda_id.
+    Com uma reserva temporária (POST /pacientes/reservas), basta enviar reserva_id e paciente_id.
     """
     data = request.get_json()
-    agenda_id = data.get("agenda_id")
-    hora_escolhida = data.get("horario")
     paciente_id = data.get("paciente_id")
+    reserva_id = data.get("reserva_id")
 
     # Valida campos obrigatórios
-    if not all([agenda_id, hora_escolhida, paciente_id]):
-        return jsonify({"msg": "agenda_id, horario e paciente_id são obrigatórios"}), 400
+    if not paciente_id:
+        return jsonify({"msg": "agenda_id (ou profissional_id e data), horario e paciente_id são obrigatórios"}), 400
 
     # Verifica se o paciente existe
     paciente = Paciente.query.get(paciente_id)
     if not paciente:
         return jsonify({"msg": f"Paciente com id {paciente_id} não encontrado"}), 404
 
-    # Verifica se a agenda existe
-    agenda = Agenda.query.get(agenda_id)
-    if not agenda:
-        return jsonify({"msg": f"Agenda com id {agenda_id} não encontrada"}), 404
-
-    # Converte string para objeto time
+    if reserva_id:
+        # Confirma a reserva: o horário já está garantido para este paciente
+        reserva = ReservaHorario.query.get(reserva_id)
+        if not reserva or reserva.paciente_id != paciente.id or reserva.expira_em <= datetime.utcnow():
+            return jsonify({"msg": "Reserva inválida ou expirada"}), 400
+        horario = Horario.query.get(reserva.horario_id)
+        agenda, materializado = horario.agenda, False
+    else:
+        resultado, erro = _resolver_horario(data)
+        if erro:
+            return erro
+        agenda, horario, materializado = resultado
+
+    # Ocupa o horário (UPDATE condicional) e cria a consulta na mesma transação
     try:
-        # Se o JSON vier como "09:00" ou "09:00:00", ajusta o formato
-        hora_obj = datetime.strptime(hora_escolhida, "%H:%M").time()
-    except ValueError:
-        try:
-            hora_obj = datetime.strptime(hora_escolhida, "%H:%M:%S").time()
-        except ValueError:
-            return jsonify({"msg": "Formato de horário inválido. Use HH:MM ou HH:MM:SS"}), 400
-
-    # Busca horário disponível
-    horario = Horario.query.filter_by(
-        agenda_id=agenda_id, hora=hora_obj, disponivel=True
-    ).first()
-    if not horario:
+        consulta = confirmar_agendamento(paciente.id, agenda, horario)
+    except HorarioIndisponivel:
         return jsonify({"msg": "Horário não disponível"}), 400
 
-    # Bloqueia horário
-    horario.disponivel = False
-
-    # Cria registro da consulta
-    consulta = Consulta(
-        paciente_id=paciente_id,
-        profissional_id=agenda.profissional_id,
-        agenda_id=agenda_id,
-        horario_id=horario.id,
-        data_consulta=agenda.data,
-        hora_consulta=hora_obj,
-        status="Agendada",
-    )
-
-    db.session.add(consulta)
     db.session.commit()
+    registro_reservas.remover(horario.id)
+    if materializado:
+        indice_disponibilidade.invalidar(agenda.profissional_id, agenda.data)
+    else:
+        indice_disponibilidade.remover_horario(agenda.profissional_id, agenda.data, horario.id)
 
     return jsonify({
         "msg": "Consulta marcada com sucesso",
         "consulta_id": consulta.id,
         "paciente_id": paciente_id,
         "profissional_id": consulta.profissional_id,
-        "data": str(consulta.data_consulta),
-        "hora": consulta.hora_consulta.strftime("%H:%M:%S"),
+        "data": consulta.data_consulta,
+        "hora": consulta.hora_consulta,
         "status": consulta.status
     }), 201
 
+# ---------------------- RESERVAR HORÁRIO (temporário) ----------------------
+@pacientes_bp.route("/reservas", methods=["POST"])
+@jwt_required()
+def reservar_horario():
+    """
+    Reserva um horário por alguns minutos (RESERVA_TTL_SEGUNDOS) enquanto o
+    paciente confirma a consulta. O horário some das listagens e só pode ser
+    marcado por quem o reservou; depois, basta enviar reserva_id em POST /pacientes/consultas.
+    Recebe: paciente_id e horario_id, ou os mesmos campos de horário de marcar_consulta.
+    """
+    dados = request.get_json() or {}
+    paciente_id = dados.get("paciente_id")
+    if not paciente_id:
+        return jsonify({"msg": "paciente_id é obrigatório"}), 400
+
+    paciente = Paciente.query.get(paciente_id)
+    if not paciente:
+        return jsonify({"msg": f"Paciente com id {paciente_id} não encontrado"}), 404
+
+    materializado = False
+    if dados.get("horario_id"):
+        horario = Horario.query.get(dados["horario_id"])
+        if not horario or not horario.disponivel:
+            return jsonify({"msg": "Horário não disponível"}), 400
+    else:
+        resultado, erro = _resolver_horario(dados)
+        if erro:
+            return erro
+        agenda, horario, materializado = resultado
+
+    # A restrição unique em horario_id garante uma única reserva ativa por horário
+    apagar_reservas_vencidas(horario.id)
+    existente = ReservaHorario.query.filter_by(horario_id=horario.id).first()
+    if existente and existente.paciente_id != paciente.id:
+        return jsonify({"msg": "Horário reservado por outro paciente"}), 409
+
+    expira_em = datetime.utcnow() + timedelta(seconds=current_app.config["RESERVA_TTL_SEGUNDOS"])
+    reserva = existente or ReservaHorario(horario_id=horario.id, paciente_id=paciente.id)
+    reserva.expira_em = expira_em # renova se o próprio paciente reservar de novo
+    db.session.add(reserva)
+    incrementar_versao(chave_horarios(horario.agenda.profissional_id, horario.agenda.data))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"msg": "Horário reservado por outro paciente"}), 409
+
+    registro_reservas.registrar(horario.id, reserva.id, paciente.id, expira_em)
+    if materializado:
+        # O horário virtual virou um horário real (reservado): recarrega a data no índice
+        indice_disponibilidade.invalidar(agenda.profissional_id, agenda.data)
+
+    return jsonify({
+        "msg": "Horário reservado",
+        "reserva_id": reserva.id,
+        "horario_id": horario.id,
+        "expira_em": expira_em.strftime("%Y-%m-%d %H:%M:%S")
+    }), 201
+
+@pacientes_bp.route("/reservas/<int:reserva_id>", methods=["DELETE"])
+@jwt_required()
+def liberar_reserva(reserva_id):
+    """
+    Desiste da reserva temporária, devolvendo o horário às listagens.
+    """
+    reserva = ReservaHorario.query.get_or_404(reserva_id)
+    horario_id = reserva.horario_id
+    agenda = db.session.get(Horario, horario_id).agenda
+    db.session.delete(reserva)
+    incrementar_versao(chave_horarios(agenda.profissional_id, agenda.data))
+    db.session.commit()
+    registro_reservas.remover(horario_id)
+    return jsonify({"msg": "Reserva liberada", "horario_id": horario_id}), 200
+
 # ---------------------- CANCELAR CONSULTA ----------------------
 @pacientes_bp.route("/consultas/<consulta_id>/cancelar", methods=["PUT"])
 @jwt_required()
@@ -167,14 +537,22 @@ def cancelar_consulta(consulta_id):
     if consulta.status == "Cancelada":
         return jsonify({"msg": "Essa consulta já foi cancelada"}), 400
 
-    # Libera o horário novamente
+    # Cancela e libera o horário com UPDATEs condicionais (evita cancelamento duplo)
     horario = Horario.query.get(consulta.horario_id)
-    if horario:
-        horario.disponivel = True
+    if not efetivar_cancelamento(consulta):
+        return jsonify({"msg": "Essa consulta já foi cancelada"}), 400
 
-    consulta.status = "Cancelada"
     db.session.commit()
 
+    # Atualiza o índice de disponibilidade com o horário liberado
+    if horario:
+        indice_disponibilidade.adicionar_horario(
+            consulta.profissional_id, consulta.data_consulta, horario.agenda_id, horario.id, horario.hora
+        )
+
+    # Oferece o horário liberado à lista de espera (fora da requisição)
+    motor_lista_espera.solicitar(current_app._get_current_object())
+
     return jsonify({
         "msg": "Consulta cancelada com sucesso",
         "consulta_id": consulta.id,
@@ -200,10 +578,7 @@ def remarcar_consulta(consulta_id):
     if consulta.status != "Agendada":
         return jsonify({"msg": "Somente consultas agendadas podem ser remarcadas"}), 400
 
-    # Libera o horário antigo
     horario_antigo = Horario.query.get(consulta.horario_id)
-    if horario_antigo:
-        horario_antigo.disponivel = True
 
     # Verifica se o novo horário existe
     novo_horario = Horario.query.get(novo_horario_id)
@@ -218,11 +593,23 @@ def remarcar_consulta(consulta_id):
     if novo_horario.agenda.profissional_id != consulta.profissional_id:
         return jsonify({"msg": "O novo horário não pertence ao mesmo profissional"}), 400
 
-    # Atualiza a consulta
-    consulta.horario_id = novo_horario_id
-    novo_horario.disponivel = False
+    # Ocupa o novo horário, move a consulta e libera o antigo na mesma transação
+    try:
+        efetivar_remarcacao(consulta, novo_horario)
+    except HorarioIndisponivel:
+        return jsonify({"msg": "Novo horário indisponível"}), 400
+
     db.session.commit()
 
+    # Atualiza o índice: horário antigo volta a ficar livre, o novo sai
+    if horario_antigo:
+        indice_disponibilidade.adicionar_horario(
+            consulta.profissional_id, horario_antigo.agenda.data, horario_antigo.agenda_id,
+            horario_antigo.id, horario_antigo.hora
+        )
+    indice_disponibilidade.remover_horario(consulta.profissional_id, novo_horario.agenda.data, novo_horario.id)
+    motor_lista_espera.solicitar(current_app._get_current_object())
+
     return jsonify({
         "msg": "Consulta remarcada com sucesso",
         "consulta_id": consulta.id,
@@ -231,13 +618,83 @@ def remarcar_consulta(consulta_id):
         "status": consulta.status
     }), 200
 
-# ---------------------- HISTORICO DE CONSULTAS ----------------------
-@pacientes_bp.route("/consultas/historico/<int:paciente_id>", methods=["GET"])
+# ---------------------- LISTA DE ESPERA ----------------------
+@pacientes_bp.route("/lista-espera", methods=["POST"])
 @jwt_required()
-def historico_consultas(paciente_id=None):
+def entrar_lista_espera():
     """
-    Retorna o histórico de consultas de um paciente.
-    Verifica role para acesso seguro (paciente só acessa seu próprio histórico).
+    Inclui o paciente na lista de espera de uma especialidade.
+    Recebe: paciente_id, especialidade, data_inicio e data_fim (YYYY-MM-DD), a janela de datas aceita.
+    Quando um horário compatível é liberado ou publicado, a consulta é marcada
+    automaticamente e o paciente recebe uma notificação.
+    """
+    dados = request.get_json() or {}
+    paciente_id = dados.get("paciente_id")
+    especialidade = dados.get("especialidade")
+
+    if not all([paciente_id, especialidade, dados.get("data_inicio"), dados.get("data_fim")]):
+        return jsonify({"msg": "paciente_id, especialidade, data_inicio e data_fim são obrigatórios"}), 400
+
+    try:
+        data_inicio = datetime.strptime(dados["data_inicio"], "%Y-%m-%d").date()
+        data_fim = datetime.strptime(dados["data_fim"], "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"msg": "Formato de data inválido. Use YYYY-MM-DD"}), 400
+    if data_fim < data_inicio or data_fim < date.today():
+        return jsonify({"msg": "Janela de datas inválida"}), 400
+
+    paciente = Paciente.query.get(paciente_id)
+    if not paciente:
+        return jsonify({"msg": f"Paciente com id {paciente_id} não encontrado"}), 404
+
+    entrada = ListaEspera(
+        paciente_id=paciente.id,
+        especialidade=especialidade,
+        data_inicio=data_inicio,
+        data_fim=data_fim
+    )
+    db.session.add(entrada)
+    db.session.commit()
+
+    # Tenta encaixar o paciente em algum horário já livre
+    motor_lista_espera.solicitar(current_app._get_current_object())
+
+    return jsonify({"msg": "Paciente incluído na lista de espera", "id": entrada.id}), 201
+
+@pacientes_bp.route("/lista-espera/<int:paciente_id>", methods=["GET"])
+@jwt_required()
+def listar_lista_espera(paciente_id):
+    """
+    Retorna as entradas de lista de espera de um paciente.
+    """
+    entradas = ListaEspera.query.filter_by(paciente_id=paciente_id).order_by(ListaEspera.criado_em).all()
+    return jsonify([{
+        "id": e.id,
+        "especialidade": e.especialidade,
+        "data_inicio": e.data_inicio,
+        "data_fim": e.data_fim,
+        "status": e.status,
+        "consulta_id": e.consulta_id
+    } for e in entradas]), 200
+
+@pacientes_bp.route("/lista-espera/<int:id>", methods=["DELETE"])
+@jwt_required()
+def sair_lista_espera(id):
+    """
+    Remove o paciente da lista de espera (a entrada fica com status cancelado).
+    """
+    entrada = ListaEspera.query.get_or_404(id)
+    if entrada.status != "aguardando":
+        return jsonify({"msg": "Somente entradas aguardando podem ser canceladas"}), 400
+    entrada.status = "cancelado"
+    db.session.commit()
+    return jsonify({"msg": "Paciente removido da lista de espera"}), 200
+
+# ---------------------- HISTORICO DE CONSULTAS ----------------------
+def _autorizar_historico(paciente_id=None):
+    """
+    Verifica se o paciente existe e se o usuário pode ver o histórico dele
+    (paciente só acessa seu próprio histórico). Retorna a resposta de erro ou None.
     """
     from flask_jwt_extended import get_jwt_identity, get_jwt
 
@@ -261,20 +718,40 @@ def historico_consultas(paciente_id=None):
             "required": ["paciente", "admin"],
             "role": tipo_usuario
         }), 403
+    return None
 
-    # Busca todas as consultas do paciente
-    consultas = Consulta.query.filter_by(paciente_id=paciente_id).all()
+
+@pacientes_bp.route("/consultas/historico/<int:paciente_id>", methods=["GET"])
+@jwt_required()
+@etag_condicional(lambda paciente_id=None: [chave_consultas_paciente(paciente_id)], autorizar=_autorizar_historico)
+def historico_consultas(paciente_id=None):
+    """
+    Retorna o histórico de consultas de um paciente.
+    O acesso é verificado em _autorizar_historico, antes do GET condicional.
+    Filtros opcionais: data_inicio / data_fim (YYYY-MM-DD).
+    Paginação opcional: limite / cursor (mais recentes primeiro).
+    """
+    # Busca as consultas do paciente (página ou lista completa)
+    try:
+        query = filtrar_periodo(Consulta.query.filter_by(paciente_id=paciente_id), Consulta.data_consulta, request.args)
+        consultas = paginar(
+            query, (Consulta.data_consulta, Consulta.hora_consulta, Consulta.id), request.args,
+            lambda c: {
+                "id": c.id,
+                "profissional_id": c.profissional_id,
+                "data": c.data_consulta,
+                "hora": c.hora_consulta,
+                "status": c.status
+            },
+            descendente=True
+        )
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
     
     if not consultas:
         return jsonify({"msg": f"Paciente {paciente_id} não possui consultas cadastradas"}), 200
 
-    return jsonify([{
-        "id": c.id,
-        "profissional_id": c.profissional_id,
-        "data": str(c.data_consulta),
-        "hora": c.hora_consulta.strftime("%H:%M:%S"),
-        "status": c.status
-    } for c in consultas]), 200
+    return jsonify(consultas), 200
 
 # ---------------------- REAGENDAR EXAME (paciente pode mudar data) ----------------------
 @pacientes_bp.route("/exames/<int:id>", methods=["PUT"])
@@ -305,31 +782,42 @@ def reagendar_exame(id):
 def historico_exames(paciente_id):
     """
     Retorna todos os exames de um paciente específico.
+    Filtros opcionais: data_inicio / data_fim. Paginação opcional: limite / cursor.
     """
-    exames = Exame.query.filter_by(paciente_id=paciente_id).all()
-    return jsonify([{
-        "id": e.id,
-        "nome": e.nome,
-        "data": e.data,
-        "status": e.status
-    } for e in exames]), 200
+    try:
+        query = filtrar_periodo(Exame.query.filter_by(paciente_id=paciente_id), Exame.data, request.args)
+        exames = paginar(query, (Exame.data, Exame.id), request.args, lambda e: {
+            "id": e.id,
+            "nome": e.nome,
+            "data": e.data,
+            "status": e.status
+        }, descendente=True)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    return jsonify(exames), 200
 
 # ---------------------- NOTIFICAÇÕES ----------------------
 @pacientes_bp.route("/notificacoes/<int:paciente_id>", methods=["GET"])
 @jwt_required()
 @role_required("paciente","admin")
+@etag_condicional(lambda paciente_id: [chave_notificacoes(paciente_id)])
 def listar_notificacoes(paciente_id):
     """
     Retorna todas as notificações de um paciente.
+    Filtros opcionais: data_inicio / data_fim. Paginação opcional: limite / cursor.
     """
-    notificacoes = Notificacao.query.filter_by(paciente_id=paciente_id).all()
-    return jsonify([{
-        "id": n.id,
-        "titulo": n.titulo,
-        "mensagem": n.mensagem,
-        "lida": n.lida,
-        "criado_em": n.criado_em
-    } for n in notificacoes]), 200
+    try:
+        query = filtrar_periodo(Notificacao.query.filter_by(paciente_id=paciente_id), Notificacao.criado_em, request.args)
+        notificacoes = paginar(query, (Notificacao.criado_em, Notificacao.id), request.args, lambda n: {
+            "id": n.id,
+            "titulo": n.titulo,
+            "mensagem": n.mensagem,
+            "lida": n.lida,
+            "criado_em": n.criado_em
+        }, descendente=True)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    return jsonify(notificacoes), 200
 
 # ---------------------- NOTIFICAÇÃO COMO LIDA ----------------------
 @pacientes_bp.route("/notificacoes/<int:id>/ler", methods=["PUT"])
@@ -341,6 +829,7 @@ def marcar_notificacao_lida(id):
     """
     n = Notificacao.query.get_or_404(id)
     n.lida = True
+    incrementar_versao(chave_notificacoes(n.paciente_id))
     db.session.commit()
     return jsonify({"msg": "Notificação marcada como lida"}), 200
 
@@ -1,16 +1,24 @@
 # Profissionais routes - RU 4493981
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, create_access_token, get_jwt_identity, get_jwt
-from werkzeug.security import check_password_hash
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from extensions import db
 from models.profissionais import Profissional
-from .decorators import role_required
+from .decorators import role_required, somente_leitura
 from models.agendas import Agenda, Horario
 from models.consulta import Consulta
 from models.prontuario import Prontuario, Receita
 from models.pacientes import Paciente
-from sqlalchemy import text, func, select  
+from sqlalchemy import func, select
 from datetime import datetime
+from utils.disponibilidade import indice_disponibilidade
+from utils.senhas import servico_senhas
+from utils.tokens import emitir_tokens
+from utils.paginacao import filtrar_periodo, paginar
+from utils.versoes import chave_horarios, chave_regras, incrementar_versao
+from utils.agendamento import publicar_horarios, apagar_agendas
+from utils.regras_agenda import slots_virtuais, no_periodo_regras
+from utils.lista_espera import motor_lista_espera
+from models.regras_agenda import RegraAgenda, ExcecaoAgenda
 
 # Cria um blueprint para rotas de profissionais
 profissionais_bp = Blueprint("profissionais", __name__, url_prefix="/profissionais")
@@ -33,21 +41,26 @@ def login_profissional():
     profissional = Profissional.query.filter_by(crm=crm).first()
     
     # Se campos preenchidos incorretamente
-    if not profissional or not check_password_hash(profissional.senha, senha):
+    if not profissional or not servico_senhas.verificar(profissional.senha, senha):
         return jsonify({"msg": "Credenciais inválidas"}), 401
 
-    # Gera o token JWT
-    token = create_access_token(
-        identity=str(profissional.id),
-        additional_claims={
+    # Refaz o hash se o método / custo do KDF mudou desde o cadastro
+    if servico_senhas.atualizar_hash(profissional, senha):
+        db.session.commit()
+
+    # Gera o access token (curta duração) e o refresh token
+    token, refresh = emitir_tokens(
+        str(profissional.id),
+        {
             "role": "profissional",
             "tipo": profissional.tipo
         }
     )
 
-    # Retorna token e dados do usuário
+    # Retorna tokens e dados do usuário
     return jsonify({
         "access_token": token,
+        "refresh_token": refresh,
         "profissional_id": profissional.id,
         "nome": profissional.nome,
         "tipo": profissional.tipo,
@@ -90,18 +103,19 @@ def criar_agenda():
         return jsonify({
             "msg": "Já existe uma agenda cadastrada para este profissional nesta data",
             "agenda_id": agenda_existente.id,
-            "data": str(agenda_existente.data)
+            "data": agenda_existente.data
         }), 400
     
     # Criação da agenda
     a = Agenda(profissional_id=int(user_id), data=data_convertida)
     db.session.add(a)
+    incrementar_versao(chave_horarios(a.profissional_id, a.data))
     db.session.commit()
 
     return jsonify({
         "msg": "Agenda criada com sucesso",
         "agenda_id": a.id,
-        "data": str(a.data)  # aqui volta como string pro JSON
+        "data": a.data  # serializada em ISO (YYYY-MM-DD) pelo provider JSON
     }), 201
 
 
@@ -130,44 +144,105 @@ def disponibilizar_horarios(agenda_id):
 
     dados = request.get_json() or {}
     horarios = dados.get("horarios", [])
-    criados = []
-    ignorados = []
 
+    horas = []
     for h in horarios:
         try:
             # Converter string para objeto time
-            hora_convertida = datetime.strptime(h, "%H:%M").time()
+            horas.append(datetime.strptime(h, "%H:%M").time())
         except Exception:
             return jsonify({"msg": f"Formato de hora inválido: {h}. Use HH:MM"}), 400
 
-        # Verificar se já existe esse horário na agenda
-        existe = Horario.query.filter_by(
-            agenda_id=agenda_id,
-            hora=hora_convertida
-        ).first()
+    # Verificação de existência em uma única consulta + insert em lote
+    criados, ignorados = publicar_horarios({agenda: horas})
+    db.session.commit()
+    indice_disponibilidade.invalidar(agenda.profissional_id, agenda.data)
+    if criados:
+        motor_lista_espera.solicitar(current_app._get_current_object())
+
+    return jsonify({
+        "msg": (
+            "Alguns horários já existiam e foram ignorados."
+            if ignorados else
+            "Todos os horários foram cadastrados com sucesso."
+        ),
+        "horarios_criados": [hora.strftime("%H:%M") for _, hora in criados],
+        "horarios_ignorados": [hora.strftime("%H:%M") for _, hora in ignorados]
+    }), 201
 
-        if existe:
-            ignorados.append(h)
-            continue
+# ---------------------- DISPONIBILIZAR HORÁRIOS EM LOTE ----------------------
+@profissionais_bp.route("/agendas/horarios/lote", methods=["POST"])
+@jwt_required()
+def disponibilizar_horarios_lote():
+    """
+    Permite ao médico publicar horários em várias agendas na mesma requisição.
+    Recebe: {"agendas": [{"agenda_id": 1, "horarios": ["09:00", "09:15"]}, ...]}
+    Horários já existentes são ignorados e informados na resposta.
+    """
+    user_id = get_jwt_identity()
+    claims = get_jwt()
 
-        horario = Horario(
-            agenda_id=agenda_id,
-            hora=hora_convertida,
-            disponivel=True
-        )
-        db.session.add(horario)
-        criados.append(hora_convertida.strftime("%H:%M"))
+    # Verifica o tipo do usuário
+    if claims.get("tipo") != "medico":
+        return jsonify({"msg": "Apenas médicos podem disponibilizar horários"}), 403
 
+    dados = request.get_json() or {}
+    itens = dados.get("agendas") or []
+    if not isinstance(itens, list) or not itens:
+        return jsonify({"msg": "O campo 'agendas' é obrigatório (lista de agenda_id e horarios)"}), 400
+
+    # Valida os itens e normaliza os ids (ex.: "3" -> 3), que são as chaves da busca abaixo
+    ids = []
+    for item in itens:
+        if not isinstance(item, dict):
+            return jsonify({"msg": "Cada item de 'agendas' deve ter agenda_id e horarios"}), 400
+        try:
+            ids.append(int(item.get("agenda_id")))
+        except (TypeError, ValueError):
+            return jsonify({"msg": f"agenda_id inválido: {item.get('agenda_id')}"}), 400
+
+    # Busca todas as agendas de uma vez
+    agendas = {a.id: a for a in Agenda.query.filter(Agenda.id.in_(ids)).all()}
+
+    horarios_por_agenda = {}
+    for item, agenda_id in zip(itens, ids):
+        agenda = agendas.get(agenda_id)
+        if not agenda:
+            return jsonify({"msg": f"Agenda não encontrada: {agenda_id}"}), 404
+        if agenda.profissional_id != int(user_id):
+            return jsonify({"msg": f"Agenda {agenda.id} não pertence a este médico"}), 403
+
+        for h in item.get("horarios") or []:
+            try:
+                hora = datetime.strptime(h, "%H:%M").time()
+            except Exception:
+                return jsonify({"msg": f"Formato de hora inválido: {h}. Use HH:MM"}), 400
+            horarios_por_agenda.setdefault(agenda, []).append(hora)
+
+    criados, ignorados = publicar_horarios(horarios_por_agenda)
     db.session.commit()
 
+    for agenda in horarios_por_agenda:
+        indice_disponibilidade.invalidar(agenda.profissional_id, agenda.data)
+    if criados:
+        motor_lista_espera.solicitar(current_app._get_current_object())
+
+    # Agrupa o resultado por agenda
+    resultado = {}
+    for chave, lista in (("horarios_criados", criados), ("horarios_ignorados", ignorados)):
+        for agenda_id, hora in lista:
+            item = resultado.setdefault(agenda_id, {"agenda_id": agenda_id, "horarios_criados": [], "horarios_ignorados": []})
+            item[chave].append(hora.strftime("%H:%M"))
+
     return jsonify({
         "msg": (
             "Alguns horários já existiam e foram ignorados."
             if ignorados else
             "Todos os horários foram cadastrados com sucesso."
         ),
-        "horarios_criados": criados,
-        "horarios_ignorados": ignorados
+        "total_criados": len(criados),
+        "total_ignorados": len(ignorados),
+        "agendas": list(resultado.values())
     }), 201
 
 # ---------------------- LISTAR AGENDAS (médico autenticado) ----------------------
@@ -200,7 +275,7 @@ def listar_agendas():
     return jsonify([
         {
             "agenda_id": a.id,
-            "data": str(a.data)
+            "data": a.data
         }
         for a in agendas
     ]), 200
@@ -212,7 +287,8 @@ def listar_agendas():
 def apagar_agenda(agenda_id):
     """
     Permite ao médico apagar uma agenda.
-    Antes de apagar, verifica se existem consultas ocupadas.
+    Antes de apagar, verifica se existem consultas vinculadas (inclusive canceladas,
+    que continuam no histórico do paciente).
     Também remove horários vinculados à agenda.
     """
     user_id = get_jwt_identity()
@@ -226,88 +302,60 @@ def apagar_agenda(agenda_id):
     if agenda.profissional_id != int(user_id):
         return jsonify({"msg": "Agenda não pertence a este médico"}), 403
 
-    # Verificação de consultas ocupadas
-    cols = set()
-    try:
-        res = db.session.execute(text("PRAGMA table_info(consultas)"))
-        cols = {row[1] for row in res}  # row[1] = name
-    except Exception:
-        pass
-
-    # Monta filtros disponíveis sem referenciar colunas que não existem
-    where_parts = []
-    params = {}
-
-    # status ≠ 'disponivel' para bloquear exclusão
-    if "status" in cols:
-        where_parts.append("status != :status_disp")
-        params["status_disp"] = "disponivel"
-
-    # limitar ao profissional da agenda (se existir a coluna)
-    if "profissional_id" in cols:
-        where_parts.append("profissional_id = :prof_id")
-        params["prof_id"] = agenda.profissional_id
-
-    # limitar ao dia da agenda (se existir alguma coluna de data)
-    if "data_consulta" in cols:
-        where_parts.append("data_consulta = :dt")
-        params["dt"] = str(agenda.data)
-        data_col = "data_consulta"
-    elif "data" in cols:
-        where_parts.append("data = :dt")
-        params["dt"] = str(agenda.data)
-        data_col = "data"
-    else:
-        data_col = None  # sem filtro por data
-
-    where_clause = " AND ".join(where_parts) if where_parts else "1=1"
-
-    # Verifica consultas ocupadas (COUNT(*))
-    sql_count = f"SELECT COUNT(*) AS c FROM consultas WHERE {where_clause}"
-    try:
-        ocupadas = db.session.execute(text(sql_count), params).scalar() or 0
-    except Exception as e:
-        # Se nem COUNT consegue (caso extremo), por segurança bloqueia
-        return jsonify({"msg": "Falha ao verificar consultas vinculadas à agenda", "erro": str(e)}), 500
-
-    if ocupadas > 0:
+    # Apaga agenda, horários e reservas em uma transação
+    profissional_id, data_agenda = agenda.profissional_id, agenda.data
+    _, bloqueadas = apagar_agendas([agenda.id])
+    if bloqueadas:
         return jsonify({
-            "msg": "Não é possível apagar a agenda: existem consultas ocupadas vinculadas"
+            "msg": "Não é possível apagar a agenda: existem consultas vinculadas"
         }), 409
 
-    # Apagar consultas e horários vinculados
-    where_parts_del = []
-    params_del = {}
+    db.session.commit()
+    indice_disponibilidade.invalidar(profissional_id, data_agenda)
 
-    if "profissional_id" in cols:
-        where_parts_del.append("profissional_id = :prof_id")
-        params_del["prof_id"] = agenda.profissional_id
+    return jsonify({"msg": "Agenda removida com sucesso"}), 200
 
-    if data_col:
-        where_parts_del.append(f"{data_col} = :dt")
-        params_del["dt"] = str(agenda.data)
 
-    where_clause_del = " AND ".join(where_parts_del) if where_parts_del else "1=1"
-    sql_del = f"DELETE FROM consultas WHERE {where_clause_del}"
-    try:
-        db.session.execute(text(sql_del), params_del)
-    except Exception as e:
-        return jsonify({"msg": "Falha ao remover consultas da agenda", "erro": str(e)}), 500
+# ---------------------- APAGAR AGENDAS POR PERÍODO ----------------------
+@profissionais_bp.route("/agendas", methods=["DELETE"])
+@jwt_required()
+def apagar_agendas_periodo():
+    """
+    Permite ao médico apagar de uma vez todas as suas agendas em um período.
+    Recebe query params data_inicio e data_fim (YYYY-MM-DD).
+    Agendas com consultas (inclusive canceladas) são mantidas e informadas na resposta.
+    """
+    user_id = get_jwt_identity()
+    claims = get_jwt()
+
+    # Verifica o tipo do usuário
+    if claims.get("tipo") != "medico":
+        return jsonify({"msg": "Apenas médicos podem apagar agendas"}), 403
 
-    # Apaga horários da agenda se a tabela/coluna existir
     try:
-        res_h = db.session.execute(text("PRAGMA table_info(horarios)"))
-        cols_h = {row[1] for row in res_h}
-        if "agenda_id" in cols_h:
-            db.session.execute(text("DELETE FROM horarios WHERE agenda_id = :aid"), {"aid": agenda_id})
-    except Exception:
-        pass  # se não existir, ignora
+        data_inicio = datetime.strptime(request.args.get("data_inicio") or "", "%Y-%m-%d").date()
+        data_fim = datetime.strptime(request.args.get("data_fim") or "", "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"msg": "data_inicio e data_fim são obrigatórias (formato YYYY-MM-DD)"}), 400
+
+    agendas = dict(db.session.query(Agenda.id, Agenda.data).filter(
+        Agenda.profissional_id == int(user_id), Agenda.data >= data_inicio, Agenda.data <= data_fim
+    ).all())
 
-    # Apaga a própria agenda
-    db.session.delete(agenda)
+    apagadas, bloqueadas = apagar_agendas(agendas)
     db.session.commit()
+    for agenda_id in apagadas:
+        indice_disponibilidade.invalidar(int(user_id), agendas[agenda_id])
 
-    return jsonify({"msg": "Agenda removida com sucesso"}), 200
+    return jsonify({
+        "msg": (
+            "Algumas agendas possuem consultas e foram mantidas."
+            if bloqueadas else
+            "Agendas removidas com sucesso."
+        ),
+        "agendas_removidas": sorted(apagadas),
+        "agendas_mantidas": sorted(bloqueadas)
+    }), 200
 
 
 # ---------------------- OBTER AGENDA (detalhe + horários) ----------------------
@@ -316,6 +364,7 @@ def apagar_agenda(agenda_id):
 def obter_agenda(agenda_id):
     """
     Retorna detalhes de uma agenda específica, incluindo horários e consultas.
+    Horários gerados por regras de agenda aparecem com horario_id nulo.
     """
     user_id = get_jwt_identity()
     claims = get_jwt()
@@ -344,14 +393,20 @@ def obter_agenda(agenda_id):
         except Exception:
             return str(h)
 
+    # horários virtuais (regras de agenda) ainda livres neste dia, sem horario_id (só no período das regras)
+    virtuais = []
+    if no_periodo_regras(agenda.data):
+        virtuais = [hora for _, _, _, _, hora in slots_virtuais(agenda.data, agenda.data, profissional_id=agenda.profissional_id)]
+    todos = sorted([(h.hora, h.id) for h in horarios] + [(hora, None) for hora in virtuais], key=lambda item: item[0])
+
     return jsonify({
         "agenda_id": agenda.id,
-        "data": str(agenda.data),
+        "data": agenda.data,
         "horarios": [
             {
-                "horario_id": h.id,
-                "hora": _fmt_hora(h.hora) if hasattr(h, "hora") else None
-            } for h in horarios
+                "horario_id": horario_id,
+                "hora": _fmt_hora(hora)
+            } for hora, horario_id in todos
         ],
         "consultas": [
             {
@@ -364,22 +419,194 @@ def obter_agenda(agenda_id):
         ]
     }), 200
 
+# ---------------------- REGRAS DE AGENDA (horários virtuais) ----------------------
+def _converter_hora(valor):
+    """
+    Converte 'HH:MM' para time. Retorna None se o formato for inválido.
+    """
+    try:
+        return datetime.strptime(valor, "%H:%M").time()
+    except (TypeError, ValueError):
+        return None
+
+@profissionais_bp.route("/regras", methods=["POST"])
+@jwt_required()
+def criar_regra_agenda():
+    """
+    Permite ao médico cadastrar uma regra recorrente de atendimento.
+    Recebe: dia_semana (0 = segunda ... 6 = domingo), hora_inicio, hora_fim (HH:MM)
+    e duracao_minutos. Os horários são calculados a partir da regra, sem criar
+    uma agenda e um horário por dia.
+    """
+    user_id = get_jwt_identity()
+    claims = get_jwt()
+
+    # Verifica o tipo do usuário
+    if claims.get("tipo") != "medico":
+        return jsonify({"msg": "Apenas médicos podem cadastrar regras de agenda"}), 403
+
+    dados = request.get_json() or {}
+    dia_semana = dados.get("dia_semana")
+    hora_inicio = _converter_hora(dados.get("hora_inicio"))
+    hora_fim = _converter_hora(dados.get("hora_fim"))
+    duracao = dados.get("duracao_minutos", 30)
+
+    if not isinstance(dia_semana, int) or not 0 <= dia_semana <= 6:
+        return jsonify({"msg": "dia_semana deve ser um número de 0 (segunda) a 6 (domingo)"}), 400
+    if not hora_inicio or not hora_fim or hora_inicio >= hora_fim:
+        return jsonify({"msg": "hora_inicio e hora_fim são obrigatórias (HH:MM) e hora_inicio deve ser menor"}), 400
+    if not isinstance(duracao, int) or duracao <= 0:
+        return jsonify({"msg": "duracao_minutos deve ser um número inteiro positivo"}), 400
+
+    regra = RegraAgenda(
+        profissional_id=int(user_id),
+        dia_semana=dia_semana,
+        hora_inicio=hora_inicio,
+        hora_fim=hora_fim,
+        duracao_minutos=duracao
+    )
+    db.session.add(regra)
+    incrementar_versao(chave_regras(regra.profissional_id))
+    db.session.commit()
+    indice_disponibilidade.invalidar_profissional(int(user_id))
+    motor_lista_espera.solicitar(current_app._get_current_object())
+
+    return jsonify({"msg": "Regra de agenda criada com sucesso", "regra_id": regra.id}), 201
+
+@profissionais_bp.route("/regras", methods=["GET"])
+@jwt_required()
+def listar_regras_agenda():
+    """
+    Lista as regras e exceções de agenda do médico logado.
+    """
+    user_id = get_jwt_identity()
+    claims = get_jwt()
+
+    # Verifica o tipo do usuário
+    if claims.get("tipo") != "medico":
+        return jsonify({"msg": "Apenas médicos podem listar regras de agenda"}), 403
+
+    regras = RegraAgenda.query.filter_by(profissional_id=int(user_id), ativa=True) \
+        .order_by(RegraAgenda.dia_semana, RegraAgenda.hora_inicio).all()
+    excecoes = ExcecaoAgenda.query.filter_by(profissional_id=int(user_id)).order_by(ExcecaoAgenda.data).all()
+
+    return jsonify({
+        "regras": [{
+            "regra_id": r.id,
+            "dia_semana": r.dia_semana,
+            "hora_inicio": r.hora_inicio.strftime("%H:%M"),
+            "hora_fim": r.hora_fim.strftime("%H:%M"),
+            "duracao_minutos": r.duracao_minutos
+        } for r in regras],
+        "excecoes": [{
+            "excecao_id": e.id,
+            "data": e.data,
+            "hora_inicio": e.hora_inicio.strftime("%H:%M") if e.hora_inicio else None,
+            "hora_fim": e.hora_fim.strftime("%H:%M") if e.hora_fim else None,
+            "motivo": e.motivo
+        } for e in excecoes]
+    }), 200
+
+@profissionais_bp.route("/regras/<int:regra_id>", methods=["DELETE"])
+@jwt_required()
+def apagar_regra_agenda(regra_id):
+    """
+    Desativa uma regra de agenda. Consultas já marcadas continuam valendo.
+    """
+    user_id = get_jwt_identity()
+
+    regra = RegraAgenda.query.get_or_404(regra_id)
+    if regra.profissional_id != int(user_id):
+        return jsonify({"msg": "Regra não pertence a este médico"}), 403
+
+    regra.ativa = False
+    incrementar_versao(chave_regras(regra.profissional_id))
+    db.session.commit()
+    indice_disponibilidade.invalidar_profissional(regra.profissional_id)
+
+    return jsonify({"msg": "Regra de agenda removida com sucesso"}), 200
+
+@profissionais_bp.route("/regras/excecoes", methods=["POST"])
+@jwt_required()
+def criar_excecao_agenda():
+    """
+    Bloqueia um dia inteiro (sem hora_inicio) ou um intervalo de horas em uma data.
+    Recebe: data (YYYY-MM-DD), hora_inicio e hora_fim opcionais (HH:MM), motivo opcional.
+    """
+    user_id = get_jwt_identity()
+    claims = get_jwt()
+
+    # Verifica o tipo do usuário
+    if claims.get("tipo") != "medico":
+        return jsonify({"msg": "Apenas médicos podem cadastrar exceções de agenda"}), 403
+
+    dados = request.get_json() or {}
+    try:
+        data_convertida = datetime.strptime(dados.get("data") or "", "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"msg": "O campo 'data' é obrigatório (formato YYYY-MM-DD)"}), 400
+
+    hora_inicio = _converter_hora(dados["hora_inicio"]) if dados.get("hora_inicio") else None
+    hora_fim = _converter_hora(dados["hora_fim"]) if dados.get("hora_fim") else None
+    if (dados.get("hora_inicio") and not hora_inicio) or (dados.get("hora_fim") and not hora_fim):
+        return jsonify({"msg": "Formato de hora inválido. Use HH:MM"}), 400
+
+    excecao = ExcecaoAgenda(
+        profissional_id=int(user_id),
+        data=data_convertida,
+        hora_inicio=hora_inicio,
+        hora_fim=hora_fim,
+        motivo=dados.get("motivo")
+    )
+    db.session.add(excecao)
+    incrementar_versao(chave_horarios(excecao.profissional_id, excecao.data))
+    db.session.commit()
+    indice_disponibilidade.invalidar(int(user_id), data_convertida)
+
+    return jsonify({"msg": "Exceção de agenda criada com sucesso", "excecao_id": excecao.id}), 201
+
+@profissionais_bp.route("/regras/excecoes/<int:excecao_id>", methods=["DELETE"])
+@jwt_required()
+def apagar_excecao_agenda(excecao_id):
+    """
+    Remove uma exceção, liberando novamente os horários das regras naquela data.
+    """
+    user_id = get_jwt_identity()
+
+    excecao = ExcecaoAgenda.query.get_or_404(excecao_id)
+    if excecao.profissional_id != int(user_id):
+        return jsonify({"msg": "Exceção não pertence a este médico"}), 403
+
+    profissional_id, data_excecao = excecao.profissional_id, excecao.data
+    db.session.delete(excecao)
+    incrementar_versao(chave_horarios(profissional_id, data_excecao))
+    db.session.commit()
+    indice_disponibilidade.invalidar(profissional_id, data_excecao)
+    motor_lista_espera.solicitar(current_app._get_current_object())
+
+    return jsonify({"msg": "Exceção de agenda removida com sucesso"}), 200
+
 # ---------------------- LISTAR CONSULTAS DO PROFISSIONAL ----------------------
 @profissionais_bp.route("/consultas/profissional/<int:profissional_id>", methods=["GET"])
 @jwt_required()
 def listar_consultas_profissional(profissional_id):
     """
     Lista todas as consultas associadas a um profissional.
+    Filtros opcionais: data_inicio / data_fim. Paginação opcional: limite / cursor.
     """
-    consultas = Consulta.query.filter_by(profissional_id=profissional_id).all()
-    
-    return jsonify([{
-        "id": c.id,
-        "paciente_id": c.paciente_id,
-        "data": str(c.data_consulta),
-        "hora": c.hora_consulta.strftime("%H:%M:%S") if c.hora_consulta else None,
-        "status": c.status
-    } for c in consultas]), 200
+    try:
+        query = filtrar_periodo(Consulta.query.filter_by(profissional_id=profissional_id), Consulta.data_consulta, request.args)
+        consultas = paginar(query, (Consulta.data_consulta, Consulta.hora_consulta, Consulta.id), request.args, lambda c: {
+            "id": c.id,
+            "paciente_id": c.paciente_id,
+            "data": c.data_consulta,
+            "hora": c.hora_consulta,
+            "status": c.status
+        })
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    return jsonify(consultas), 200
 
 # ---------------------- REGISTRAR PRONTUÁRIO ----------------------
 @profissionais_bp.route("/prontuarios", methods=["POST"])
@@ -392,6 +619,10 @@ def registrar_prontuario():
     user_id = get_jwt_identity()
     dados = request.get_json() or {}
 
+    # Verifica se o paciente existe
+    if not Paciente.query.get(dados.get("paciente_id")):
+        return jsonify({"msg": "Paciente não encontrado"}), 404
+
     pr = Prontuario(
         paciente_id=dados["paciente_id"],
         profissional_id=int(user_id),
@@ -413,6 +644,10 @@ def emitir_receita():
     user_id = get_jwt_identity()
     dados = request.get_json() or {}
 
+    # Verifica se o paciente existe
+    if not Paciente.query.get(dados.get("paciente_id")):
+        return jsonify({"msg": "Paciente não encontrado"}), 404
+
     r = Receita(
         paciente_id=dados["paciente_id"],
         profissional_id=int(user_id),
@@ -427,6 +662,7 @@ def emitir_receita():
 # ---------------------- HISTÓRICO DO PACIENTE ----------------------
 @profissionais_bp.route("/pacientes/historico", methods=["GET"])
 @jwt_required()
+@somente_leitura
 def historico_paciente():
     """
     Retorna histórico completo de um paciente (prontuários, receitas e consultas)
@@ -455,7 +691,7 @@ def historico_paciente():
         "paciente": {"id": paciente.id, "nome": paciente.nome},
         "prontuarios": [{"id": p.id, "descricao": p.descricao} for p in prontuarios],
         "receitas": [{"id": r.id, "conteudo": r.conteudo} for r in receitas],
-        "consultas": [{"id": c.id, "data": str(c.data_consulta), "hora": c.hora_consulta} for c in consultas]
+        "consultas": [{"id": c.id, "data": c.data_consulta, "hora": c.hora_consulta} for c in consultas]
     }), 200
 
 
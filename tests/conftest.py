@@ -0,0 +1,70 @@
+# Test fixtures - RU 4493981
+import os
+import sys
+import pytest
+
+# A raiz do projeto tem __init__.py; os módulos são importados como no "python app.py"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from extensions import db
+from models import Usuario, Paciente, Profissional
+from werkzeug.security import generate_password_hash
+
+SENHA = "senha-teste"
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """
+    Aplicação com um banco SQLite em arquivo, novo a cada teste: com arquivo (e não em memória),
+    cada thread usa a própria conexão do pool, como em produção.
+    """
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'sghss.db'}")
+    monkeypatch.setattr(Config, "SENHA_PROCESSOS", 0) # hash na própria thread, sem pool de processos
+    aplicacao = create_app()
+    aplicacao.config["TESTING"] = True
+    with aplicacao.app_context():
+        db.create_all()
+        db.session.add(Usuario(nome="Admin", email="admin@sghss.com", senha=generate_password_hash(SENHA), role="admin"))
+        for i in (1, 2):
+            db.session.add(Paciente(nome=f"Paciente {i}", cpf=str(i), email=f"paciente{i}@sghss.com",
+                                    senha=generate_password_hash(SENHA)))
+        db.session.add(Profissional(nome="Médica", crm="CRM1", especialidade="cardio", email="medica@sghss.com",
+                                    senha=generate_password_hash(SENHA)))
+        db.session.commit()
+    yield aplicacao
+    with aplicacao.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def cliente(app):
+    return app.test_client()
+
+
+def _entrar(cliente, rota, corpo):
+    resposta = cliente.post(rota, json=corpo)
+    assert resposta.status_code == 200, resposta.get_json()
+    return {"Authorization": "Bearer " + resposta.get_json()["access_token"]}
+
+
+@pytest.fixture
+def admin(cliente):
+    return _entrar(cliente, "/auth/login", {"email": "admin@sghss.com", "senha": SENHA})
+
+
+@pytest.fixture
+def medica(cliente):
+    return _entrar(cliente, "/profissionais/login", {"crm": "CRM1", "senha": SENHA})
+
+
+@pytest.fixture
+def pacientes(cliente):
+    """
+    Cabeçalhos de autenticação dos pacientes 1 e 2: {paciente_id: headers}.
+    """
+    return {i: _entrar(cliente, "/pacientes/login", {"email": f"paciente{i}@sghss.com", "senha": SENHA}) for i in (1, 2)}
@@ -0,0 +1,146 @@
+# Booking tests - RU 4493981
+import threading
+from datetime import date, timedelta
+from sqlalchemy import func, select
+from extensions import db
+from werkzeug.security import generate_password_hash
+from models import Consulta, Horario, Usuario
+from models.versoes import VersaoRecurso
+from conftest import SENHA
+
+
+def _criar_agenda(cliente, medica, horarios, dias=1):
+    data = date.today() + timedelta(days=dias)
+    agenda_id = cliente.post("/profissionais/agendas", json={"data": str(data)}, headers=medica).get_json()["agenda_id"]
+    resposta = cliente.post(f"/profissionais/agendas/{agenda_id}/horarios", json={"horarios": horarios}, headers=medica)
+    assert resposta.status_code in (200, 201), resposta.get_json()
+    return agenda_id
+
+
+def test_agendamentos_simultaneos_nao_duplicam_horario(app, cliente, medica, pacientes):
+    """
+    8 threads tentam marcar os mesmos 20 horários: cada horário fica com exatamente uma consulta.
+    """
+    horarios = [f"{8 + i // 4:02d}:{(i % 4) * 15:02d}" for i in range(20)]
+    agenda_id = _criar_agenda(cliente, medica, horarios)
+    sucessos, falhas, erros = [], [], []
+    lock = threading.Lock()
+
+    def tentar(k):
+        paciente_id = 1 + k % 2
+        cliente_thread = app.test_client()
+        for hora in horarios:
+            try:
+                resposta = cliente_thread.post("/pacientes/consultas", headers=pacientes[paciente_id],
+                                               json={"agenda_id": agenda_id, "horario": hora, "paciente_id": paciente_id})
+                with lock:
+                    (sucessos if resposta.status_code == 201 else falhas).append(resposta.status_code)
+            except Exception as e: # falha inesperada (ex.: "database is locked")
+                with lock:
+                    erros.append(repr(e))
+
+    threads = [threading.Thread(target=tentar, args=(k,)) for k in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert erros == []
+    assert len(sucessos) == len(horarios)
+    assert set(falhas) == {400}
+    with app.app_context():
+        duplicados = db.session.query(Consulta.horario_id).filter(Consulta.agenda_id == agenda_id) \
+            .group_by(Consulta.horario_id).having(func.count() > 1).all()
+        assert duplicados == []
+        assert db.session.query(func.count(Consulta.id)).filter(Consulta.agenda_id == agenda_id).scalar() == len(horarios)
+        assert Horario.query.filter_by(agenda_id=agenda_id, disponivel=True).count() == 0
+
+
+def test_consulta_cancelada_permanece_no_historico(cliente, medica, pacientes):
+    """
+    Um novo agendamento no horário de uma consulta cancelada cria outra consulta; a cancelada
+    continua no histórico de quem cancelou.
+    """
+    agenda_id = _criar_agenda(cliente, medica, ["09:00"])
+    corpo = {"agenda_id": agenda_id, "horario": "09:00"}
+    cancelada = cliente.post("/pacientes/consultas", json=dict(corpo, paciente_id=1), headers=pacientes[1]).get_json()["consulta_id"]
+    assert cliente.put(f"/pacientes/consultas/{cancelada}/cancelar", headers=pacientes[1]).status_code == 200
+
+    resposta = cliente.post("/pacientes/consultas", json=dict(corpo, paciente_id=2), headers=pacientes[2])
+    assert resposta.status_code == 201
+    assert resposta.get_json()["consulta_id"] != cancelada
+
+    historico = cliente.get("/pacientes/consultas/historico/1", headers=pacientes[1]).get_json()
+    assert [(c["id"], c["status"]) for c in historico] == [(cancelada, "Cancelada")]
+
+
+def test_agenda_com_consulta_cancelada_nao_e_apagada(cliente, medica, pacientes):
+    """
+    Consultas canceladas fazem parte do histórico: a agenda delas não é apagada
+    (nem sozinha, nem na remoção por período), e a agenda sem consultas é.
+    """
+    com_cancelada = _criar_agenda(cliente, medica, ["09:00"])
+    vazia = _criar_agenda(cliente, medica, ["09:00"], dias=2)
+    consulta = cliente.post("/pacientes/consultas", headers=pacientes[1],
+                            json={"agenda_id": com_cancelada, "horario": "09:00", "paciente_id": 1}).get_json()["consulta_id"]
+    assert cliente.put(f"/pacientes/consultas/{consulta}/cancelar", headers=pacientes[1]).status_code == 200
+
+    assert cliente.delete(f"/profissionais/agendas/{com_cancelada}", headers=medica).status_code == 409
+    periodo = f"data_inicio={date.today()}&data_fim={date.today() + timedelta(days=5)}"
+    resposta = cliente.delete(f"/profissionais/agendas?{periodo}", headers=medica).get_json()
+    assert (resposta["agendas_removidas"], resposta["agendas_mantidas"]) == ([vazia], [com_cancelada])
+
+    historico = cliente.get("/pacientes/consultas/historico/1", headers=pacientes[1]).get_json()
+    assert [(c["id"], c["status"]) for c in historico] == [(consulta, "Cancelada")]
+
+
+def test_historico_de_outro_paciente_nao_responde_304(app, cliente, pacientes):
+    """
+    O ETag leva só o id do usuário do token: o paciente 2 que reapresenta o ETag recebido
+    pelo admin de id 2 recebe 403, e não um 304 que confirmaria o conteúdo do histórico alheio.
+    """
+    with app.app_context():
+        db.session.add(Usuario(nome="Admin 2", email="admin2@sghss.com", senha=generate_password_hash(SENHA), role="admin"))
+        db.session.commit()
+    admin2 = cliente.post("/auth/login", json={"email": "admin2@sghss.com", "senha": SENHA}).get_json()["access_token"]
+    historico = cliente.get("/pacientes/consultas/historico/1", headers={"Authorization": "Bearer " + admin2})
+    assert historico.status_code == 200 and historico.headers.get("ETag")
+
+    alheio = cliente.get("/pacientes/consultas/historico/1",
+                         headers={**pacientes[2], "If-None-Match": historico.headers["ETag"]})
+    assert alheio.status_code == 403
+    assert "ETag" not in alheio.headers
+
+
+def test_horarios_em_lote_normaliza_agenda_id(cliente, medica):
+    agenda_id = _criar_agenda(cliente, medica, [])
+    resposta = cliente.post("/profissionais/agendas/horarios/lote", headers=medica,
+                            json={"agendas": [{"agenda_id": str(agenda_id), "horarios": ["09:00"]}]})
+    assert resposta.status_code == 201, resposta.get_json()
+    assert resposta.get_json()["total_criados"] == 1
+
+    for invalido in ("abc", None, [agenda_id]):
+        resposta = cliente.post("/profissionais/agendas/horarios/lote", headers=medica,
+                                json={"agendas": [{"agenda_id": invalido, "horarios": ["10:00"]}]})
+        assert resposta.status_code == 400, (invalido, resposta.get_json())
+
+
+def test_agendamento_muda_so_o_etag_dos_horarios_do_dia(app, cliente, medica, pacientes):
+    """
+    A versão dos horários é por profissional e dia: marcar uma consulta em um dia não
+    invalida o ETag da listagem de outro dia.
+    """
+    dias = {n: date.today() + timedelta(days=n) for n in (1, 3)}
+    agendas = {n: _criar_agenda(cliente, medica, ["09:00"], dias=n) for n in dias}
+    urls = {n: f"/pacientes/agendas/horarios?profissional_id=1&data_inicio={d}&data_fim={d}" for n, d in dias.items()}
+    etags = {n: cliente.get(url, headers=pacientes[1]).headers["ETag"] for n, url in urls.items()}
+
+    resposta = cliente.post("/pacientes/consultas", headers=pacientes[1],
+                            json={"agenda_id": agendas[3], "horario": "09:00", "paciente_id": 1})
+    assert resposta.status_code == 201, resposta.get_json()
+
+    assert cliente.get(urls[1], headers={**pacientes[1], "If-None-Match": etags[1]}).status_code == 304
+    assert cliente.get(urls[3], headers={**pacientes[1], "If-None-Match": etags[3]}).status_code == 200
+    with app.app_context():
+        chaves = set(db.session.scalars(select(VersaoRecurso.chave)))
+    assert "horarios" not in chaves and f"horarios:{dias[3]}:1" in chaves
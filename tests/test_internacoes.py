@@ -0,0 +1,97 @@
+# Bed allocation tests - RU 4493981
+import threading
+from collections import Counter
+from extensions import db
+from models import Paciente, Leito, Internacao
+
+
+def _disparar(app, admin, corpos, threads=8):
+    """
+    Envia os pedidos de internação em paralelo e retorna (Counter de status, erros inesperados).
+    """
+    fila, status, erros = list(corpos), Counter(), []
+    lock = threading.Lock()
+
+    def trabalhar():
+        cliente = app.test_client()
+        while True:
+            with lock:
+                if not fila:
+                    return
+                corpo = fila.pop()
+            try:
+                resposta = cliente.post("/administracao/internacoes", json=corpo, headers=admin)
+                with lock:
+                    status[resposta.status_code] += 1
+            except Exception as e: # falha inesperada (ex.: "database is locked")
+                with lock:
+                    erros.append(repr(e))
+
+    workers = [threading.Thread(target=trabalhar) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return status, erros
+
+
+def test_alocacao_simultanea_nao_repete_leito(app, admin):
+    """
+    80 internações simultâneas disputam 60 leitos de UTI: 60 são atendidas, cada uma em um leito
+    diferente, e as demais recebem 409.
+    """
+    with app.app_context():
+        db.session.execute(db.insert(Paciente), [{"nome": f"P{i}", "cpf": f"x{i}", "senha": "x"} for i in range(80)])
+        db.session.execute(db.insert(Leito), [{"numero": f"U{i}", "tipo": "UTI", "ocupado": False} for i in range(60)])
+        db.session.commit()
+        paciente_ids = [p.id for p in Paciente.query.filter(Paciente.cpf.like("x%"))]
+
+    status, erros = _disparar(app, admin, [
+        {"paciente_id": paciente_id, "tipo": "UTI", "preferencias": [1, 2, 3]} for paciente_id in paciente_ids
+    ])
+
+    assert erros == []
+    assert status == Counter({201: 60, 409: 20})
+    with app.app_context():
+        ativos = [leito_id for (leito_id,) in db.session.query(Internacao.leito_id).filter(Internacao.data_fim.is_(None))]
+        assert len(ativos) == len(set(ativos)) == 60
+        assert Leito.query.filter_by(ocupado=True).count() == 60
+
+
+def test_disputa_pelo_mesmo_leito(app, admin):
+    """
+    Vários pedidos para o mesmo leito informado: só um ocupa o leito.
+    """
+    with app.app_context():
+        db.session.add(Leito(numero="E1", tipo="enfermaria", ocupado=False))
+        db.session.execute(db.insert(Paciente), [{"nome": f"P{i}", "cpf": f"x{i}", "senha": "x"} for i in range(10)])
+        db.session.commit()
+        leito_id = Leito.query.filter_by(numero="E1").one().id
+        paciente_ids = [p.id for p in Paciente.query.filter(Paciente.cpf.like("x%"))]
+
+    status, erros = _disparar(app, admin, [{"paciente_id": p, "leito_id": leito_id} for p in paciente_ids])
+
+    assert erros == []
+    assert status == Counter({201: 1, 400: 9})
+    with app.app_context():
+        assert Internacao.query.filter_by(leito_id=leito_id).count() == 1
+
+
+def test_preferencias_invalidas_retornam_400(app, cliente, admin):
+    """
+    preferencias precisa ser uma lista de leito_id inteiros; o pedido inválido não ocupa leito.
+    """
+    with app.app_context():
+        db.session.add(Leito(numero="U1", tipo="UTI", ocupado=False))
+        db.session.commit()
+
+    for invalidas in ("1,2", {"1": 2}, [1, "2"], [1.5], [True], [None]):
+        resposta = cliente.post("/administracao/internacoes", headers=admin,
+                                json={"paciente_id": 1, "tipo": "UTI", "preferencias": invalidas})
+        assert resposta.status_code == 400, (invalidas, resposta.get_json())
+
+    with app.app_context():
+        assert Internacao.query.count() == 0
+    resposta = cliente.post("/administracao/internacoes", headers=admin,
+                            json={"paciente_id": 1, "tipo": "UTI", "preferencias": [99, 1]})
+    assert resposta.status_code == 201, resposta.get_json()
@@ -0,0 +1,20 @@
+# Waiting list tests - RU 4493981
+from datetime import date, time, timedelta
+from extensions import db
+from models.lista_espera import ListaEspera
+from utils.lista_espera import _efetivar
+
+
+def test_horario_apagado_depois_do_pareamento_mantem_o_paciente_na_fila(app):
+    """
+    Se a agenda do horário pareado foi apagada antes da efetivação, o par é descartado
+    (sem AttributeError interrompendo a rodada) e o paciente continua aguardando.
+    """
+    amanha = date.today() + timedelta(days=1)
+    with app.app_context():
+        entrada = ListaEspera(paciente_id=1, especialidade="cardio", data_inicio=amanha, data_fim=amanha)
+        db.session.add(entrada)
+        db.session.commit()
+
+        assert _efetivar(entrada, amanha, time(9, 0), 1, horario_id=999) is False
+        assert db.session.get(ListaEspera, entrada.id).status == "aguardando"
@@ -0,0 +1,67 @@
+# Query plan tests - RU 4493981
+import os
+import pytest
+from flask_migrate import upgrade
+from app import create_app
+from config import Config
+from extensions import db
+from utils.planos import consultas_criticas, explicar, planos_criticos, varreduras_completas
+
+MIGRACOES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+# Índice -> consulta crítica que passa a ler a tabela inteira sem ele
+INDICES = {
+    "ix_pacientes_email": "login do paciente",
+    "ix_consultas_paciente_data": "histórico de consultas do paciente",
+    "ix_consultas_profissional_data": "consultas do profissional",
+    "ix_consultas_horario": "consultas dos horários de uma agenda",
+    "ix_agendas_data": "horários livres por período",
+    "ix_notificacoes_paciente_criado": "notificações do paciente",
+    "ix_exames_paciente_data": "exames do paciente",
+    "ix_prontuarios_paciente": "prontuários do paciente",
+    "ix_receitas_paciente": "receitas do paciente",
+    "ix_relatorios_financeiros_tipo_data": "relatórios por tipo e período",
+    "ix_leitos_tipo": "leitos livres do tipo",
+    "ix_movimentacoes_estoque_suprimento_data": "movimentações do suprimento",
+    "ix_suprimentos_saldo_minimo": "estoque baixo",
+    "ix_lista_espera_status_especialidade": "lista de espera aguardando",
+}
+
+
+def _com_varredura_completa():
+    return {nome: plano for nome, plano, varreduras in planos_criticos() if varreduras}
+
+
+@pytest.fixture
+def banco_migrado(tmp_path, monkeypatch):
+    """
+    Aplicação com um banco vazio criado só pelas migrações (python manage.py db upgrade).
+    """
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'migrado.db'}")
+    aplicacao = create_app()
+    with aplicacao.app_context():
+        upgrade(directory=MIGRACOES)
+        yield aplicacao
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def test_consultas_criticas_usam_indices(app):
+    with app.app_context():
+        assert _com_varredura_completa() == {}
+
+
+def test_migracoes_criam_os_indices_das_consultas_criticas(banco_migrado):
+    assert _com_varredura_completa() == {}
+
+
+@pytest.mark.parametrize("indice, nome", INDICES.items(), ids=list(INDICES))
+def test_sem_o_indice_a_consulta_le_a_tabela_inteira(app, indice, nome):
+    consulta = dict(consultas_criticas())[nome]
+    with app.app_context():
+        assert varreduras_completas(explicar(consulta)) == []
+        with db.engine.begin() as conexao:
+            conexao.exec_driver_sql(f"DROP INDEX {indice}")
+        db.engine.dispose() # o plano em cache das conexões do pool ainda usaria o índice
+        assert varreduras_completas(explicar(consulta)) != []
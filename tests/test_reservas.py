@@ -0,0 +1,78 @@
+# Slot hold tests - RU 4493981
+from datetime import date, datetime, timedelta
+
+
+def _horas(cliente, headers, profissional_id, data):
+    """
+    Horários listados pelo índice em memória (profissional_id + período curto).
+    """
+    resposta = cliente.get(f"/pacientes/agendas/horarios?profissional_id={profissional_id}"
+                           f"&data_inicio={data}&data_fim={data}", headers=headers)
+    assert resposta.status_code == 200, resposta.get_json()
+    return [h["hora"] for dia in resposta.get_json() for h in dia["horarios"]]
+
+
+def test_reserva_de_horario_virtual_sai_do_indice(cliente, medica, pacientes):
+    """
+    Reservar um horário gerado por regra de agenda o materializa: ele deixa de aparecer
+    como horário virtual na listagem servida pelo índice.
+    """
+    data = date.today() + timedelta(days=1)
+    resposta = cliente.post("/profissionais/regras", headers=medica, json={
+        "dia_semana": data.weekday(), "hora_inicio": "09:00", "hora_fim": "10:00", "duracao_minutos": 30
+    })
+    assert resposta.status_code == 201
+    assert _horas(cliente, pacientes[1], 1, data) == ["09:00:00", "09:30:00"]
+
+    resposta = cliente.post("/pacientes/reservas", headers=pacientes[1], json={
+        "paciente_id": 1, "profissional_id": 1, "data": str(data), "horario": "09:00"
+    })
+    assert resposta.status_code == 201, resposta.get_json()
+
+    assert _horas(cliente, pacientes[2], 1, data) == ["09:30:00"]
+
+
+def test_horarios_virtuais_fora_do_periodo_das_regras(app, cliente, medica, pacientes):
+    """
+    Datas passadas ou além de AGENDA_REGRAS_HORIZONTE_DIAS não têm horários virtuais:
+    a listagem (índice e SQL) não os mostra e o agendamento é recusado.
+    """
+    horizonte = app.config["AGENDA_REGRAS_HORIZONTE_DIAS"]
+    passado, alem = date.today() - timedelta(days=7), date.today() + timedelta(days=horizonte + 1)
+    for data in (passado, alem):
+        cliente.post("/profissionais/regras", headers=medica, json={
+            "dia_semana": data.weekday(), "hora_inicio": "09:00", "hora_fim": "10:00", "duracao_minutos": 30
+        })
+
+    for data in (passado, alem):
+        assert _horas(cliente, pacientes[1], 1, data) == []
+        sql = cliente.get(f"/pacientes/agendas/horarios?data_inicio={data}&data_fim={data}", headers=pacientes[1])
+        assert sql.get_json() == []
+        resposta = cliente.post("/pacientes/consultas", headers=pacientes[1], json={
+            "paciente_id": 1, "profissional_id": 1, "data": str(data), "horario": "09:00"
+        })
+        assert resposta.status_code == 400
+
+
+def test_horarios_virtuais_de_hoje_que_ja_passaram(cliente, medica, pacientes):
+    """
+    Hoje, só os horários virtuais que ainda não começaram são listados e agendáveis
+    (o das 00:00 sempre já começou).
+    """
+    hoje = date.today()
+    cliente.post("/profissionais/regras", headers=medica, json={
+        "dia_semana": hoje.weekday(), "hora_inicio": "00:00", "hora_fim": "23:59", "duracao_minutos": 30
+    })
+    antes = datetime.now().time()
+
+    listados = _horas(cliente, pacientes[1], 1, hoje)
+    sql = cliente.get(f"/pacientes/agendas/horarios?data_inicio={hoje}&data_fim={hoje}", headers=pacientes[1]).get_json()
+    listados_sql = [h["hora"] for dia in sql for h in dia["horarios"]]
+    for horas in (listados, listados_sql):
+        assert "00:00:00" not in horas
+        assert all(hora > antes.strftime("%H:%M:%S") for hora in horas)
+
+    resposta = cliente.post("/pacientes/consultas", headers=pacientes[1], json={
+        "paciente_id": 1, "profissional_id": 1, "data": str(hoje), "horario": "00:00"
+    })
+    assert resposta.status_code == 400
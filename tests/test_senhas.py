@@ -0,0 +1,29 @@
+# Password hashing service tests - RU 4493981
+import time
+import pytest
+from flask import Flask
+from utils.senhas import ServicoSenhas, ServicoSenhasOcupado
+
+
+@pytest.fixture
+def servico():
+    app = Flask(__name__)
+    app.config.update(SENHA_PROCESSOS=1, SENHA_MAX_PENDENTES=1, SENHA_TIMEOUT_SEGUNDOS=0.5, SENHA_NICE=0)
+    servico = ServicoSenhas()
+    servico.init_app(app)
+    yield servico
+    servico._descartar_pool()
+
+
+def test_pedido_que_estoura_o_tempo_mantem_a_vaga_ate_terminar(servico):
+    with pytest.raises(ServicoSenhasOcupado):
+        servico._executar(time.sleep, 2)
+    # o processo do pool ainda está calculando: a vaga continua ocupada
+    assert not servico._pendentes.acquire(blocking=False)
+
+    limite = time.monotonic() + 15
+    while not servico._pendentes.acquire(blocking=False):
+        assert time.monotonic() < limite, "a vaga não foi liberada quando o pedido terminou"
+        time.sleep(0.05)
+    servico._pendentes.release()
+    assert servico._executar(abs, -1) == 1
@@ -0,0 +1,218 @@
+# Booking engine - RU 4493981
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models.agendas import Agenda, Horario
+from models.consulta import Consulta
+from models.reservas import ReservaHorario
+from utils.reservas import sem_reserva_de_outro
+from utils.versoes import chave_consultas_paciente, chave_horarios, incrementar_versao
+
+TAMANHO_LOTE_INSERT = 500 # linhas por INSERT em lote
+
+
+class HorarioIndisponivel(Exception):
+    """
+    Lançada quando o horário não pôde ser ocupado (já foi tomado por outra requisição).
+    """
+
+
+def ocupar_horario(horario_id, paciente_id=None):
+    """
+    Tenta ocupar o horário com um único UPDATE condicional (compare-and-set).
+    O horário também não pode estar reservado temporariamente por outro paciente.
+    Retorna True se esta requisição ocupou o horário; False se ele já estava ocupado.
+    """
+    resultado = db.session.execute(
+        update(Horario)
+        .where(Horario.id == horario_id, Horario.disponivel == True, sem_reserva_de_outro(paciente_id))
+        .values(disponivel=False)
+        .execution_options(synchronize_session=False)
+    )
+    return resultado.rowcount == 1
+
+
+def liberar_horario(horario_id):
+    """
+    Libera o horário com um UPDATE condicional. Retorna True se ele estava ocupado.
+    """
+    resultado = db.session.execute(
+        update(Horario)
+        .where(Horario.id == horario_id, Horario.disponivel == False)
+        .values(disponivel=True)
+        .execution_options(synchronize_session=False)
+    )
+    return resultado.rowcount == 1
+
+
+def confirmar_agendamento(paciente_id, agenda, horario):
+    """
+    Ocupa o horário de forma atômica e registra uma nova consulta na mesma transação.
+    Consultas canceladas no horário continuam no histórico de quem cancelou
+    (a restrição uq_consultas_agenda_horario_ativa vale só para as não canceladas).
+    A reserva temporária do paciente sobre o horário (se houver) é consumida.
+    Lança HorarioIndisponivel se outro paciente ocupou ou reservou o horário antes.
+    O commit fica a cargo de quem chama.
+    """
+    # Horário já lido como ocupado: recusa sem o UPDATE, que no SQLite disputaria o lock
+    # de escrita mesmo sem alterar nada. Lido como livre, quem decide é o UPDATE condicional.
+    if not horario.disponivel or not ocupar_horario(horario.id, paciente_id):
+        db.session.rollback()
+        raise HorarioIndisponivel()
+
+    db.session.execute(delete(ReservaHorario).where(
+        ReservaHorario.horario_id == horario.id, ReservaHorario.paciente_id == paciente_id
+    ))
+
+    consulta = Consulta(
+        agenda_id=agenda.id, horario_id=horario.id, paciente_id=paciente_id,
+        profissional_id=agenda.profissional_id, data_consulta=agenda.data,
+        hora_consulta=horario.hora, status="Agendada"
+    )
+    db.session.add(consulta)
+
+    try:
+        db.session.flush()
+    except IntegrityError:
+        db.session.rollback()
+        raise HorarioIndisponivel()
+    incrementar_versao(chave_horarios(agenda.profissional_id, agenda.data), chave_consultas_paciente(paciente_id))
+    return consulta
+
+
+def efetivar_cancelamento(consulta):
+    """
+    Cancela a consulta com UPDATE condicional (só se ainda não estiver cancelada)
+    e libera o horário na mesma transação.
+    Retorna False se outra requisição já cancelou a consulta.
+    """
+    resultado = db.session.execute(
+        update(Consulta)
+        .where(Consulta.id == consulta.id, Consulta.status != "Cancelada")
+        .values(status="Cancelada")
+        .execution_options(synchronize_session=False)
+    )
+    if resultado.rowcount != 1:
+        db.session.rollback()
+        return False
+
+    liberar_horario(consulta.horario_id)
+    incrementar_versao(
+        chave_horarios(consulta.profissional_id, consulta.data_consulta), chave_consultas_paciente(consulta.paciente_id)
+    )
+    return True
+
+
+def efetivar_remarcacao(consulta, novo_horario):
+    """
+    Move a consulta para outro horário: ocupa o novo (compare-and-set), atualiza a
+    consulta somente se ela ainda estiver agendada no horário antigo e libera o antigo.
+    Lança HorarioIndisponivel se o novo horário foi ocupado ou a consulta mudou.
+    """
+    horario_antigo_id = consulta.horario_id
+
+    if not ocupar_horario(novo_horario.id, consulta.paciente_id):
+        db.session.rollback()
+        raise HorarioIndisponivel()
+
+    try:
+        resultado = db.session.execute(
+            update(Consulta)
+            .where(
+                Consulta.id == consulta.id,
+                Consulta.status == "Agendada",
+                Consulta.horario_id == horario_antigo_id,
+            )
+            .values(
+                horario_id=novo_horario.id,
+                agenda_id=novo_horario.agenda_id,
+                data_consulta=novo_horario.agenda.data,
+                hora_consulta=novo_horario.hora,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    except IntegrityError:
+        db.session.rollback()
+        raise HorarioIndisponivel()
+
+    if resultado.rowcount != 1:
+        db.session.rollback()
+        raise HorarioIndisponivel()
+
+    liberar_horario(horario_antigo_id)
+    # consulta ainda tem os valores antigos (synchronize_session=False): dia de origem e de destino
+    incrementar_versao(
+        chave_horarios(consulta.profissional_id, consulta.data_consulta),
+        chave_horarios(novo_horario.agenda.profissional_id, novo_horario.agenda.data),
+        chave_consultas_paciente(consulta.paciente_id)
+    )
+
+
+def publicar_horarios(horarios_por_agenda):
+    """
+    Publica horários em várias agendas de uma vez.
+    Recebe {agenda: [time, ...]} e retorna (criados, ignorados) como listas de (agenda_id, hora).
+
+    A existência é verificada com uma única consulta (agenda_id IN ...) e os novos
+    horários são inseridos em lotes. O commit fica a cargo de quem chama.
+    """
+    agendas = {agenda.id: agenda for agenda in horarios_por_agenda}
+    if not agendas:
+        return [], []
+
+    existentes = set(db.session.execute(
+        select(Horario.agenda_id, Horario.hora).where(Horario.agenda_id.in_(agendas))
+    ).all())
+
+    criados, ignorados = [], []
+    for agenda, horas in horarios_por_agenda.items():
+        for hora in horas:
+            chave = (agenda.id, hora)
+            if chave in existentes:
+                ignorados.append(chave)
+                continue
+            existentes.add(chave) # também ignora repetições dentro da própria requisição
+            criados.append(chave)
+
+    linhas = [{"agenda_id": agenda_id, "hora": hora, "disponivel": True} for agenda_id, hora in criados]
+    for inicio in range(0, len(linhas), TAMANHO_LOTE_INSERT):
+        db.session.execute(insert(Horario), linhas[inicio:inicio + TAMANHO_LOTE_INSERT])
+    com_novos = {agenda_id for agenda_id, _ in criados}
+    incrementar_versao(*(chave_horarios(a.profissional_id, a.data) for a in agendas.values() if a.id in com_novos))
+
+    return criados, ignorados
+
+
+def apagar_agendas(agenda_ids):
+    """
+    Apaga em lote as agendas informadas, com seus horários e reservas, usando as chaves
+    agenda_id (sem introspecção de schema).
+    Agendas com qualquer consulta (inclusive cancelada, que faz parte do histórico do paciente)
+    são preservadas.
+    Retorna (apagadas, bloqueadas) como conjuntos de agenda_id. O commit fica a cargo de quem chama.
+    """
+    agenda_ids = set(agenda_ids)
+    if not agenda_ids:
+        return set(), set()
+
+    # Via horário: toda consulta aponta para um horário da sua agenda, e ix_consultas_horario
+    # (ao contrário dos índices parciais por agenda_id) cobre também as canceladas
+    bloqueadas = set(db.session.execute(
+        select(Horario.agenda_id).join(Consulta, Consulta.horario_id == Horario.id)
+        .where(Horario.agenda_id.in_(agenda_ids)).distinct()
+    ).scalars())
+    apagadas = agenda_ids - bloqueadas
+    if not apagadas:
+        return apagadas, bloqueadas
+
+    horarios = select(Horario.id).where(Horario.agenda_id.in_(apagadas))
+    opcoes = {"synchronize_session": False}
+
+    dias = db.session.execute(select(Agenda.profissional_id, Agenda.data).where(Agenda.id.in_(apagadas))).all()
+    incrementar_versao(*(chave_horarios(profissional_id, data) for profissional_id, data in dias))
+
+    db.session.execute(delete(ReservaHorario).where(ReservaHorario.horario_id.in_(horarios))
+                       .execution_options(**opcoes))
+    db.session.execute(delete(Horario).where(Horario.agenda_id.in_(apagadas)).execution_options(**opcoes))
+    db.session.execute(delete(Agenda).where(Agenda.id.in_(apagadas)).execution_options(**opcoes))
+    return apagadas, bloqueadas
@@ -0,0 +1,182 @@
+# Hospital census analytics - RU 4493981
+from datetime import datetime, time, timedelta
+from sqlalchemy import Date, func, or_
+from extensions import db
+from models.administracao import Leito, Internacao
+from models.pacientes import Paciente
+
+PERIODO_PADRAO_DIAS = 30 # período usado quando data_inicio não é informada
+PERIODO_MAXIMO_DIAS = 3 * 366 # teto do período consultado
+
+
+def ler_periodo(args):
+    """
+    Lê data_inicio / data_fim (YYYY-MM-DD, inclusivos). Sem data_fim, usa hoje; sem data_inicio,
+    os últimos PERIODO_PADRAO_DIAS dias. Lança ValueError se o período for inválido.
+    """
+    try:
+        fim = datetime.strptime(args["data_fim"], "%Y-%m-%d").date() if args.get("data_fim") else datetime.utcnow().date()
+        inicio = datetime.strptime(args["data_inicio"], "%Y-%m-%d").date() if args.get("data_inicio") \
+            else fim - timedelta(days=PERIODO_PADRAO_DIAS - 1)
+    except ValueError:
+        raise ValueError("Formato de data inválido. Use YYYY-MM-DD")
+    if inicio > fim:
+        raise ValueError("data_inicio deve ser anterior a data_fim")
+    if (fim - inicio).days >= PERIODO_MAXIMO_DIAS:
+        raise ValueError(f"Período máximo de {PERIODO_MAXIMO_DIAS} dias")
+    return inicio, fim
+
+
+def _janela(data_inicio, data_fim):
+    """
+    Converte o período de datas (inclusivo) na janela [inicio, fim) de datetimes.
+    """
+    inicio = datetime.combine(data_inicio, time.min)
+    return inicio, datetime.combine(data_fim + timedelta(days=1), time.min)
+
+
+def _ativas_em(momento, tipo=None):
+    """
+    Conta, por tipo de leito, as internações ativas no momento informado.
+    """
+    query = db.session.query(Leito.tipo, func.count(Internacao.id)) \
+        .join(Leito, Leito.id == Internacao.leito_id) \
+        .filter(Internacao.data_inicio < momento, or_(Internacao.data_fim.is_(None), Internacao.data_fim >= momento))
+    if tipo:
+        query = query.filter(Leito.tipo == tipo)
+    return dict(query.group_by(Leito.tipo).all())
+
+
+def _eventos_por_dia(coluna, inicio, fim, tipo=None):
+    """
+    Conta, por (tipo de leito, dia), as internações cuja coluna (data_inicio = admissões,
+    data_fim = altas) cai na janela [inicio, fim). A agregação é feita no banco, que devolve
+    no máximo uma linha por tipo e dia, independente do número de internações.
+    """
+    dia = func.date(coluna, type_=Date)
+    query = db.session.query(Leito.tipo, dia, func.count(Internacao.id)) \
+        .join(Leito, Leito.id == Internacao.leito_id) \
+        .filter(coluna >= inicio, coluna < fim)
+    if tipo:
+        query = query.filter(Leito.tipo == tipo)
+    return query.group_by(Leito.tipo, dia).all()
+
+
+def _varredura(data_inicio, data_fim, tipo=None):
+    """
+    Varredura (sweep line) do censo: parte das internações ativas no início do período e,
+    dia a dia, soma as admissões e subtrai as altas. Retorna (dias, {tipo: [(admissões, altas, censo), ...]}),
+    com o censo medido ao fim de cada dia. Custo O(dias x tipos) em Python, sem percorrer as internações.
+    """
+    data_fim = min(data_fim, datetime.utcnow().date()) # dias futuros ainda não têm censo
+    inicio, fim = _janela(data_inicio, data_fim)
+    dias = max((fim - inicio).days, 0)
+
+    ativos = _ativas_em(inicio, tipo)
+    entradas, saidas = {}, {}
+    for destino, coluna in ((entradas, Internacao.data_inicio), (saidas, Internacao.data_fim)):
+        for tipo_leito, dia, quantidade in _eventos_por_dia(coluna, inicio, fim, tipo):
+            destino.setdefault(tipo_leito, [0] * dias)[(dia - data_inicio).days] += quantidade
+
+    por_tipo = {}
+    for tipo_leito in set(ativos) | set(entradas) | set(saidas):
+        censo = ativos.get(tipo_leito, 0)
+        e, s = entradas.get(tipo_leito, [0] * dias), saidas.get(tipo_leito, [0] * dias)
+        serie = []
+        for i in range(dias):
+            censo += e[i] - s[i]
+            serie.append((e[i], s[i], censo))
+        por_tipo[tipo_leito] = serie
+    return dias, por_tipo
+
+
+def censo_diario(data_inicio, data_fim, tipo=None):
+    """
+    Para cada dia do período (até hoje): pacientes internados ao fim do dia (censo da meia-noite),
+    admissões e altas do dia.
+    """
+    dias, por_tipo = _varredura(data_inicio, data_fim, tipo)
+    resultado = []
+    for i in range(dias):
+        admissoes = altas = censo = 0
+        for serie in por_tipo.values():
+            admissoes, altas, censo = admissoes + serie[i][0], altas + serie[i][1], censo + serie[i][2]
+        resultado.append({"data": data_inicio + timedelta(days=i), "censo": censo, "admissoes": admissoes, "altas": altas})
+    return resultado
+
+
+def ocupacao_por_tipo(data_inicio, data_fim):
+    """
+    Taxa de ocupação por tipo de leito no período: pacientes-dia (soma dos censos diários)
+    dividido por leitos-dia (leitos cadastrados atualmente x dias do período, até hoje).
+    """
+    dias, por_tipo = _varredura(data_inicio, data_fim)
+    leitos = dict(db.session.query(Leito.tipo, func.count(Leito.id)).group_by(Leito.tipo).all())
+
+    resultado = []
+    for tipo in sorted(set(leitos) | set(por_tipo), key=lambda t: (t is None, t or "")):
+        pacientes_dia = sum(censo for _, _, censo in por_tipo.get(tipo, ()))
+        leitos_dia = leitos.get(tipo, 0) * dias
+        resultado.append({
+            "tipo": tipo,
+            "leitos": leitos.get(tipo, 0),
+            "pacientes_dia": pacientes_dia,
+            "taxa_ocupacao": round(pacientes_dia / leitos_dia, 4) if leitos_dia else None
+        })
+    return resultado
+
+
+def _duracao_dias():
+    """
+    Expressão SQL da duração da internação em dias (data_fim - data_inicio).
+    """
+    if db.engine.dialect.name == "sqlite":
+        return func.julianday(Internacao.data_fim) - func.julianday(Internacao.data_inicio)
+    return func.extract("epoch", Internacao.data_fim - Internacao.data_inicio) / 86400
+
+
+def tempo_medio_permanencia(data_inicio, data_fim, tipo=None):
+    """
+    Tempo médio de permanência, em dias, das internações com alta no período,
+    no geral e por tipo de leito (agregado no banco).
+    """
+    inicio, fim = _janela(data_inicio, data_fim)
+    duracao = _duracao_dias()
+    query = db.session.query(Leito.tipo, func.count(Internacao.id), func.sum(duracao), func.min(duracao), func.max(duracao)) \
+        .join(Leito, Leito.id == Internacao.leito_id) \
+        .filter(Internacao.data_fim >= inicio, Internacao.data_fim < fim)
+    if tipo:
+        query = query.filter(Leito.tipo == tipo)
+    linhas = query.group_by(Leito.tipo).all()
+
+    def resumir(altas, total, minimo, maximo):
+        return {
+            "altas": altas,
+            "media_dias": round(total / altas, 2) if altas else None,
+            "minimo_dias": round(minimo, 2) if minimo is not None else None,
+            "maximo_dias": round(maximo, 2) if maximo is not None else None
+        }
+
+    geral = resumir(
+        sum(l[1] for l in linhas),
+        sum(l[2] or 0 for l in linhas),
+        min((l[3] for l in linhas), default=None),
+        max((l[4] for l in linhas), default=None)
+    )
+    return dict(geral, por_tipo=[
+        dict(resumir(*l[1:]), tipo=l[0]) for l in sorted(linhas, key=lambda l: (l[0] is None, l[0] or ""))
+    ])
+
+
+def ocupante_em(leito_id, momento):
+    """
+    Retorna a internação (com o paciente) que ocupava o leito no momento informado, ou None.
+    Consulta pontual servida pelo índice (leito_id, data_inicio) de internações.
+    """
+    return db.session.query(
+        Internacao.id, Internacao.paciente_id, Paciente.nome, Internacao.data_inicio, Internacao.data_fim
+    ).join(Paciente, Paciente.id == Internacao.paciente_id).filter(
+        Internacao.leito_id == leito_id,
+        Internacao.data_inicio <= momento,
+        or_(Internacao.data_fim.is_(None), Internacao.data_fim > momento)
+    ).order_by(Internacao.data_inicio.desc()).first()
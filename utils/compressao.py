@@ -0,0 +1,140 @@
+# Response compression - RU 4493981
+import zlib
+from flask import request
+
+try:
+    import brotli # opcional (pip install brotli)
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard # opcional (pip install zstandard)
+except ImportError:
+    zstandard = None
+
+
+def _gzip(nivel):
+    c = zlib.compressobj(nivel, zlib.DEFLATED, 31) # wbits 31 = formato gzip
+    return c.compress, lambda: c.flush(zlib.Z_SYNC_FLUSH), c.flush
+
+def _brotli(nivel):
+    c = brotli.Compressor(quality=nivel)
+    return c.process, c.flush, c.finish
+
+def _zstd(nivel):
+    c = zstandard.ZstdCompressor(level=nivel).compressobj()
+    return c.compress, lambda: c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK), c.flush
+
+
+# codificação -> (fábrica do compressor, módulo necessário, chave do nível na configuração)
+CODIFICADORES = {
+    "br": (_brotli, brotli, "COMPRESSAO_NIVEL_BROTLI"),
+    "zstd": (_zstd, zstandard, "COMPRESSAO_NIVEL_ZSTD"),
+    "gzip": (_gzip, zlib, "COMPRESSAO_NIVEL_GZIP"),
+}
+
+
+class Compressao:
+    """
+    Comprime as respostas conforme o Accept-Encoding de cada requisição (gzip sempre;
+    brotli e zstd quando as bibliotecas estiverem instaladas).
+
+    - Respostas comuns só são comprimidas a partir de `minimo_bytes`.
+    - Respostas em streaming (ex.: ?stream=1) são comprimidas parte a parte, com flush
+      a cada parte, para que o cliente continue recebendo os dados aos poucos.
+    - Respostas comprimíveis recebem "Vary: Accept-Encoding", para caches intermediários.
+    """
+
+    def __init__(self):
+        self.habilitada = True
+        self.minimo_bytes = 1024
+        self.algoritmos = ["br", "zstd", "gzip"]
+        self.mimetypes = set()
+        self.niveis = {"gzip": 6, "br": 4, "zstd": 3}
+
+    def init_app(self, app):
+        """
+        Lê a configuração e registra a compressão como after_request da aplicação.
+        """
+        self.habilitada = app.config.get("COMPRESSAO_HABILITADA", True)
+        self.minimo_bytes = app.config.get("COMPRESSAO_MINIMO_BYTES", self.minimo_bytes)
+        self.mimetypes = set(app.config.get("COMPRESSAO_MIMETYPES", ["application/json"]))
+        preferencia = app.config.get("COMPRESSAO_ALGORITMOS", ",".join(self.algoritmos))
+        # Mantém só os algoritmos conhecidos cujas bibliotecas estão instaladas
+        self.algoritmos = [
+            nome for nome in (a.strip() for a in preferencia.split(","))
+            if nome in CODIFICADORES and CODIFICADORES[nome][1] is not None
+        ]
+        for nome, (_, _, chave) in CODIFICADORES.items():
+            self.niveis[nome] = app.config.get(chave, self.niveis[nome])
+        app.after_request(self.comprimir)
+
+    # ---------------------- NEGOCIAÇÃO ----------------------
+    def escolher(self, aceitas):
+        """
+        Escolhe a codificação com maior qualidade no Accept-Encoding;
+        em caso de empate, vale a ordem de preferência do servidor.
+        """
+        melhor, melhor_q = None, 0
+        for nome in self.algoritmos:
+            q = aceitas.quality(nome)
+            if q > melhor_q:
+                melhor, melhor_q = nome, q
+        return melhor
+
+    # ---------------------- AFTER REQUEST ----------------------
+    def comprimir(self, resposta):
+        if (
+            not self.habilitada
+            or resposta.mimetype not in self.mimetypes
+            or resposta.status_code < 200 or resposta.status_code in (204, 304)
+            or resposta.direct_passthrough
+            or "Content-Encoding" in resposta.headers
+        ):
+            return resposta
+
+        resposta.vary.add("Accept-Encoding")
+        if request.method == "HEAD":
+            return resposta
+
+        codificacao = self.escolher(request.accept_encodings)
+        if codificacao is None:
+            return resposta
+
+        fabrica = CODIFICADORES[codificacao][0]
+        nivel = self.niveis[codificacao]
+
+        if resposta.is_streamed:
+            resposta.response = self._comprimir_fluxo(resposta.response, fabrica(nivel))
+            resposta.headers.pop("Content-Length", None)
+        else:
+            dados = resposta.get_data()
+            if len(dados) < self.minimo_bytes:
+                return resposta
+            processar, _, finalizar = fabrica(nivel)
+            resposta.set_data(processar(dados) + finalizar())
+
+        resposta.headers["Content-Encoding"] = codificacao
+        return resposta
+
+    @staticmethod
+    def _comprimir_fluxo(partes, compressor):
+        """
+        Comprime uma resposta em streaming parte a parte, enviando cada parte já comprimida.
+        """
+        processar, descarregar, finalizar = compressor
+        try:
+            for parte in partes:
+                if isinstance(parte, str):
+                    parte = parte.encode()
+                saida = processar(parte) + descarregar()
+                if saida:
+                    yield saida
+            yield finalizar()
+        finally:
+            if hasattr(partes, "close"):
+                partes.close()
+
+
+# Instância global, configurada em create_app
+compressao = Compressao()
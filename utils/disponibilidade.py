@@ -0,0 +1,159 @@
+# Availability index - RU 4493981
+import threading
+import time as _time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from extensions import db
+from models.agendas import Agenda, Horario
+from utils.regras_agenda import slots_virtuais, no_periodo_regras, ja_passou
+
+
+class IndiceDisponibilidade:
+    """
+    Índice em memória dos horários livres, indexado por (profissional_id, data).
+
+    Cada entrada guarda o agenda_id do dia, um dicionário {horario_id: hora}
+    com os horários disponíveis e o conjunto de horários virtuais (gerados por
+    regras de agenda, ainda sem linha em Horario). As entradas são carregadas
+    sob demanda a partir do banco (o índice se reconstrói sozinho após um
+    restart) e atualizadas pelas rotas que alteram a disponibilidade (write-through).
+
+    Limites de memória:
+    - no máximo `max_entradas` pares (profissional, data) em memória;
+    - ao estourar o limite, remove primeiro a entrada menos usada (LRU) entre as
+      datas além de `horizonte_dias`; só depois remove datas próximas.
+    - `ttl_segundos` limita o tempo que uma entrada vive sem recarregar, para que
+      processos diferentes não fiquem desatualizados indefinidamente.
+    """
+
+    def __init__(self, max_entradas=5000, horizonte_dias=60, ttl_segundos=30):
+        self.max_entradas = max_entradas
+        self.horizonte_dias = horizonte_dias
+        self.ttl_segundos = ttl_segundos
+        self._proximas = OrderedDict() # datas dentro do horizonte
+        self._distantes = OrderedDict() # datas além do horizonte (removidas primeiro)
+        self._lock = threading.RLock()
+
+    def init_app(self, app):
+        """
+        Lê os limites do índice a partir da configuração da aplicação.
+        """
+        self.max_entradas = app.config.get("DISPONIBILIDADE_MAX_ENTRADAS", self.max_entradas)
+        self.horizonte_dias = app.config.get("DISPONIBILIDADE_HORIZONTE_DIAS", self.horizonte_dias)
+        self.ttl_segundos = app.config.get("DISPONIBILIDADE_TTL_SEGUNDOS", self.ttl_segundos)
+        self.limpar()
+
+    # ---------------------- LEITURA ----------------------
+    def obter(self, profissional_id, data):
+        """
+        Retorna (agenda_id, [(horario_id, hora), ...]) com os horários livres do
+        profissional na data, ordenados por hora. agenda_id é None se não houver agenda
+        e horario_id é None para horários virtuais.
+        """
+        chave = (profissional_id, data)
+        with self._lock:
+            entrada = self._buscar(chave)
+            if entrada is None:
+                entrada = self._carregar(profissional_id, data)
+                self._guardar(chave, entrada)
+            # Virtuais de hoje que começaram depois da carga da entrada também ficam de fora
+            agora = datetime.now()
+            horarios = list(entrada["horarios"].items()) + [
+                (None, hora) for hora in entrada["virtuais"] if not ja_passou(data, hora, agora)
+            ]
+            horarios.sort(key=lambda item: item[1])
+            return entrada["agenda_id"], horarios
+
+    # ---------------------- ATUALIZAÇÃO (write-through) ----------------------
+    def adicionar_horario(self, profissional_id, data, agenda_id, horario_id, hora):
+        """
+        Marca um horário como livre (cancelamento, remarcação ou publicação).
+        Se a entrada não estiver em memória, nada é feito: ela será carregada do banco.
+        """
+        with self._lock:
+            entrada = self._buscar((profissional_id, data))
+            if entrada is not None:
+                entrada["agenda_id"] = agenda_id
+                entrada["horarios"][horario_id] = hora
+
+    def remover_horario(self, profissional_id, data, horario_id):
+        """
+        Remove um horário livre do índice (consulta marcada ou remarcada).
+        """
+        with self._lock:
+            entrada = self._buscar((profissional_id, data))
+            if entrada is not None:
+                entrada["horarios"].pop(horario_id, None)
+
+    def invalidar(self, profissional_id, data):
+        """
+        Descarta a entrada do par (profissional, data), ex.: quando a agenda é apagada.
+        """
+        with self._lock:
+            self._proximas.pop((profissional_id, data), None)
+            self._distantes.pop((profissional_id, data), None)
+
+    def invalidar_profissional(self, profissional_id):
+        """
+        Descarta todas as entradas de um profissional (ex.: regras de agenda alteradas).
+        """
+        with self._lock:
+            for grupo in (self._proximas, self._distantes):
+                for chave in [chave for chave in grupo if chave[0] == profissional_id]:
+                    del grupo[chave]
+
+    def limpar(self):
+        with self._lock:
+            self._proximas.clear()
+            self._distantes.clear()
+
+    def __len__(self):
+        return len(self._proximas) + len(self._distantes)
+
+    # ---------------------- AUXILIARES ----------------------
+    def _distante(self, data):
+        return data > date.today() + timedelta(days=self.horizonte_dias)
+
+    def _buscar(self, chave):
+        """
+        Retorna a entrada em memória (marcando-a como recém-usada) ou None se
+        não existir ou tiver expirado pelo TTL.
+        """
+        for grupo in (self._proximas, self._distantes):
+            entrada = grupo.get(chave)
+            if entrada is None:
+                continue
+            if self.ttl_segundos and _time.monotonic() - entrada["carregado_em"] > self.ttl_segundos:
+                del grupo[chave]
+                return None
+            grupo.move_to_end(chave)
+            return entrada
+        return None
+
+    def _guardar(self, chave, entrada):
+        grupo = self._distantes if self._distante(chave[1]) else self._proximas
+        grupo[chave] = entrada
+        while len(self) > self.max_entradas:
+            # Datas distantes são removidas primeiro; só então as próximas (LRU)
+            (self._distantes or self._proximas).popitem(last=False)
+
+    def _carregar(self, profissional_id, data):
+        """
+        Carrega do banco os horários livres (materializados e virtuais) de um profissional em uma data.
+        Horários virtuais só existem no período das regras (de hoje ao horizonte), como na busca SQL.
+        """
+        linhas = db.session.query(Agenda.id, Horario.id, Horario.hora) \
+            .outerjoin(Horario, (Horario.agenda_id == Agenda.id) & (Horario.disponivel == True)) \
+            .filter(Agenda.profissional_id == profissional_id, Agenda.data == data) \
+            .all()
+
+        agenda_id = linhas[0][0] if linhas else None
+        horarios = {horario_id: hora for _, horario_id, hora in linhas if horario_id is not None}
+        virtuais = set()
+        if no_periodo_regras(data):
+            virtuais = {hora for _, _, _, _, hora in slots_virtuais(data, data, profissional_id=profissional_id)}
+        return {"agenda_id": agenda_id, "horarios": horarios, "virtuais": virtuais, "carregado_em": _time.monotonic()}
+
+
+# Instância global, configurada em create_app
+indice_disponibilidade = IndiceDisponibilidade()
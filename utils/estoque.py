@@ -0,0 +1,131 @@
+# Supply stock ledger - RU 4493981
+from datetime import datetime
+from sqlalchemy import update
+from extensions import db
+from models.administracao import Suprimento, MovimentacaoEstoque
+
+ENTRADA = "entrada"
+SAIDA = "saida"
+
+
+class SuprimentoNaoEncontrado(Exception):
+    """
+    Lançada quando o suprimento da movimentação não existe.
+    """
+    def __init__(self, suprimento_id):
+        super().__init__(f"Suprimento {suprimento_id} não encontrado")
+        self.suprimento_id = suprimento_id
+
+
+class EstoqueInsuficiente(Exception):
+    """
+    Lançada quando a quantidade em estoque é menor que a pedida.
+    """
+    def __init__(self, suprimento_id, disponivel):
+        super().__init__(f"Estoque insuficiente do suprimento {suprimento_id} (disponível: {disponivel})")
+        self.suprimento_id = suprimento_id
+        self.disponivel = disponivel
+
+
+def ler_quantidade(valor):
+    """
+    Valida a quantidade de uma movimentação (inteiro positivo). Lança ValueError se inválida.
+    """
+    if isinstance(valor, bool) or not isinstance(valor, int) or valor < 1:
+        raise ValueError("quantidade deve ser um inteiro positivo")
+    return valor
+
+
+def _registrar(suprimento_id, tipo, quantidade, saldo, motivo, usuario_id):
+    db.session.add(MovimentacaoEstoque(
+        suprimento_id=suprimento_id, tipo=tipo, quantidade=quantidade, saldo=saldo,
+        motivo=motivo, usuario_id=usuario_id, criado_em=datetime.utcnow()
+    ))
+
+
+def _falha_consumo(suprimento_id):
+    """
+    Descobre por que o UPDATE condicional não alterou nenhuma linha e lança a exceção certa.
+    """
+    disponivel = db.session.query(Suprimento.quantidade).filter(Suprimento.id == suprimento_id).scalar()
+    if disponivel is None:
+        raise SuprimentoNaoEncontrado(suprimento_id)
+    raise EstoqueInsuficiente(suprimento_id, disponivel)
+
+
+def consumir(suprimento_id, quantidade, motivo=None, usuario_id=None):
+    """
+    Dá baixa no estoque com um único UPDATE condicional
+    (quantidade = quantidade - n WHERE quantidade >= n), sem ler-modificar-escrever,
+    e registra a saída no livro. Retorna o saldo resultante.
+    Lança SuprimentoNaoEncontrado ou EstoqueInsuficiente. O commit fica a cargo de quem chama.
+    """
+    saldo = db.session.execute(
+        update(Suprimento)
+        .where(Suprimento.id == suprimento_id, Suprimento.quantidade >= quantidade)
+        .values(quantidade=Suprimento.quantidade - quantidade)
+        .returning(Suprimento.quantidade)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if saldo is None:
+        _falha_consumo(suprimento_id)
+    _registrar(suprimento_id, SAIDA, quantidade, saldo, motivo, usuario_id)
+    return saldo
+
+
+def repor(suprimento_id, quantidade, motivo=None, usuario_id=None):
+    """
+    Dá entrada no estoque com UPDATE atômico (quantidade = quantidade + n) e registra a entrada
+    no livro. Retorna o saldo resultante. Lança SuprimentoNaoEncontrado.
+    O commit fica a cargo de quem chama.
+    """
+    saldo = db.session.execute(
+        update(Suprimento)
+        .where(Suprimento.id == suprimento_id)
+        .values(quantidade=Suprimento.quantidade + quantidade)
+        .returning(Suprimento.quantidade)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if saldo is None:
+        raise SuprimentoNaoEncontrado(suprimento_id)
+    _registrar(suprimento_id, ENTRADA, quantidade, saldo, motivo, usuario_id)
+    return saldo
+
+
+def consumir_lote(itens, motivo=None, usuario_id=None):
+    """
+    Dá baixa em vários suprimentos (ex.: um carrinho) na mesma transação: ou todos são
+    consumidos, ou nenhum (rollback na primeira falta). Itens repetidos são somados e as
+    baixas seguem a ordem dos ids, para que lotes simultâneos travem as linhas na mesma ordem.
+    `itens`: lista de {"suprimento_id", "quantidade"}. Retorna {suprimento_id: saldo}.
+    Lança ValueError, SuprimentoNaoEncontrado ou EstoqueInsuficiente.
+    """
+    if not itens:
+        raise ValueError("Informe ao menos um item")
+    pedidos = {}
+    for item in itens:
+        try:
+            suprimento_id = int(item["suprimento_id"])
+        except (TypeError, ValueError, KeyError):
+            raise ValueError("suprimento_id inválido")
+        pedidos[suprimento_id] = pedidos.get(suprimento_id, 0) + ler_quantidade(item.get("quantidade"))
+
+    saldos = {}
+    try:
+        for suprimento_id in sorted(pedidos):
+            saldos[suprimento_id] = consumir(suprimento_id, pedidos[suprimento_id], motivo, usuario_id)
+    except (SuprimentoNaoEncontrado, EstoqueInsuficiente):
+        db.session.rollback()
+        raise
+    return saldos
+
+
+def estoque_baixo():
+    """
+    Consulta os suprimentos com quantidade igual ou abaixo do estoque mínimo
+    (servida pelo índice ix_suprimentos_saldo_minimo), do mais crítico para o menos crítico.
+    """
+    falta = Suprimento.quantidade - Suprimento.estoque_minimo
+    return db.session.query(
+        Suprimento.id, Suprimento.nome, Suprimento.quantidade, Suprimento.estoque_minimo
+    ).filter(falta <= 0).order_by(falta, Suprimento.id)
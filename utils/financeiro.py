@@ -0,0 +1,149 @@
+# Financial report rollups - RU 4493981
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models.administracao import RelatorioFinanceiro, TotalFinanceiroDiario
+from utils.paginacao import filtrar_periodo
+
+AGRUPAMENTOS = ("tipo", "mes", "dia")
+CENTAVO = Decimal("0.01")
+
+
+def para_centavos(valor):
+    """
+    Converte um valor monetário (número ou string) para centavos inteiros, arredondando
+    meio centavo para cima. Lança ValueError se o valor não for numérico.
+    """
+    try:
+        decimal = Decimal(str(valor)).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValueError("valor deve ser numérico")
+    if not decimal.is_finite():
+        raise ValueError("valor deve ser numérico")
+    return int(decimal * 100)
+
+
+def para_reais(centavos):
+    """
+    Converte centavos inteiros para Decimal com duas casas (serializado como string exata).
+    """
+    return (Decimal(centavos) / 100).quantize(CENTAVO)
+
+
+def _somar_ao_total(tipo, dia, quantidade, centavos):
+    """
+    Soma quantidade / centavos à linha (tipo, dia) dos totais diários, criando-a se preciso.
+    """
+    incremento = (
+        update(TotalFinanceiroDiario)
+        .where(TotalFinanceiroDiario.tipo == tipo, TotalFinanceiroDiario.dia == dia)
+        .values(
+            quantidade=TotalFinanceiroDiario.quantidade + quantidade,
+            total_centavos=TotalFinanceiroDiario.total_centavos + centavos
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if db.session.execute(incremento).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(TotalFinanceiroDiario).values(
+                tipo=tipo, dia=dia, quantidade=quantidade, total_centavos=centavos
+            ))
+    except IntegrityError:
+        # Outra requisição criou a linha ao mesmo tempo
+        db.session.execute(incremento)
+
+
+def registrar_relatorio(tipo, descricao, valor):
+    """
+    Registra o relatório financeiro e soma seu valor aos totais diários na mesma transação.
+    Lança ValueError se o valor for inválido. O commit fica a cargo de quem chama.
+    """
+    centavos = para_centavos(valor)
+    agora = datetime.utcnow()
+    relatorio = RelatorioFinanceiro(tipo=tipo, descricao=descricao, valor=float(para_reais(centavos)), data=agora)
+    db.session.add(relatorio)
+    _somar_ao_total(tipo, agora.date(), 1, centavos)
+    return relatorio
+
+
+def calcular_totais(args):
+    """
+    Retorna os totais (quantidade e valor) agrupados por tipo, mês (YYYY-MM) ou dia (args["agrupar"]),
+    com filtros opcionais tipo e data_inicio / data_fim. Lê os totais diários: o custo depende
+    do número de dias x tipos do período, não do número de relatórios. As somas são feitas
+    em centavos inteiros, sem erro de ponto flutuante. Lança ValueError se algum filtro for inválido.
+    """
+    agrupar = args.get("agrupar", "tipo")
+    if agrupar not in AGRUPAMENTOS:
+        raise ValueError(f"agrupar deve ser um de: {', '.join(AGRUPAMENTOS)}")
+
+    query = db.session.query(
+        TotalFinanceiroDiario.tipo, TotalFinanceiroDiario.dia,
+        TotalFinanceiroDiario.quantidade, TotalFinanceiroDiario.total_centavos
+    )
+    query = filtrar_periodo(query, TotalFinanceiroDiario.dia, args)
+    if args.get("tipo"):
+        query = query.filter(TotalFinanceiroDiario.tipo == args["tipo"])
+    ordem = TotalFinanceiroDiario.tipo if agrupar == "tipo" else TotalFinanceiroDiario.dia
+
+    grupos = OrderedDict()
+    for tipo_relatorio, dia, quantidade, centavos in query.order_by(ordem, TotalFinanceiroDiario.tipo):
+        chave = {"tipo": tipo_relatorio, "mes": dia.strftime("%Y-%m"), "dia": dia}[agrupar]
+        grupo = grupos.setdefault(chave, [0, 0])
+        grupo[0] += quantidade
+        grupo[1] += centavos
+
+    itens = [
+        {agrupar: chave, "quantidade": quantidade, "total": para_reais(centavos)}
+        for chave, (quantidade, centavos) in grupos.items()
+    ]
+    return {
+        "itens": itens,
+        "quantidade": sum(g[0] for g in grupos.values()),
+        "total": para_reais(sum(g[1] for g in grupos.values()))
+    }
+
+
+def reconstruir_totais(conexao=None):
+    """
+    Recalcula todos os totais diários a partir dos relatórios (ex.: após importação direta
+    no banco, ou na migração que preenche a tabela). Usa a sessão da aplicação ou a `conexao`
+    informada (ex.: a da migração). Retorna o número de linhas de totais geradas.
+    O commit fica a cargo de quem chama.
+    """
+    executar = (conexao or db.session).execute
+    totais = {}
+    relatorios = executar(
+        select(RelatorioFinanceiro.tipo, RelatorioFinanceiro.data, RelatorioFinanceiro.valor)
+        .execution_options(yield_per=1000)
+    )
+    for tipo, data, valor in relatorios:
+        total = totais.setdefault((tipo, data.date()), [0, 0])
+        total[0] += 1
+        total[1] += para_centavos(valor)
+
+    executar(delete(TotalFinanceiroDiario))
+    if totais:
+        executar(insert(TotalFinanceiroDiario), [
+            {"tipo": tipo, "dia": dia, "quantidade": quantidade, "total_centavos": centavos}
+            for (tipo, dia), (quantidade, centavos) in totais.items()
+        ])
+    return len(totais)
+
+
+def preencher_totais_se_vazios():
+    """
+    Gera os totais diários a partir dos relatórios quando a tabela de totais está vazia e já
+    existem relatórios (ex.: banco anterior aos totais, em que db.create_all acabou de criar a tabela).
+    Retorna o número de linhas geradas (0 se nada foi feito). O commit fica a cargo de quem chama.
+    """
+    if db.session.query(TotalFinanceiroDiario.tipo).first() is not None:
+        return 0
+    if db.session.query(RelatorioFinanceiro.id).first() is None:
+        return 0
+    return reconstruir_totais()
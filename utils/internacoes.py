@@ -0,0 +1,114 @@
+# Admission / bed allocation engine - RU 4493981
+from datetime import datetime
+from sqlalchemy import exists, or_, select, update
+from extensions import db
+from models.administracao import Leito, Internacao
+from utils.leitos import indice_leitos
+
+MAX_TENTATIVAS_ALOCACAO = 50 # UPDATEs condicionais tentados antes de desistir
+LOTE_BUSCA_LEITOS = 20 # leitos livres buscados no banco quando o índice não tem nenhum
+
+
+class LeitoIndisponivel(Exception):
+    """
+    Lançada quando o leito pedido já está ocupado ou não há leito livre do tipo pedido.
+    """
+
+
+def _leito_livre():
+    """
+    Condição de leito livre: não marcado como ocupado e sem internação ativa.
+    """
+    internacao_ativa = exists().where(Internacao.leito_id == Leito.id, Internacao.data_fim.is_(None))
+    return or_(Leito.ocupado == False, Leito.ocupado.is_(None)) & ~internacao_ativa
+
+
+def ocupar_leito(leito_id):
+    """
+    Tenta ocupar o leito com um único UPDATE condicional (compare-and-set).
+    Retorna True se esta requisição ocupou o leito; False se ele já estava ocupado.
+    """
+    resultado = db.session.execute(
+        update(Leito)
+        .where(Leito.id == leito_id, _leito_livre())
+        .values(ocupado=True)
+        .execution_options(synchronize_session=False)
+    )
+    return resultado.rowcount == 1
+
+
+def _alocar_leito(tipo, preferencias):
+    """
+    Escolhe e ocupa um leito livre do tipo. Os candidatos vêm da lista de livres em memória
+    (preferências primeiro); se ela estiver vazia, confere no banco, pois o índice pode estar
+    desatualizado em relação a outros processos. Retorna o leito_id ou lança LeitoIndisponivel.
+    """
+    for _ in range(MAX_TENTATIVAS_ALOCACAO):
+        leito_id = indice_leitos.retirar_livre(tipo, preferencias)
+        if leito_id is None:
+            break
+        if ocupar_leito(leito_id):
+            return leito_id
+        indice_leitos.invalidar() # outro processo ocupou o leito: recarrega o quadro
+
+    candidatos = db.session.execute(
+        select(Leito.id).where(Leito.tipo == tipo, _leito_livre()).order_by(Leito.id).limit(LOTE_BUSCA_LEITOS)
+    ).scalars().all()
+    for leito_id in candidatos:
+        if ocupar_leito(leito_id):
+            indice_leitos.invalidar()
+            return leito_id
+
+    raise LeitoIndisponivel()
+
+
+def efetivar_internacao(paciente_id, leito_id=None, tipo=None, preferencias=()):
+    """
+    Ocupa o leito de forma atômica e registra a internação na mesma transação.
+    Com leito_id, ocupa aquele leito; sem ele, aloca automaticamente um leito livre do tipo,
+    tentando primeiro os leitos em `preferencias`.
+    Lança LeitoIndisponivel se o leito estiver ocupado ou não houver leito livre do tipo.
+    O commit fica a cargo de quem chama (e, depois dele, indice_leitos.ocupar).
+    """
+    if leito_id is not None:
+        if not ocupar_leito(leito_id):
+            db.session.rollback()
+            raise LeitoIndisponivel()
+    else:
+        try:
+            leito_id = _alocar_leito(tipo, preferencias)
+        except LeitoIndisponivel:
+            db.session.rollback()
+            raise
+
+    internacao = Internacao(paciente_id=paciente_id, leito_id=leito_id)
+    db.session.add(internacao)
+    try:
+        db.session.flush()
+    except Exception:
+        db.session.rollback()
+        indice_leitos.devolver(leito_id)
+        raise
+    return internacao
+
+
+def efetivar_alta(internacao):
+    """
+    Encerra a internação com UPDATE condicional (só se ainda estiver ativa) e libera o leito
+    na mesma transação. Retorna False se outra requisição já deu alta.
+    """
+    resultado = db.session.execute(
+        update(Internacao)
+        .where(Internacao.id == internacao.id, Internacao.data_fim.is_(None))
+        .values(data_fim=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if resultado.rowcount != 1:
+        db.session.rollback()
+        return False
+
+    db.session.execute(
+        update(Leito).where(Leito.id == internacao.leito_id).values(ocupado=False)
+        .execution_options(synchronize_session=False)
+    )
+    return True
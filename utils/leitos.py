@@ -0,0 +1,181 @@
+# Bed state index - RU 4493981
+import threading
+import time as _time
+from extensions import db
+from models.administracao import Leito, Internacao
+
+
+class IndiceLeitos:
+    """
+    Quadro de ocupação dos leitos mantido em memória.
+
+    O quadro inteiro é carregado com uma única consulta (leitos LEFT JOIN internações ativas)
+    e depois atualizado pelas rotas de cadastro de leito, internação e alta (write-through).
+    Mantém também, por tipo de leito, as contagens de livres/ocupados e o conjunto de
+    leitos livres, então o resumo por tipo sai em O(1) por tipo, sem consultar o banco.
+    Um leito está ocupado se tem internação ativa ou está marcado como ocupado
+    (mesma regra do UPDATE condicional de utils/internacoes.py).
+
+    Na alocação automática, `retirar_livre` tira o leito da lista de livres antes do UPDATE,
+    para que requisições simultâneas no mesmo processo tentem leitos diferentes.
+
+    `ttl_segundos` limita o tempo sem recarregar, para que processos diferentes
+    não fiquem desatualizados indefinidamente.
+    """
+
+    def __init__(self, ttl_segundos=30):
+        self.ttl_segundos = ttl_segundos
+        self._leitos = None # leito_id -> {"numero", "tipo", "ocupado", "internacao_id", "paciente_id"}
+        self._livres = {} # tipo -> conjunto de leito_id livres
+        self._ocupados = {} # tipo -> quantidade de leitos ocupados
+        self._carregado_em = 0
+        self._lock = threading.RLock()
+
+    def init_app(self, app):
+        """
+        Lê a configuração do índice a partir da aplicação.
+        """
+        self.ttl_segundos = app.config.get("LEITOS_TTL_SEGUNDOS", self.ttl_segundos)
+        self.invalidar()
+
+    # ---------------------- LEITURA ----------------------
+    def quadro(self):
+        """
+        Retorna a lista de leitos (ordenada por id) com a internação ativa de cada um.
+        """
+        with self._lock:
+            self._garantir_carregado()
+            return [dict(estado, id=leito_id) for leito_id, estado in sorted(self._leitos.items())]
+
+    def resumo(self):
+        """
+        Retorna [{"tipo", "livres", "ocupados", "total"}, ...] ordenado por tipo.
+        """
+        with self._lock:
+            self._garantir_carregado()
+            tipos = set(self._livres) | set(self._ocupados)
+            resumo = []
+            for tipo in sorted(tipos, key=lambda t: (t is None, t or "")):
+                livres = len(self._livres.get(tipo, ()))
+                ocupados = self._ocupados.get(tipo, 0)
+                resumo.append({"tipo": tipo, "livres": livres, "ocupados": ocupados, "total": livres + ocupados})
+            return resumo
+
+    def livres(self, tipo):
+        """
+        Retorna os ids dos leitos livres de um tipo.
+        """
+        with self._lock:
+            self._garantir_carregado()
+            return set(self._livres.get(tipo, ()))
+
+    # ---------------------- ALOCAÇÃO ----------------------
+    def retirar_livre(self, tipo, preferencias=()):
+        """
+        Tira da lista de livres e retorna um leito do tipo: o primeiro livre entre as
+        preferências ou, senão, o de menor id. Retorna None se não houver leito livre.
+        Quem chama deve confirmar com ocupar() ou desfazer com devolver().
+        """
+        with self._lock:
+            self._garantir_carregado()
+            livres = self._livres.get(tipo)
+            if not livres:
+                return None
+            leito_id = next((p for p in preferencias if p in livres), None) or min(livres)
+            livres.discard(leito_id)
+            return leito_id
+
+    def devolver(self, leito_id):
+        """
+        Devolve à lista de livres um leito retirado cuja alocação não foi concluída.
+        """
+        with self._lock:
+            estado = self._leitos.get(leito_id) if self._leitos is not None else None
+            if estado is not None and not estado["ocupado"]:
+                self._livres.setdefault(estado["tipo"], set()).add(leito_id)
+
+    # ---------------------- ATUALIZAÇÃO (write-through) ----------------------
+    def registrar_leito(self, leito_id, numero, tipo):
+        """
+        Inclui um leito recém-cadastrado (livre).
+        """
+        with self._lock:
+            if self._leitos is None:
+                return
+            self._leitos[leito_id] = {"numero": numero, "tipo": tipo, "ocupado": False, "internacao_id": None, "paciente_id": None}
+            self._livres.setdefault(tipo, set()).add(leito_id)
+
+    def ocupar(self, leito_id, internacao_id, paciente_id):
+        """
+        Marca o leito como ocupado pela internação informada.
+        """
+        with self._lock:
+            estado = self._leitos.get(leito_id) if self._leitos is not None else None
+            if estado is None:
+                self.invalidar()
+                return
+            if not estado["ocupado"]:
+                self._livres.get(estado["tipo"], set()).discard(leito_id)
+                self._ocupados[estado["tipo"]] = self._ocupados.get(estado["tipo"], 0) + 1
+            estado["ocupado"] = True
+            estado["internacao_id"], estado["paciente_id"] = internacao_id, paciente_id
+
+    def liberar(self, leito_id):
+        """
+        Marca o leito como livre (alta do paciente).
+        """
+        with self._lock:
+            estado = self._leitos.get(leito_id) if self._leitos is not None else None
+            if estado is None:
+                self.invalidar()
+                return
+            if estado["ocupado"]:
+                self._ocupados[estado["tipo"]] -= 1
+                self._livres.setdefault(estado["tipo"], set()).add(leito_id)
+            estado["ocupado"] = False
+            estado["internacao_id"], estado["paciente_id"] = None, None
+
+    def invalidar(self):
+        """
+        Descarta o quadro; a próxima leitura recarrega do banco.
+        """
+        with self._lock:
+            self._leitos = None
+            self._livres, self._ocupados = {}, {}
+
+    # ---------------------- AUXILIARES ----------------------
+    def _garantir_carregado(self):
+        expirado = self.ttl_segundos and _time.monotonic() - self._carregado_em > self.ttl_segundos
+        if self._leitos is None or expirado:
+            self._carregar()
+
+    def _carregar(self):
+        """
+        Carrega o quadro com uma única consulta: leitos LEFT JOIN internações ativas.
+        """
+        linhas = db.session.query(
+            Leito.id, Leito.numero, Leito.tipo, Leito.ocupado, Internacao.id, Internacao.paciente_id
+        ).outerjoin(
+            Internacao, (Internacao.leito_id == Leito.id) & (Internacao.data_fim.is_(None))
+        ).order_by(Leito.id, Internacao.id).all()
+
+        leitos, livres, ocupados = {}, {}, {}
+        for leito_id, numero, tipo, marcado, internacao_id, paciente_id in linhas:
+            if leito_id in leitos:
+                continue # mais de uma internação ativa no leito: vale a mais antiga
+            ocupado = bool(marcado) or internacao_id is not None
+            leitos[leito_id] = {
+                "numero": numero, "tipo": tipo, "ocupado": ocupado,
+                "internacao_id": internacao_id, "paciente_id": paciente_id
+            }
+            if not ocupado:
+                livres.setdefault(tipo, set()).add(leito_id)
+            else:
+                ocupados[tipo] = ocupados.get(tipo, 0) + 1
+
+        self._leitos, self._livres, self._ocupados = leitos, livres, ocupados
+        self._carregado_em = _time.monotonic()
+
+
+# Instância global, configurada em create_app
+indice_leitos = IndiceLeitos()
@@ -0,0 +1,169 @@
+# Waitlist matching engine - RU 4493981
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from extensions import db
+from models.agendas import Agenda, Horario
+from models.profissionais import Profissional
+from models.lista_espera import ListaEspera
+from models.notificacoes import Notificacao
+from utils.agendamento import HorarioIndisponivel, confirmar_agendamento
+from utils.disponibilidade import indice_disponibilidade
+from utils.regras_agenda import slots_virtuais, materializar_horario, periodo_regras
+from utils.reservas import sem_reserva_de_outro
+from utils.logs import log_info
+from utils.versoes import chave_notificacoes, incrementar_versao
+
+
+def calcular_pareamentos(entradas, horarios):
+    """
+    Distribui os horários livres entre os pacientes da lista de espera.
+
+    entradas: [(entrada_id, data_inicio, data_fim)] de uma especialidade
+    horarios: [(data, hora, ...)] livres da mesma especialidade, em ordem cronológica
+
+    Percorre os horários em ordem e entrega cada um ao paciente elegível com o
+    prazo (data_fim) mais próximo — earliest-deadline-first. Para janelas de
+    datas esse guloso maximiza o número de pacientes atendidos.
+    Retorna [(entrada_id, horario)].
+    """
+    pendentes = sorted(entradas, key=lambda e: e[1]) # por data_inicio
+    elegiveis = [] # heap (data_fim, entrada_id)
+    pareamentos = []
+    i = 0
+    for horario in horarios:
+        data = horario[0]
+        while i < len(pendentes) and pendentes[i][1] <= data:
+            heapq.heappush(elegiveis, (pendentes[i][2], pendentes[i][0]))
+            i += 1
+        while elegiveis and elegiveis[0][0] < data: # prazo vencido para este horário
+            heapq.heappop(elegiveis)
+        if elegiveis:
+            _, entrada_id = heapq.heappop(elegiveis)
+            pareamentos.append((entrada_id, horario))
+        elif i >= len(pendentes):
+            break
+    return pareamentos
+
+
+def processar_lista_espera():
+    """
+    Executa uma rodada de pareamento: carrega em lote as entradas aguardando e os
+    horários livres das especialidades envolvidas, calcula as atribuições e cria
+    a Consulta e a Notificacao de cada par. Retorna a quantidade de consultas criadas.
+    """
+    hoje = date.today()
+    entradas = ListaEspera.query.filter(
+        ListaEspera.status == "aguardando", ListaEspera.data_fim >= hoje
+    ).all()
+    if not entradas:
+        return 0
+
+    por_especialidade = {}
+    for e in entradas:
+        por_especialidade.setdefault(e.especialidade, []).append((e.id, max(e.data_inicio, hoje), e.data_fim))
+    inicio = min(e[1] for lista in por_especialidade.values() for e in lista)
+    fim = max(e.data_fim for e in entradas)
+
+    profissionais = dict(db.session.query(Profissional.id, Profissional.especialidade)
+                         .filter(Profissional.especialidade.in_(por_especialidade)).all())
+    if not profissionais:
+        return 0
+
+    # Horários livres (materializados + virtuais) de todos os profissionais envolvidos
+    livres = {}
+    for agenda_id, data, prof_id, horario_id, hora in db.session.query(
+        Agenda.id, Agenda.data, Agenda.profissional_id, Horario.id, Horario.hora
+    ).join(Horario, Horario.agenda_id == Agenda.id).filter(
+        Horario.disponivel == True, sem_reserva_de_outro(),
+        Agenda.profissional_id.in_(profissionais), Agenda.data >= inicio, Agenda.data <= fim
+    ):
+        livres.setdefault(profissionais[prof_id], []).append((data, hora, prof_id, agenda_id, horario_id))
+    for agenda_id, data, prof_id, horario_id, hora in slots_virtuais(
+        max(inicio, periodo_regras()[0]), min(fim, periodo_regras()[1]), profissional_ids=list(profissionais)
+    ):
+        livres.setdefault(profissionais[prof_id], []).append((data, hora, prof_id, agenda_id, horario_id))
+
+    entradas_por_id = {e.id: e for e in entradas}
+    criadas = 0
+    for especialidade, lista in por_especialidade.items():
+        horarios = sorted(livres.get(especialidade, []))
+        for entrada_id, (data, hora, prof_id, agenda_id, horario_id) in calcular_pareamentos(lista, horarios):
+            if _efetivar(entradas_por_id[entrada_id], data, hora, prof_id, horario_id):
+                criadas += 1
+    return criadas
+
+
+def _efetivar(entrada, data, hora, profissional_id, horario_id):
+    """
+    Agenda a consulta do par (entrada, horário) em sua própria transação.
+    Se o horário foi ocupado nesse meio tempo, o paciente continua na fila.
+    """
+    if horario_id:
+        # A agenda pode ter sido apagada (com seus horários) depois do pareamento
+        horario = db.session.get(Horario, horario_id)
+        if horario is None:
+            return False
+        agenda = horario.agenda
+    else:
+        resultado = materializar_horario(profissional_id, data, hora)
+        if not resultado:
+            return False
+        agenda, horario = resultado
+
+    try:
+        consulta = confirmar_agendamento(entrada.paciente_id, agenda, horario)
+    except HorarioIndisponivel:
+        return False
+
+    entrada.status = "atendido"
+    entrada.consulta_id = consulta.id
+    db.session.add(Notificacao(
+        paciente_id=entrada.paciente_id,
+        titulo="Consulta agendada pela lista de espera",
+        mensagem=f"Sua consulta de {entrada.especialidade} foi marcada para "
+                 f"{data.strftime('%d/%m/%Y')} às {hora.strftime('%H:%M')}."
+    ))
+    incrementar_versao(chave_notificacoes(entrada.paciente_id))
+    db.session.commit()
+    indice_disponibilidade.invalidar(profissional_id, data)
+    return True
+
+
+class MotorListaEspera:
+    """
+    Executa o pareamento fora do caminho da requisição, em uma única thread.
+    Vários pedidos seguidos (ex.: cancelamentos em sequência) são agrupados em
+    uma só rodada enquanto ela ainda não começou.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lista-espera")
+        self._lock = threading.Lock()
+        self._agendado = False
+
+    def solicitar(self, app):
+        with self._lock:
+            if self._agendado:
+                return None
+            self._agendado = True
+        return self._executor.submit(self._executar, app)
+
+    def _executar(self, app):
+        with self._lock:
+            self._agendado = False
+        with app.app_context():
+            try:
+                criadas = processar_lista_espera()
+                if criadas:
+                    log_info(f"Lista de espera: {criadas} consulta(s) agendada(s)")
+            except Exception as e:
+                db.session.rollback()
+                log_info(f"Lista de espera: falha no pareamento: {e}")
+            finally:
+                db.session.remove()
+
+
+# Instância global usada pelas rotas
+motor_lista_espera = MotorListaEspera()
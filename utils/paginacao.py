@@ -0,0 +1,101 @@
+# Keyset pagination - RU 4493981
+import base64
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import tuple_
+from sqlalchemy.types import DateTime
+
+LIMITE_PADRAO = 50 # itens por página quando o cliente não informa limite
+LIMITE_MAXIMO = 500 # teto de itens por página
+
+
+def codificar_cursor(*valores):
+    """
+    Gera um cursor opaco (base64) a partir da chave de ordenação do último item da página.
+    Datas e horas usam ISO 8601; os valores não podem conter "|".
+    """
+    chave = "|".join(v.isoformat() if hasattr(v, "isoformat") else str(v) for v in valores)
+    return base64.urlsafe_b64encode(chave.encode()).decode()
+
+
+def decodificar_cursor(cursor, *tipos):
+    """
+    Converte o cursor de volta para uma tupla, aplicando os tipos informados
+    (date, datetime, time, int ou str) a cada posição.
+    Lança ValueError se o cursor for inválido.
+    """
+    conversores = {date: date.fromisoformat, datetime: datetime.fromisoformat, time: time.fromisoformat}
+    try:
+        partes = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        if len(partes) != len(tipos):
+            raise ValueError()
+        return tuple(conversores.get(tipo, tipo)(parte) for tipo, parte in zip(tipos, partes))
+    except Exception:
+        raise ValueError("cursor inválido")
+
+
+def ler_limite(args, limite_maximo=LIMITE_MAXIMO):
+    """
+    Lê o parâmetro limite, aplicando o padrão e o teto. Lança ValueError se não for inteiro positivo.
+    """
+    try:
+        limite = int(args.get("limite", LIMITE_PADRAO))
+    except (TypeError, ValueError):
+        raise ValueError("limite deve ser um inteiro")
+    if limite < 1:
+        raise ValueError("limite deve ser maior que zero")
+    return min(limite, limite_maximo)
+
+
+def filtrar_periodo(query, coluna, args):
+    """
+    Aplica os filtros opcionais data_inicio / data_fim (YYYY-MM-DD, inclusivos) sobre a coluna.
+    Para colunas DateTime, data_fim abrange o dia inteiro.
+    Lança ValueError se alguma data for inválida.
+    """
+    try:
+        inicio = datetime.strptime(args["data_inicio"], "%Y-%m-%d").date() if args.get("data_inicio") else None
+        fim = datetime.strptime(args["data_fim"], "%Y-%m-%d").date() if args.get("data_fim") else None
+    except ValueError:
+        raise ValueError("Formato de data inválido. Use YYYY-MM-DD")
+
+    if isinstance(coluna.type, DateTime):
+        if inicio:
+            query = query.filter(coluna >= datetime.combine(inicio, time.min))
+        if fim:
+            query = query.filter(coluna < datetime.combine(fim + timedelta(days=1), time.min))
+    else:
+        if inicio:
+            query = query.filter(coluna >= inicio)
+        if fim:
+            query = query.filter(coluna <= fim)
+    return query
+
+
+def paginar(query, chaves, args, serializar, descendente=False, limite_maximo=LIMITE_MAXIMO):
+    """
+    Pagina a consulta por keyset sobre as colunas `chaves` (a última deve ser única, ex.: id).
+
+    - Sem limite nem cursor em args: retorna a lista completa, como antes (formato legado).
+    - Com limite e/ou cursor: retorna {"itens": [...], "next_cursor": ...}, onde next_cursor
+      é None na última página. A página seguinte é buscada com WHERE (chaves) > (cursor),
+      aproveitando o índice, em vez de OFFSET.
+    Lança ValueError se limite ou cursor forem inválidos.
+    """
+    if not args.get("limite") and not args.get("cursor"):
+        return [serializar(item) for item in query.all()]
+
+    limite = ler_limite(args, limite_maximo)
+    if args.get("cursor"):
+        valores = decodificar_cursor(args["cursor"], *(coluna.type.python_type for coluna in chaves))
+        comparacao = tuple_(*chaves) < tuple_(*valores) if descendente else tuple_(*chaves) > tuple_(*valores)
+        query = query.filter(comparacao)
+
+    ordem = [coluna.desc() if descendente else coluna.asc() for coluna in chaves]
+    itens = query.order_by(*ordem).limit(limite + 1).all()
+
+    proximo_cursor = None
+    if len(itens) > limite:
+        itens = itens[:limite]
+        proximo_cursor = codificar_cursor(*(getattr(itens[-1], coluna.key) for coluna in chaves))
+
+    return {"itens": [serializar(item) for item in itens], "next_cursor": proximo_cursor}
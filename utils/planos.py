@@ -0,0 +1,124 @@
+# Query plan checks - RU 4493981
+import re
+from datetime import date, datetime, timedelta
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import exists, select
+from extensions import db
+from models import (
+    Usuario, Paciente, Profissional, Agenda, Horario, Consulta, Notificacao, Prontuario, Receita,
+    Leito, Internacao, RelatorioFinanceiro, TotalFinanceiroDiario, Suprimento, MovimentacaoEstoque,
+    ListaEspera, TokenRevogado
+)
+from models.exames import Exame
+from utils.reservas import sem_reserva_de_outro
+from utils.versoes import consulta_versao_horarios
+
+# "SCAN tabela" sem "USING ..." = leitura da tabela inteira (subconsultas e linhas constantes não contam)
+VARREDURA_COMPLETA = re.compile(r"^SCAN (?!CONSTANT ROW|SUBQUERY|\(subquery)\S+( AS \S+)?$")
+
+
+def consultas_criticas():
+    """
+    Retorna [(nome, select)] com as consultas das rotas mais acessadas, montadas como nas rotas.
+    Os valores dos filtros são fictícios: só o plano de execução importa.
+    """
+    hoje, agora = date.today(), datetime.utcnow()
+    internacao_ativa = exists().where(Internacao.leito_id == Leito.id, Internacao.data_fim.is_(None))
+    return [
+        ("login do usuário", select(Usuario.id, Usuario.senha).where(Usuario.email == "a@a")),
+        ("login do paciente", select(Paciente.id, Paciente.senha).where(Paciente.email == "a@a")),
+        ("login do profissional", select(Profissional.id, Profissional.senha).where(Profissional.crm == "1")),
+        ("histórico de consultas do paciente", select(Consulta.id).where(
+            Consulta.paciente_id == 1, Consulta.data_consulta >= hoje
+        ).order_by(Consulta.data_consulta.desc(), Consulta.hora_consulta.desc(), Consulta.id.desc()).limit(50)),
+        ("consultas do profissional", select(Consulta.id).where(
+            Consulta.profissional_id == 1, Consulta.data_consulta >= hoje
+        ).order_by(Consulta.data_consulta, Consulta.hora_consulta, Consulta.id).limit(50)),
+        ("consultas dos horários de uma agenda", select(Consulta.id).where(Consulta.horario_id.in_([1, 2]))),
+        ("agendas com consultas (apagar agendas)", select(Horario.agenda_id)
+            .join(Consulta, Consulta.horario_id == Horario.id).where(Horario.agenda_id.in_([1, 2])).distinct()),
+        ("horários livres por período", select(Agenda.id, Horario.id).join(Horario, Horario.agenda_id == Agenda.id).where(
+            Horario.disponivel == True, sem_reserva_de_outro(),
+            Agenda.data >= hoje, Agenda.data <= hoje + timedelta(days=30)
+        ).order_by(Agenda.data, Agenda.profissional_id, Horario.hora).limit(50)),
+        ("horários livres de uma agenda", select(Horario.id).where(Horario.agenda_id == 1, Horario.disponivel == True)),
+        ("notificações do paciente", select(Notificacao.id).where(Notificacao.paciente_id == 1)
+            .order_by(Notificacao.criado_em.desc(), Notificacao.id.desc()).limit(50)),
+        ("exames do paciente", select(Exame.id).where(Exame.paciente_id == 1)
+            .order_by(Exame.data.desc(), Exame.id.desc()).limit(50)),
+        ("prontuários do paciente", select(Prontuario.id).where(Prontuario.paciente_id == 1)),
+        ("receitas do paciente", select(Receita.id).where(Receita.paciente_id == 1)),
+        ("relatórios por tipo e período", select(RelatorioFinanceiro.id).where(
+            RelatorioFinanceiro.tipo == "receita", RelatorioFinanceiro.data >= agora
+        )),
+        ("totais financeiros do período", select(TotalFinanceiroDiario.tipo).where(TotalFinanceiroDiario.dia >= hoje)),
+        ("internação ativa do leito", select(Internacao.id).where(Internacao.leito_id == 1, Internacao.data_fim.is_(None))),
+        ("leitos livres do tipo", select(Leito.id).where(
+            Leito.tipo == "UTI", Leito.ocupado == False, ~internacao_ativa
+        ).order_by(Leito.id).limit(20)),
+        ("ocupante do leito em um momento", select(Internacao.id).where(
+            Internacao.leito_id == 1, Internacao.data_inicio <= agora
+        ).order_by(Internacao.data_inicio.desc()).limit(1)),
+        ("admissões do período (censo)", select(Internacao.id).where(
+            Internacao.data_inicio >= agora, Internacao.data_inicio < agora + timedelta(days=30)
+        )),
+        ("movimentações do suprimento", select(MovimentacaoEstoque.id).where(MovimentacaoEstoque.suprimento_id == 1)
+            .order_by(MovimentacaoEstoque.criado_em.desc(), MovimentacaoEstoque.id.desc()).limit(50)),
+        ("estoque baixo", select(Suprimento.id).where(Suprimento.quantidade - Suprimento.estoque_minimo <= 0)),
+        ("lista de espera aguardando", select(ListaEspera.id).where(
+            ListaEspera.status == "aguardando", ListaEspera.especialidade == "cardio"
+        )),
+        ("versões dos horários do período (ETag)", consulta_versao_horarios(1, hoje, hoje + timedelta(days=30))),
+        ("tokens revogados novos", select(TokenRevogado.jti).where(TokenRevogado.id > 0)),
+    ]
+
+
+def explicar(consulta):
+    """
+    Retorna as linhas (coluna detail) do EXPLAIN QUERY PLAN da consulta no SQLite.
+    """
+    compilada = consulta.compile(dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True})
+    parametros = tuple(compilada.params[nome] for nome in compilada.positiontup)
+    with db.engine.connect() as conexao:
+        return [linha[3] for linha in conexao.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compilada), parametros)]
+
+
+def varreduras_completas(plano):
+    """
+    Retorna as etapas do plano que leem uma tabela inteira.
+    """
+    return [etapa for etapa in plano if VARREDURA_COMPLETA.match(etapa)]
+
+
+def planos_criticos():
+    """
+    Retorna [(nome, plano, varreduras)] das consultas críticas no banco da aplicação.
+    """
+    planos = []
+    for nome, consulta in consultas_criticas():
+        plano = explicar(consulta)
+        planos.append((nome, plano, varreduras_completas(plano)))
+    return planos
+
+
+@click.command("verificar-indices")
+@with_appcontext
+def verificar_indices():
+    """
+    Roda EXPLAIN QUERY PLAN nas consultas críticas e falha se alguma ler uma tabela inteira.
+    Uso (no banco migrado): python manage.py db upgrade && python manage.py verificar-indices
+    """
+    if db.engine.dialect.name != "sqlite":
+        raise click.ClickException("verificar-indices suporta apenas SQLite")
+
+    falhas = 0
+    for nome, plano, varreduras in planos_criticos():
+        click.echo(f"{'FALHA' if varreduras else 'ok':<6}{nome}")
+        if varreduras:
+            falhas += 1
+            for etapa in plano:
+                click.echo(f"        {etapa}")
+
+    if falhas:
+        raise click.ClickException(f"{falhas} consulta(s) com varredura completa de tabela")
@@ -0,0 +1,73 @@
+# Read models (column projections) - RU 4493981
+from extensions import db
+from models.pacientes import Paciente
+from models.profissionais import Profissional
+from models.administracao import Internacao, RelatorioFinanceiro
+
+# Cada listagem seleciona somente as colunas que serializa. As consultas devolvem
+# linhas leves (Row, acessíveis por atributo como as entidades), sem montar
+# instâncias nem passar pelo identity map da sessão, e nunca carregam o hash de senha.
+
+
+# ---------------------- PACIENTES ----------------------
+def pacientes_listagem():
+    return db.session.query(
+        Paciente.id, Paciente.nome, Paciente.cpf, Paciente.email, Paciente.data_nascimento, Paciente.telefone
+    )
+
+def serializar_paciente(p):
+    return {
+        "id": p.id,
+        "nome": p.nome,
+        "cpf": p.cpf,
+        "email": p.email,
+        "data_nascimento": p.data_nascimento,
+        "telefone": p.telefone
+    }
+
+
+# ---------------------- PROFISSIONAIS ----------------------
+def profissionais_listagem():
+    return db.session.query(Profissional.id, Profissional.nome, Profissional.tipo, Profissional.crm)
+
+def serializar_profissional(p):
+    return {
+        "id": p.id,
+        "nome": p.nome,
+        "tipo": p.tipo,
+        "crm": p.crm
+    }
+
+
+# ---------------------- INTERNAÇÕES ----------------------
+def internacoes_listagem():
+    return db.session.query(
+        Internacao.id, Internacao.paciente_id, Internacao.leito_id, Internacao.data_inicio, Internacao.data_fim
+    )
+
+def serializar_internacao(i):
+    return {
+        "id": i.id,
+        "paciente_id": i.paciente_id,
+        "leito_id": i.leito_id,
+        "data_inicio": i.data_inicio.strftime("%Y-%m-%d %H:%M:%S") if i.data_inicio else None,
+        "data_fim": i.data_fim.strftime("%Y-%m-%d %H:%M:%S") if i.data_fim else None,
+        "status": "Ativa" if not i.data_fim else "Encerrada"
+    }
+
+
+# ---------------------- RELATÓRIOS FINANCEIROS ----------------------
+def relatorios_listagem():
+    return db.session.query(
+        RelatorioFinanceiro.id, RelatorioFinanceiro.tipo, RelatorioFinanceiro.descricao,
+        RelatorioFinanceiro.valor, RelatorioFinanceiro.data
+    )
+
+def serializar_relatorio(r):
+    return {
+        "id": r.id,
+        "tipo": r.tipo,
+        "descricao": r.descricao,
+        "valor": r.valor,
+        "data": r.data.strftime("%Y-%m-%d %H:%M")
+    }
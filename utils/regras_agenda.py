@@ -0,0 +1,180 @@
+# Virtual slots from agenda rules - RU 4493981
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models.agendas import Agenda, Horario
+from models.profissionais import Profissional
+from models.regras_agenda import RegraAgenda, ExcecaoAgenda
+from utils.versoes import chave_horarios, incrementar_versao
+
+
+def horas_da_regra(regra):
+    """
+    Gera os horários de início de uma regra (hora_inicio, hora_inicio + duração, ...),
+    mantendo apenas os que terminam até hora_fim.
+    """
+    passo = timedelta(minutes=regra.duracao_minutos)
+    atual = datetime.combine(datetime.min, regra.hora_inicio)
+    fim = datetime.combine(datetime.min, regra.hora_fim)
+    horas = []
+    while atual + passo <= fim:
+        horas.append(atual.time())
+        atual += passo
+    return horas
+
+
+def periodo_regras():
+    """
+    Retorna (hoje, último dia) do período em que as regras geram horários virtuais
+    (AGENDA_REGRAS_HORIZONTE_DIAS). Listagens, índice e materialização usam o mesmo período.
+    """
+    hoje = date.today()
+    return hoje, hoje + timedelta(days=current_app.config["AGENDA_REGRAS_HORIZONTE_DIAS"])
+
+
+def no_periodo_regras(data):
+    """
+    Indica se a data está no período dos horários virtuais (de hoje ao horizonte).
+    """
+    inicio, fim = periodo_regras()
+    return inicio <= data <= fim
+
+
+def ja_passou(data, hora, agora=None):
+    """
+    Indica se o horário virtual já começou (hoje, em hora igual ou anterior à atual).
+    """
+    agora = agora or datetime.now()
+    return data < agora.date() or (data == agora.date() and hora <= agora.time())
+
+
+def _bloqueado(hora, excecoes):
+    """
+    Verifica se a hora cai em alguma exceção do dia (sem hora_inicio = dia inteiro).
+    """
+    for inicio, fim in excecoes:
+        if inicio is None or (inicio <= hora and (fim is None or hora < fim)):
+            return True
+    return False
+
+
+def slots_virtuais(data_inicio, data_fim, profissional_id=None, especialidade=None, profissional_ids=None):
+    """
+    Calcula os horários livres gerados pelas regras no período, sem criar linhas.
+    Horários que já existem como Horario (materializados) ficam de fora, pois são
+    tratados pela consulta normal, assim como os de hoje que já começaram.
+
+    Retorna linhas no mesmo formato da busca de horários:
+    (agenda_id ou None, data, profissional_id, None, hora), ordenadas por (data, profissional_id, hora).
+    Usa uma consulta para regras, uma para exceções, uma para agendas e uma para horários existentes.
+    """
+    query = RegraAgenda.query.filter(RegraAgenda.ativa == True)
+    if profissional_id:
+        query = query.filter(RegraAgenda.profissional_id == profissional_id)
+    if profissional_ids is not None:
+        query = query.filter(RegraAgenda.profissional_id.in_(profissional_ids))
+    if especialidade:
+        query = query.join(Profissional, Profissional.id == RegraAgenda.profissional_id) \
+                     .filter(Profissional.especialidade == especialidade)
+
+    regras_por_dia = {} # (profissional_id, dia_semana) -> horas
+    for regra in query.all():
+        chave = (regra.profissional_id, regra.dia_semana)
+        regras_por_dia.setdefault(chave, set()).update(horas_da_regra(regra))
+    if not regras_por_dia:
+        return []
+
+    profissionais = {prof_id for prof_id, _ in regras_por_dia}
+
+    excecoes = {}
+    for e in ExcecaoAgenda.query.filter(
+        ExcecaoAgenda.profissional_id.in_(profissionais),
+        ExcecaoAgenda.data >= data_inicio, ExcecaoAgenda.data <= data_fim
+    ).all():
+        excecoes.setdefault((e.profissional_id, e.data), []).append((e.hora_inicio, e.hora_fim))
+
+    agendas = dict(
+        ((prof_id, data), agenda_id) for agenda_id, prof_id, data in db.session.query(
+            Agenda.id, Agenda.profissional_id, Agenda.data
+        ).filter(
+            Agenda.profissional_id.in_(profissionais), Agenda.data >= data_inicio, Agenda.data <= data_fim
+        )
+    )
+
+    materializados = set(db.session.query(Agenda.profissional_id, Agenda.data, Horario.hora)
+        .join(Horario, Horario.agenda_id == Agenda.id)
+        .filter(Agenda.profissional_id.in_(profissionais), Agenda.data >= data_inicio, Agenda.data <= data_fim)
+        .all())
+
+    agora = datetime.now()
+    linhas = []
+    data = data_inicio
+    while data <= data_fim:
+        for prof_id in sorted(profissionais):
+            horas = regras_por_dia.get((prof_id, data.weekday()))
+            if not horas:
+                continue
+            bloqueios = excecoes.get((prof_id, data), [])
+            for hora in sorted(horas):
+                if (prof_id, data, hora) in materializados or _bloqueado(hora, bloqueios) or ja_passou(data, hora, agora):
+                    continue
+                linhas.append((agendas.get((prof_id, data)), data, prof_id, None, hora))
+        data += timedelta(days=1)
+    return linhas
+
+
+def fluxo_slots_virtuais(data_inicio, data_fim, profissional_ids, bloco_dias=7):
+    """
+    Gera os horários virtuais de vários profissionais em ordem (data, hora, profissional_id),
+    calculando o período em blocos de `bloco_dias` para que a busca pare cedo
+    quando quem consome o fluxo já tiver horários suficientes.
+    """
+    if not profissional_ids or not RegraAgenda.query.filter(
+        RegraAgenda.ativa == True, RegraAgenda.profissional_id.in_(profissional_ids)
+    ).first():
+        return
+
+    inicio = data_inicio
+    while inicio <= data_fim:
+        fim = min(data_fim, inicio + timedelta(days=bloco_dias - 1))
+        linhas = slots_virtuais(inicio, fim, profissional_ids=profissional_ids)
+        linhas.sort(key=lambda linha: (linha[1], linha[4], linha[2]))
+        yield from linhas
+        inicio = fim + timedelta(days=1)
+
+
+def materializar_horario(profissional_id, data, hora):
+    """
+    Cria (se necessário) a Agenda do dia e o Horario correspondente a um horário
+    virtual válido, para que ele possa ser agendado normalmente.
+    Retorna (agenda, horario) ou None se a hora não for gerada pelas regras, se já tiver
+    passado ou se a data estiver fora do período das regras (passado ou além do horizonte).
+    Concorrência: inserts que violam uix_profissional_data / uix_agenda_hora
+    são desfeitos via savepoint e a linha criada pela outra requisição é reutilizada.
+    """
+    if not no_periodo_regras(data) or ja_passou(data, hora):
+        return None
+    if not any(h == hora for _, _, _, _, h in slots_virtuais(data, data, profissional_id=profissional_id)):
+        return None
+
+    incrementar_versao(chave_horarios(profissional_id, data)) # o horário passa a ter id (e a agenda, se criada)
+    agenda = Agenda.query.filter_by(profissional_id=profissional_id, data=data).first()
+    if agenda is None:
+        try:
+            with db.session.begin_nested():
+                agenda = Agenda(profissional_id=profissional_id, data=data)
+                db.session.add(agenda)
+        except IntegrityError:
+            agenda = Agenda.query.filter_by(profissional_id=profissional_id, data=data).first()
+
+    horario = Horario.query.filter_by(agenda_id=agenda.id, hora=hora).first()
+    if horario is None:
+        try:
+            with db.session.begin_nested():
+                horario = Horario(agenda_id=agenda.id, hora=hora, disponivel=True)
+                db.session.add(horario)
+        except IntegrityError:
+            horario = Horario.query.filter_by(agenda_id=agenda.id, hora=hora).first()
+
+    return agenda, horario
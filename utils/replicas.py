@@ -0,0 +1,95 @@
+# Read replicas - RU 4493981
+import random
+import sqlite3
+import click
+from flask import current_app, g, has_app_context
+from flask.cli import with_appcontext
+from flask_sqlalchemy.session import Session
+from sqlalchemy import CompoundSelect, Select, UpdateBase
+
+PREFIXO_REPLICA = "replica_" # chaves das réplicas em SQLALCHEMY_BINDS (config.py)
+
+
+def engines_replicas(engines):
+    """
+    Retorna [(chave, engine)] das réplicas entre as engines da aplicação.
+    """
+    return sorted((chave, engine) for chave, engine in engines.items()
+                  if chave and chave.startswith(PREFIXO_REPLICA))
+
+
+class SessaoRoteada(Session):
+    """
+    Sessão do Flask-SQLAlchemy que envia as leituras das rotas @somente_leitura
+    (routes/decorators.py) a uma réplica e todo o resto ao banco principal.
+
+    Vão para a réplica apenas SELECTs (sem FOR UPDATE) feitos depois que a rota foi marcada
+    e antes de qualquer escrita da sessão: a partir do primeiro flush ou INSERT / UPDATE / DELETE,
+    a sessão passa a ler do principal até o fim da requisição, para enxergar o que escreveu.
+    A réplica é sorteada uma vez por requisição, para que todas as leituras vejam o mesmo estado.
+    Sem réplicas configuradas, tudo vai para o principal.
+    """
+
+    def __init__(self, db, **kwargs):
+        super().__init__(db, **kwargs)
+        self._escreveu = False
+        self._replica = None
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or isinstance(clause, UpdateBase):
+                self._escreveu = True
+            elif self._le_da_replica(clause):
+                replica = self._escolher_replica()
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _le_da_replica(self, clause):
+        return (
+            not self._escreveu
+            and isinstance(clause, (Select, CompoundSelect))
+            and getattr(clause, "_for_update_arg", None) is None
+            and has_app_context() and g.get("somente_leitura", False)
+        )
+
+    def _escolher_replica(self):
+        if self._replica is None:
+            replicas = engines_replicas(self._db.engines)
+            if not replicas:
+                return None
+            self._replica = random.choice(replicas)[1]
+        return self._replica
+
+
+# ---------------------- CÓPIA LOCAL DAS RÉPLICAS ----------------------
+@click.command("copiar-replicas")
+@with_appcontext
+def copiar_replicas():
+    """
+    Copia o banco principal (SQLite) para os arquivos das réplicas com a API de backup
+    do SQLite, que gera uma cópia consistente mesmo com a aplicação escrevendo.
+    Serve para testar localmente o roteamento de leituras (DATABASE_REPLICAS com arquivos SQLite).
+    Uso: python manage.py copiar-replicas
+    """
+    engines = current_app.extensions["sqlalchemy"].engines
+    principal, replicas = engines[None], engines_replicas(engines)
+    if principal.dialect.name != "sqlite":
+        raise click.ClickException("copiar-replicas suporta apenas SQLite; use a replicação do próprio banco")
+    if not replicas:
+        raise click.ClickException("Nenhuma réplica configurada (DATABASE_REPLICAS)")
+
+    origem = sqlite3.connect(principal.url.database)
+    try:
+        for chave, engine in replicas:
+            if engine.dialect.name != "sqlite":
+                raise click.ClickException(f"{chave} não é um banco SQLite")
+            destino = sqlite3.connect(engine.url.database)
+            try:
+                origem.backup(destino)
+            finally:
+                destino.close()
+            engine.dispose() # conexões abertas antes da cópia são descartadas
+            click.echo(f"{chave}: {engine.url.database}")
+    finally:
+        origem.close()
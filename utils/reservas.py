@@ -0,0 +1,101 @@
+# Slot holds - RU 4493981
+import heapq
+import threading
+import time as _time
+from datetime import datetime
+from sqlalchemy import exists, delete
+from extensions import db
+from models.reservas import ReservaHorario
+from models.agendas import Horario
+
+
+class RegistroReservas:
+    """
+    Reservas temporárias de horários mantidas em memória, com cópia na tabela
+    reservas_horarios (que é a fonte da verdade entre processos).
+
+    As expirações ficam em um heap (expira_em, horario_id): a cada leitura, as
+    reservas vencidas no topo do heap são descartadas, sem varrer o dicionário.
+    A cada `intervalo_sincronizacao` segundos o registro é recarregado da tabela
+    para enxergar reservas criadas por outros processos.
+    """
+
+    def __init__(self, ttl_segundos=180, intervalo_sincronizacao=2):
+        self.ttl_segundos = ttl_segundos
+        self.intervalo_sincronizacao = intervalo_sincronizacao
+        self._reservas = {} # horario_id -> (reserva_id, paciente_id, expira_em)
+        self._heap = []
+        self._sincronizado_em = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl_segundos = app.config.get("RESERVA_TTL_SEGUNDOS", self.ttl_segundos)
+        self.intervalo_sincronizacao = app.config.get("RESERVA_SINCRONIZACAO_SEGUNDOS", self.intervalo_sincronizacao)
+        with self._lock:
+            self._reservas.clear()
+            self._heap.clear()
+            self._sincronizado_em = None
+
+    def registrar(self, horario_id, reserva_id, paciente_id, expira_em):
+        with self._lock:
+            self._reservas[horario_id] = (reserva_id, paciente_id, expira_em)
+            heapq.heappush(self._heap, (expira_em, horario_id))
+
+    def remover(self, horario_id):
+        with self._lock:
+            self._reservas.pop(horario_id, None)
+
+    def reservados(self):
+        """
+        Retorna o conjunto de horario_id com reserva ativa.
+        """
+        with self._lock:
+            if self._sincronizado_em is None or \
+                    _time.monotonic() - self._sincronizado_em > self.intervalo_sincronizacao:
+                self._sincronizar()
+            self._expirar(datetime.utcnow())
+            return set(self._reservas)
+
+    def _expirar(self, agora):
+        while self._heap and self._heap[0][0] <= agora:
+            expira_em, horario_id = heapq.heappop(self._heap)
+            atual = self._reservas.get(horario_id)
+            if atual and atual[2] == expira_em: # a reserva pode ter sido renovada
+                del self._reservas[horario_id]
+
+    def _sincronizar(self):
+        linhas = db.session.query(
+            ReservaHorario.horario_id, ReservaHorario.id, ReservaHorario.paciente_id, ReservaHorario.expira_em
+        ).filter(ReservaHorario.expira_em > datetime.utcnow()).all()
+        self._reservas = {horario_id: (reserva_id, paciente_id, expira_em)
+                          for horario_id, reserva_id, paciente_id, expira_em in linhas}
+        self._heap = [(expira_em, horario_id) for horario_id, (_, _, expira_em) in self._reservas.items()]
+        heapq.heapify(self._heap)
+        self._sincronizado_em = _time.monotonic()
+
+
+def sem_reserva_de_outro(paciente_id=None):
+    """
+    Condição SQL: o horário não tem reserva ativa de outro paciente.
+    Usada nas listagens (paciente_id None = esconde qualquer reserva) e no UPDATE de ocupação.
+    """
+    condicao = exists().where(
+        ReservaHorario.horario_id == Horario.id,
+        ReservaHorario.expira_em > datetime.utcnow()
+    )
+    if paciente_id is not None:
+        condicao = condicao.where(ReservaHorario.paciente_id != paciente_id)
+    return ~condicao
+
+
+def apagar_reservas_vencidas(horario_id):
+    """
+    Remove da tabela a reserva vencida de um horário (libera a restrição unique).
+    """
+    db.session.execute(delete(ReservaHorario).where(
+        ReservaHorario.horario_id == horario_id, ReservaHorario.expira_em <= datetime.utcnow()
+    ))
+
+
+# Instância global, configurada em create_app
+registro_reservas = RegistroReservas()
@@ -0,0 +1,146 @@
+# Password hashing service - RU 4493981
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as TempoEsgotado
+from concurrent.futures.process import BrokenProcessPool
+from flask import jsonify
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class ServicoSenhasOcupado(Exception):
+    """
+    Lançada quando há pedidos demais aguardando o pool de hash de senhas.
+    """
+
+
+def _iniciar_processo(nice):
+    """
+    Inicializador dos processos do pool: reduz a prioridade deles, para que o cálculo
+    de hashes não dispute CPU com os workers que atendem as requisições.
+    """
+    if nice and hasattr(os, "nice"):
+        os.nice(nice)
+
+
+class ServicoSenhas:
+    """
+    Gera e verifica hashes de senha (KDF do werkzeug) em um pool limitado de processos.
+
+    Os KDFs são lentos de propósito; calculados na thread da requisição, um pico de logins
+    ocupa a CPU (e, no scrypt, ~32 MB de memória por hash) de todos os workers.
+    No pool, no máximo `processos` hashes são calculados ao mesmo tempo e, com `nice`,
+    em prioridade menor. No máximo `max_pendentes` pedidos ficam no pool (calculando ou na fila);
+    os excedentes esperam até `timeout_segundos` por uma vaga e então recebem 503
+    (ServicoSenhasOcupado), em vez de enfileirar sem limite.
+
+    `metodo` define o KDF e o custo (formato do werkzeug, ex.: "scrypt:32768:8:1",
+    "pbkdf2:sha256:600000"). Hashes gerados com outro método são refeitos no próximo
+    login bem-sucedido (atualizar_hash). Com `processos` = 0, tudo roda na própria thread.
+    """
+
+    def __init__(self):
+        self.metodo = "scrypt:32768:8:1"
+        self.processos = 0
+        self.max_pendentes = 64
+        self.timeout_segundos = 10
+        self.nice = 0
+        self._pool = None
+        self._pendentes = threading.BoundedSemaphore(self.max_pendentes)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Lê a configuração do serviço e registra o tratamento de ServicoSenhasOcupado (503).
+        """
+        self.metodo = app.config.get("SENHA_METODO", self.metodo)
+        self.processos = app.config.get("SENHA_PROCESSOS", self.processos)
+        self.max_pendentes = app.config.get("SENHA_MAX_PENDENTES", self.max_pendentes)
+        self.timeout_segundos = app.config.get("SENHA_TIMEOUT_SEGUNDOS", self.timeout_segundos)
+        self.nice = app.config.get("SENHA_NICE", self.nice)
+        self._pendentes = threading.BoundedSemaphore(max(self.max_pendentes, 1))
+        app.register_error_handler(ServicoSenhasOcupado, self._responder_ocupado)
+
+    @staticmethod
+    def _responder_ocupado(_):
+        return jsonify({"msg": "Serviço de autenticação ocupado, tente novamente"}), 503, {"Retry-After": "1"}
+
+    # ---------------------- OPERAÇÕES ----------------------
+    def gerar(self, senha):
+        """
+        Retorna o hash da senha com o método configurado.
+        """
+        return self._executar(generate_password_hash, senha, self.metodo)
+
+    def verificar(self, hash_senha, senha):
+        """
+        Confere a senha com o hash armazenado.
+        """
+        if not hash_senha:
+            return False
+        return self._executar(check_password_hash, hash_senha, senha)
+
+    def precisa_rehash(self, hash_senha):
+        """
+        Indica se o hash foi gerado com método ou custo diferentes do configurado.
+        """
+        return hash_senha.split("$", 1)[0] != self.metodo
+
+    def atualizar_hash(self, registro, senha):
+        """
+        Depois de um login bem-sucedido, refaz o hash de `registro.senha` se os parâmetros
+        do KDF mudaram. Retorna True se o hash foi alterado (o commit fica a cargo de quem chama).
+        """
+        if not self.precisa_rehash(registro.senha):
+            return False
+        registro.senha = self.gerar(senha)
+        return True
+
+    # ---------------------- AUXILIARES ----------------------
+    def _executar(self, funcao, *args):
+        if not self.processos:
+            return funcao(*args)
+        pendentes = self._pendentes
+        if not pendentes.acquire(timeout=self.timeout_segundos):
+            raise ServicoSenhasOcupado()
+        try:
+            futuro = self._obter_pool().submit(funcao, *args)
+        except BrokenProcessPool:
+            pendentes.release()
+            self._descartar_pool()
+            return funcao(*args)
+        except BaseException:
+            pendentes.release()
+            raise
+        # A vaga só é liberada quando o hash termina (ou é cancelado): um pedido que estourou
+        # o tempo de espera continua ocupando um processo do pool
+        futuro.add_done_callback(lambda _: pendentes.release())
+        try:
+            return futuro.result(timeout=self.timeout_segundos)
+        except TempoEsgotado:
+            raise ServicoSenhasOcupado()
+        except BrokenProcessPool:
+            # Um processo do pool morreu: recria o pool na próxima chamada e atende esta aqui
+            self._descartar_pool()
+            return funcao(*args)
+
+    def _obter_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processos,
+                    mp_context=multiprocessing.get_context("spawn"), # não herda threads / conexões do worker
+                    initializer=_iniciar_processo,
+                    initargs=(self.nice,)
+                )
+            return self._pool
+
+    def _descartar_pool(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+# Instância global, configurada em create_app
+servico_senhas = ServicoSenhas()
@@ -0,0 +1,78 @@
+# JSON provider - RU 4493981
+import dataclasses
+import json
+import uuid
+from datetime import date, time
+from decimal import Decimal
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson # opcional: codificador mais rápido (pip install orjson)
+except ImportError:
+    orjson = None
+
+
+def _padrao(o):
+    """
+    Converte os tipos que o json da biblioteca padrão não conhece.
+    date / time / datetime viram ISO 8601 (mesmo formato do orjson) e Decimal vira string,
+    para não perder precisão em valores monetários.
+    """
+    if isinstance(o, (date, time)):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return str(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Objeto do tipo {type(o).__name__} não é serializável em JSON")
+
+
+class ProvedorJSON(JSONProvider):
+    """
+    Provider JSON da aplicação (registrado em create_app).
+
+    Usa orjson quando instalado e o módulo json da biblioteca padrão caso contrário;
+    nos dois casos datas e horas saem em ISO 8601 (YYYY-MM-DD, HH:MM:SS, YYYY-MM-DDTHH:MM:SS),
+    as chaves são ordenadas e a saída é compacta, então as rotas podem devolver
+    date / time / datetime diretamente, sem strftime.
+    """
+
+    sort_keys = True
+
+    def dumps(self, obj, **kwargs):
+        # separators só define o formato compacto, que o orjson já usa
+        kwargs.pop("separators", None)
+        if orjson is not None and not kwargs:
+            return self._orjson_dumps(obj).decode()
+        kwargs.setdefault("default", _padrao)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        kwargs.setdefault("ensure_ascii", False)
+        kwargs.setdefault("separators", (",", ":"))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """
+        Monta a resposta do jsonify. Com orjson os bytes vão direto para a resposta,
+        sem a conversão intermediária para str.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is not None:
+            corpo = self._orjson_dumps(obj) + b"\n"
+        else:
+            corpo = self.dumps(obj) + "\n"
+        return self._app.response_class(corpo, mimetype="application/json")
+
+    def _orjson_dumps(self, obj):
+        opcoes = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opcoes |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_padrao, option=opcoes)
@@ -0,0 +1,37 @@
+# Streaming JSON responses - RU 4493981
+from flask import Response, current_app, stream_with_context
+
+TAMANHO_LOTE_STREAM = 500 # linhas lidas do banco por vez (yield_per)
+
+
+def pedido_stream(args):
+    """
+    Indica se o cliente pediu a resposta em streaming (?stream=1).
+    """
+    return args.get("stream") in ("1", "true")
+
+
+def resposta_stream(query, serializar, tamanho_lote=TAMANHO_LOTE_STREAM):
+    """
+    Envia o resultado da consulta como um array JSON em partes (chunked), sem montar a lista inteira.
+    As linhas são lidas em lotes com yield_per e cada lote é codificado e enviado em seguida,
+    então a memória usada não depende do tamanho da tabela.
+    Usa o mesmo codificador JSON da aplicação, em formato compacto como o jsonify.
+    Obs.: um erro no meio do envio gera um array incompleto, pois o status 200 já foi enviado.
+    """
+    def gerar():
+        dumps = current_app.json.dumps
+        yield "["
+        lote = []
+        separador = ""
+        for item in query.yield_per(tamanho_lote):
+            lote.append(dumps(serializar(item), separators=(",", ":")))
+            if len(lote) >= tamanho_lote:
+                yield separador + ",".join(lote)
+                separador = ","
+                lote = []
+        if lote:
+            yield separador + ",".join(lote)
+        yield "]"
+
+    return Response(stream_with_context(gerar()), mimetype="application/json")
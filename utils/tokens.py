@@ -0,0 +1,117 @@
+# JWT refresh / revocation - RU 4493981
+import heapq
+import threading
+import time as _time
+from datetime import datetime
+from flask_jwt_extended import create_access_token, create_refresh_token
+from sqlalchemy import delete, insert
+from sqlalchemy.exc import IntegrityError
+from extensions import db, jwt
+from models.tokens import TokenRevogado
+
+# Claims do próprio JWT, que não são copiadas para o novo access token na renovação
+CLAIMS_RESERVADAS = {"iat", "nbf", "jti", "exp", "sub", "type", "fresh", "csrf", "iss", "aud"}
+SEM_EXPIRACAO = datetime(9999, 12, 31) # tokens configurados para não expirar
+
+
+def emitir_tokens(identidade, claims):
+    """
+    Gera o par (access_token, refresh_token) do login, com as mesmas claims adicionais.
+    O access token dura pouco (JWT_ACCESS_TOKEN_EXPIRES); o refresh token renova o access
+    token em /auth/refresh sem repetir a verificação de senha.
+    """
+    return (
+        create_access_token(identity=identidade, additional_claims=claims),
+        create_refresh_token(identity=identidade, additional_claims=claims)
+    )
+
+
+def renovar_access_token(identidade, payload):
+    """
+    Gera um novo access token com as claims adicionais do refresh token (role, tipo, etc.).
+    """
+    claims = {chave: valor for chave, valor in payload.items() if chave not in CLAIMS_RESERVADAS}
+    return create_access_token(identity=identidade, additional_claims=claims)
+
+
+class ListaRevogacao:
+    """
+    Tokens revogados (logout), consultados pelo token_in_blocklist_loader a cada requisição.
+
+    Mantidos em memória (jti -> expiração), com cópia na tabela tokens_revogados, que é
+    a fonte da verdade entre processos. As expirações ficam em um heap: a cada consulta,
+    os tokens já expirados saem da memória, já que o próprio JWT não seria mais aceito.
+    A cada `intervalo_sincronizacao` segundos, busca na tabela apenas as revogações novas
+    (id maior que o último visto), feitas por outros processos.
+    """
+
+    def __init__(self, intervalo_sincronizacao=2):
+        self.intervalo_sincronizacao = intervalo_sincronizacao
+        self._revogados = {} # jti -> expira_em
+        self._heap = []
+        self._ultimo_id = 0
+        self._sincronizado_em = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Lê a configuração e registra a consulta à lista no Flask-JWT-Extended.
+        """
+        self.intervalo_sincronizacao = app.config.get("TOKENS_REVOGADOS_SINCRONIZACAO_SEGUNDOS", self.intervalo_sincronizacao)
+        with self._lock:
+            self._revogados.clear()
+            self._heap.clear()
+            self._ultimo_id = 0
+            self._sincronizado_em = None
+        jwt.token_in_blocklist_loader(self._token_revogado)
+
+    def _token_revogado(self, jwt_header, jwt_payload):
+        return self.esta_revogado(jwt_payload["jti"])
+
+    def esta_revogado(self, jti):
+        with self._lock:
+            if self._sincronizado_em is None or \
+                    _time.monotonic() - self._sincronizado_em > self.intervalo_sincronizacao:
+                self._sincronizar()
+            self._expirar(datetime.utcnow())
+            return jti in self._revogados
+
+    def revogar(self, payload):
+        """
+        Revoga o token (payload decodificado) na tabela e na memória, e apaga da tabela
+        as revogações de tokens já expirados. O commit fica a cargo de quem chama.
+        """
+        expira_em = datetime.utcfromtimestamp(payload["exp"]) if "exp" in payload else SEM_EXPIRACAO
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(TokenRevogado).values(
+                    jti=payload["jti"], tipo=payload.get("type", "access"),
+                    expira_em=expira_em, revogado_em=datetime.utcnow()
+                ))
+        except IntegrityError:
+            pass # token já revogado
+        db.session.execute(delete(TokenRevogado).where(TokenRevogado.expira_em <= datetime.utcnow()))
+        with self._lock:
+            self._adicionar(payload["jti"], expira_em)
+
+    # ---------------------- AUXILIARES ----------------------
+    def _adicionar(self, jti, expira_em):
+        self._revogados[jti] = expira_em
+        heapq.heappush(self._heap, (expira_em, jti))
+
+    def _expirar(self, agora):
+        while self._heap and self._heap[0][0] <= agora:
+            _, jti = heapq.heappop(self._heap)
+            self._revogados.pop(jti, None)
+
+    def _sincronizar(self):
+        linhas = db.session.query(TokenRevogado.id, TokenRevogado.jti, TokenRevogado.expira_em) \
+            .filter(TokenRevogado.id > self._ultimo_id).all()
+        for id_, jti, expira_em in linhas:
+            self._adicionar(jti, expira_em)
+            self._ultimo_id = max(self._ultimo_id, id_)
+        self._sincronizado_em = _time.monotonic()
+
+
+# Instância global, configurada em create_app
+lista_revogacao = ListaRevogacao()
@@ -0,0 +1,101 @@
+# Resource versions / ETag - RU 4493981
+import hashlib
+from datetime import datetime
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models.versoes import VersaoRecurso
+
+# Chaves de versão dos recursos consultados com frequência.
+# Horários: uma chave por dia de agenda de cada profissional e uma pelas regras de agenda de
+# cada profissional, para que escritas em agendas diferentes não disputem a mesma linha.
+# A data vem antes do profissional para que um período seja um intervalo contínuo de chaves.
+def chave_horarios(profissional_id, data):
+    return f"horarios:{data.isoformat()}:{profissional_id}"
+
+def chave_regras(profissional_id):
+    return f"horarios:regras:{profissional_id}"
+
+def chave_consultas_paciente(paciente_id):
+    return f"consultas:paciente:{paciente_id}"
+
+def chave_notificacoes(paciente_id):
+    return f"notificacoes:{paciente_id}"
+
+
+def incrementar_versao(*chaves):
+    """
+    Incrementa a versão dos recursos informados na transação atual
+    (o commit fica a cargo de quem chama, junto com a escrita que alterou o recurso).
+    """
+    agora = datetime.utcnow()
+    for chave in set(chaves):
+        incremento = (
+            update(VersaoRecurso).where(VersaoRecurso.chave == chave)
+            .values(versao=VersaoRecurso.versao + 1, atualizado_em=agora)
+            .execution_options(synchronize_session=False)
+        )
+        if db.session.execute(incremento).rowcount:
+            continue
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(VersaoRecurso).values(chave=chave, versao=1, atualizado_em=agora))
+        except IntegrityError:
+            # Outra requisição criou a linha ao mesmo tempo
+            db.session.execute(incremento)
+
+
+def obter_versoes(chaves):
+    """
+    Retorna {chave: versao} com uma única consulta (recursos nunca alterados têm versão 0).
+    """
+    if not chaves:
+        return {}
+    versoes = dict(db.session.execute(
+        select(VersaoRecurso.chave, VersaoRecurso.versao).where(VersaoRecurso.chave.in_(chaves))
+    ).all())
+    return {chave: versoes.get(chave, 0) for chave in chaves}
+
+
+def consulta_versao_horarios(profissional_id=None, data_inicio=None, data_fim=None):
+    """
+    Monta a consulta de (quantidade, soma) das versões dos dias de agenda no período e das
+    regras de agenda, do profissional informado ou de todos (intervalos na chave primária).
+    """
+    chave = VersaoRecurso.chave
+    # ";" vem logo depois de ":" na tabela ASCII: "horarios:<data>;" fecha todas as chaves do dia
+    # e "horarios:;" fica depois de qualquer data e antes de "horarios:regras:"
+    dias = and_(
+        chave >= (f"horarios:{data_inicio.isoformat()}:" if data_inicio else "horarios:"),
+        chave < (f"horarios:{data_fim.isoformat()};" if data_fim else "horarios:;"),
+    )
+    if profissional_id:
+        dias = and_(dias, chave.like(f"%:{int(profissional_id)}"))
+        regras = chave == chave_regras(profissional_id)
+    else:
+        regras = and_(chave >= "horarios:regras:", chave < "horarios:regras;")
+    return select(func.count(), func.coalesce(func.sum(VersaoRecurso.versao), 0)).where(or_(dias, regras))
+
+
+def versao_horarios(profissional_id=None, data_inicio=None, data_fim=None):
+    """
+    Retorna (quantidade, soma) das versões dos horários do filtro (consulta_versao_horarios).
+    As versões só aumentam, então o par muda sempre que algum dia ou regra do filtro é alterado.
+    """
+    return tuple(db.session.execute(consulta_versao_horarios(profissional_id, data_inicio, data_fim)).one())
+
+
+def calcular_etag(chaves, extra=None):
+    """
+    Monta o ETag da requisição a partir das versões dos recursos, da URL (filtros e página),
+    do usuário autenticado e de dados extras que mudam sem escrita no banco.
+    O hash leva a chave secreta da aplicação, então o valor não pode ser deduzido pelo cliente.
+    """
+    versoes = obter_versoes(list(chaves))
+    base = repr((
+        current_app.config["SECRET_KEY"], get_jwt_identity(), request.full_path,
+        sorted(versoes.items()), extra
+    ))
+    return hashlib.sha1(base.encode()).hexdigest()